@@ -291,7 +291,25 @@ have asset classes instanced for them.
 from ._asset import Asset
 from ._compositor import Compositor
 from ._config import Configuration
-from ._discovery import DiscoveryFactory, DiscoveryPlugin
+from ._cost import CostModel
+from ._discovery import (
+    DiscoveryFactory,
+    DiscoveryPlugin,
+    PaginatedDiscoveryPlugin,
+    RestDiscoveryPlugin,
+)
+from ._fixtures import FixtureServer, RecordingTransport, ReplayTransport
+from ._icons import IconCache
+from ._http import HttpClient, HttpResponse, HttpStream, HttpTransport, PooledTransport
+from ._loader import RecordLoader
+from ._local_search import LocalSearch
+from ._prefetch import Prefetcher, PrefetchRequest
+from ._server import AssetClient, AssetServer, RemoteAction, RemoteAsset
+from ._shared_cache import SharedCache
+from ._snapshot import RestoredAsset
+from ._table import AssetTable, DictionaryColumn
 from ._trait import Trait, TraitFactory
+from ._trigram import TrigramIndex
+from ._watcher import FileSystemWatcher
 
 __version__ = "1.2.5"
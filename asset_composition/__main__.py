@@ -0,0 +1,86 @@
+# ----------------------------------------------------------------------------
+# Copyright (c) Studio Gobo Ltd 2025
+# Licensed under the MIT license.
+# See LICENSE.TXT in the project root for license information.
+# ----------------------------------------------------------------------------
+# File			-> __main__.py
+# Created		-> March 2025
+# Author		-> Michael Malinowski (Studio Gobo)
+# ----------------------------------------------------------------------------
+"""
+Command line entry point, which hosts a long lived compositor behind a local
+socket:
+
+    python -m asset_composition serve --config /path/to/config.json
+"""
+import argparse
+import os
+
+from . import _compositor, _config, _server
+
+
+def _configuration(filepath: str | None) -> _config.Configuration:
+    """
+    Returns the configuration stored in the given file, or one holding the
+    built in filesystem plugins if no file is given
+    """
+    if filepath:
+        return _config.Configuration(filepath)
+
+    configuration = _config.Configuration()
+    plugins = os.path.join(os.path.dirname(__file__), "plugins", "filesystem")
+
+    configuration.traits.add_path(os.path.join(plugins, "traits"))
+    configuration.discovery.add_path(os.path.join(plugins, "discovery"))
+
+    return configuration
+
+
+def main(arguments: list | None = None) -> None:
+    parser = argparse.ArgumentParser(prog="asset_composition")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    serve = commands.add_parser(
+        "serve",
+        help="Serve the assets of a compositor over a unix domain socket",
+    )
+    serve.add_argument(
+        "--config",
+        help="Configuration file to build the compositor from. By default the "
+        "built in filesystem plugins are used.",
+    )
+    serve.add_argument(
+        "--address",
+        help="Path of the socket to listen on. Defaults to the "
+        "ASSET_COMPOSITION_SERVER environment variable or the cache directory.",
+    )
+    serve.add_argument(
+        "--allow-actions",
+        action="store_true",
+        help="Allow clients to call asset actions within this process",
+    )
+
+    arguments = parser.parse_args(arguments)
+
+    compositor = _compositor.Compositor(_configuration(arguments.config))
+
+    server = _server.AssetServer(
+        compositor,
+        address=arguments.address,
+        allow_actions=arguments.allow_actions,
+    )
+
+    print(f"Serving assets on {server.address()}")
+
+    try:
+        server.serve_forever()
+
+    except KeyboardInterrupt:
+        pass
+
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -7,9 +7,14 @@
 # Created		-> March 2025
 # Author		-> Michael Malinowski (Studio Gobo)
 # ----------------------------------------------------------------------------
+import threading
+import time
+
 import signalling
 import xcomposite
 
+from . import _hierarchy
+
 
 class Asset(xcomposite.Composition):
     """
@@ -28,6 +33,12 @@ class Asset(xcomposite.Composition):
     If you want a fully functional version of the asset, you should leave the
     lightweight flag as false.
 
+    Assets can be used from multiple threads. Binding is serialised by a lock
+    held on each asset, and the list of bound traits is replaced rather than
+    changed in place, so a composite call made whilst another thread is
+    re-binding the asset sees either the old traits or the new ones, never
+    a mix. Traits themselves must be safe to call from multiple threads.
+
     Args:
         identifier (str): The identifier of the asset.
         compositor: The Compositor class which instanced this asset.
@@ -53,6 +64,10 @@ class Asset(xcomposite.Composition):
         self._identifier: str = identifier
         self._lightweight: bool = lightweight
 
+        # -- Serialises binding, so two threads re-binding the same asset
+        # -- cannot interleave
+        self._binding_lock: threading.RLock = threading.RLock()
+
         # -- ALlow this class (or any traits) to notify this asset that it has
         # -- has changed in some meaningful way
         self.status_changed: signalling.Signal = signalling.Signal()
@@ -84,31 +99,101 @@ class Asset(xcomposite.Composition):
         will be removed, then traits will be re-applied. Note that traits are
         always bound in order of importance.
         """
-        # -- Clear any existing traits
-        for trait in self.traits()[:]:
-            print(trait)
-            self.unbind(trait)
+        with self._binding_lock:
 
-        # -- Get the traits in order of importance
-        traits = sorted(
-            self.compositor.configuration.traits.plugins(),
-            key=lambda t: t.importance,
-            reverse=True,
-        )
+            components = [
+                trait(asset=self)
+                for trait in self._bindable_traits(lightweight)
+            ]
+
+            # -- Replace any existing traits in one step
+            self._set_components(components)
+
+            # -- Update our lightweight flag to represent our new state
+            self._lightweight = lightweight
+
+    def _bindable_traits(self, lightweight: bool) -> list:
+        """
+        Returns the trait classes which can bind to this asset, in order of
+        importance. The predicates are evaluated in the order given by the
+        binding plan of the configuration, which evaluates the cheapest first
+        and stops once an exclusive trait has bound. Once a member of an
+        exclusive group has bound, the rest of the group is skipped, as are
+        the traits the compositor already knows cannot bind.
+        """
+        configuration = self.compositor.configuration
+        negative_binds = self.compositor._negative_binds
+        costs = configuration.costs
+        measuring = costs.measuring
+        identifier = self.identifier()
+
+        bound = list()
+        claimed_groups = set()
+
+        for stage in configuration.binding_plan():
+            exclusive = False
+
+            for position, trait in stage:
+
+                # -- If we're only binding lightweight traits and this trait is
+                # -- not lightweight, then we skip it
+                if lightweight and not trait.lightweight:
+                    continue
+
+                group = trait.exclusive_group
+
+                if group and group in claimed_groups:
+                    continue
+
+                if negative_binds is not None and negative_binds.cannot_bind(
+                    trait,
+                    identifier,
+                ):
+                    continue
 
-        for trait in traits:
+                if measuring:
+                    start = time.perf_counter()
+                    can_bind = trait.can_bind(identifier)
+                    costs.record(trait, "can_bind", time.perf_counter() - start)
 
-            # -- If we're only binding lightweight traits and this trait is not
-            # -- lightweight, then we skip it
-            if lightweight and not trait.lightweight:
-                continue
+                else:
+                    can_bind = trait.can_bind(identifier)
 
-            # -- Perform the binding if its viable
-            if trait.can_bind(self.identifier()):
-                self.bind(trait(asset=self))
+                if can_bind:
+                    bound.append((position, trait))
+                    exclusive = exclusive or trait.exclusive
 
-        # -- Update our lightweight flag to represent our new state
-        self._lightweight = lightweight
+                    if group:
+                        claimed_groups.add(group)
+
+                elif negative_binds is not None:
+                    negative_binds.add(trait, identifier)
+
+            if exclusive:
+                break
+
+        # -- Traits are always bound in order of importance, whatever order
+        # -- their predicates were evaluated in
+        bound.sort(key=lambda item: item[0])
+
+        return [trait for _, trait in bound]
+
+    def _set_components(self, components: list) -> None:
+        """
+        Replaces the bound traits with the given list. The list is swapped
+        rather than changed, so a composite call running on another thread
+        carries on with the traits it started with.
+        """
+        self.__dict__["_components"] = components
+
+    def bind(self, component) -> None:
+        with self._binding_lock:
+            self._set_components(self._components + [component])
+
+    def unbind(self, component_or_type) -> bool:
+        with self._binding_lock:
+            self._set_components(list(self._components))
+            return super(Asset, self).unbind(component_or_type)
 
     def fully_load(self) -> None:
         """
@@ -117,12 +202,55 @@ class Asset(xcomposite.Composition):
         """
         self._perform_trait_binding(lightweight=False)
 
+    def prefetch_children(
+        self,
+        depth: int = 1,
+        lightweight: bool = True,
+        priority: int = 0,
+    ) -> "asset_composition.PrefetchRequest":
+        """
+        This will resolve and cache the children of this asset on the compositors
+        prefetch worker pool, meaning a later call to compositor.get for a child
+        will not need to perform any binding.
+
+        Args:
+            depth: How many levels to resolve. One resolves the children, two
+                resolves the children and grandchildren.
+            lightweight: If True the children are resolved in lightweight form
+            priority: Lower values are resolved first, so visible nodes should
+                be given a lower value than nodes which are not yet visible.
+
+        Returns:
+            PrefetchRequest which can be used to cancel the outstanding work
+        """
+        return self.compositor.prefetcher.schedule_children(
+            self,
+            depth=depth,
+            lightweight=lightweight,
+            priority=priority,
+        )
+
     def traits(self) -> list:
         """
         Returns a list of the trait classes bound to this asset
         """
         return self.components()
 
+    def method_cost(self, method_name: str) -> float:
+        """
+        Returns the cost (in microseconds) of calling the given composite
+        method, which is the sum of its cost for each bound trait implementing
+        it. This allows callers to defer methods which are expensive for this
+        particular asset.
+        """
+        costs = self.compositor.configuration.costs
+
+        return sum(
+            costs.method_cost(type(trait), method_name)
+            for trait in self._components
+            if hasattr(trait, method_name)
+        )
+
     def trait_names(self) -> list:
         """
         Returns a list of trait names which are bound to this asset
@@ -185,6 +313,106 @@ class Asset(xcomposite.Composition):
         """
         return ""
 
+    # -- The composite forms of children and parent are kept under private
+    # -- names, as the public methods first look to the hierarchy recorded
+    # -- by the compositor
+    _composite_children = children
+    _composite_parent = parent
+
+    def children(self) -> list:
+        """
+        Returns the identifiers of the children of this asset. If the
+        compositor is recording the hierarchy, and this asset is cached by it,
+        these are then taken from the hierarchy until this asset is
+        invalidated or the record expires.
+        """
+        hierarchy = self.compositor._hierarchy(self)
+
+        if hierarchy is None:
+            return self._composite_children()
+
+        children = hierarchy.children(self._identifier)
+
+        if children is None:
+            children = self._composite_children()
+            hierarchy.record_children(self._identifier, children)
+
+        return list(children)
+
+    def parent(self) -> str:
+        """
+        Returns the identifier of the parent of this asset. This is taken from
+        the hierarchy recorded by the compositor if it is known, which it is
+        for any asset found through the children of its parent.
+        """
+        hierarchy = self.compositor._hierarchy(self)
+
+        if hierarchy is None:
+            return self._composite_parent()
+
+        parent = hierarchy.parent(self._identifier)
+
+        if parent is _hierarchy.UNKNOWN:
+            parent = self._composite_parent()
+            hierarchy.record_parent(self._identifier, parent)
+
+        return parent
+
+    def ancestors(self) -> list:
+        """
+        Returns the identifiers of the ancestors of this asset, starting with
+        its parent. If the compositor is recording the hierarchy these are
+        held once worked out, so asking again (for this asset or any of its
+        ancestors) is a single lookup.
+        """
+        hierarchy = self.compositor._hierarchy(self)
+
+        # -- Without a recorded hierarchy we simply walk up through the
+        # -- parents, treating a parent we have already passed as the top
+        if hierarchy is None:
+            ancestors = list()
+            parent = self.parent()
+
+            while parent and parent != self._identifier and parent not in ancestors:
+                ancestors.append(parent)
+                parent = self.compositor._resolve_parent(parent, self._lightweight)
+
+            return ancestors
+
+        hierarchy.record_parent(self._identifier, self.parent())
+
+        return list(
+            hierarchy.ancestors(
+                self._identifier,
+                lambda identifier: self.compositor._resolve_parent(
+                    identifier,
+                    self._lightweight,
+                ),
+            ),
+        )
+
+    def siblings(self) -> list:
+        """
+        Returns the identifiers of the other children of the parent of this
+        asset
+        """
+        parent = self.parent()
+
+        if not parent:
+            return list()
+
+        hierarchy = self.compositor._hierarchy(self)
+        siblings = hierarchy.siblings(self._identifier) if hierarchy else None
+
+        if siblings is None:
+            siblings = [
+                child
+                for child in self.compositor._asset(parent, self._lightweight).children()
+                if child != self._identifier
+            ]
+
+        return list(siblings)
+
     @xcomposite.any_true
     def pull(self) -> bool:
         """
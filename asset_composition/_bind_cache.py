@@ -0,0 +1,112 @@
+# ----------------------------------------------------------------------------
+# Copyright (c) Studio Gobo Ltd 2025
+# Licensed under the MIT license.
+# See LICENSE.TXT in the project root for license information.
+# ----------------------------------------------------------------------------
+# File			-> _bind_cache.py
+# Created		-> March 2025
+# Author		-> Michael Malinowski (Studio Gobo)
+# ----------------------------------------------------------------------------
+import typing
+
+from . import _cache
+
+
+class NegativeBindCache:
+    """
+    Remembers, for a short time, which traits could not bind to which
+    identifiers. Identifiers which are requested repeatedly but which most
+    traits cannot bind to (such as deleted paths or urls no trait recognises)
+    then skip the predicates which have already said no.
+
+    Entries are held against the identifier, and also against any bind keys
+    the trait declares. A bind key is a function of the identifier (such as
+    its extension) for which the trait guarantees that every identifier with
+    the same key gives the same answer, so one failed predicate can answer
+    for many identifiers.
+
+    Args:
+        max_entries: The maximum number of entries to hold
+        ttl: The number of seconds an entry is trusted for
+    """
+
+    def __init__(self, max_entries: int = 65536, ttl: float = 30.0):
+        self._entries: _cache.TTLCache = _cache.TTLCache(
+            max_entries=max_entries,
+            ttl=ttl,
+        )
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def cannot_bind(self, trait, identifier: str) -> bool:
+        """
+        Returns True if the trait is known to be unable to bind to the given
+        identifier
+        """
+        if (trait, None, identifier) in self._entries:
+            return True
+
+        for index, bind_key in enumerate(trait.bind_keys):
+            if (trait, index, bind_key(identifier)) in self._entries:
+                return True
+
+        return False
+
+    def add(self, trait, identifier: str) -> None:
+        """
+        Records that the trait could not bind to the given identifier
+        """
+        if not trait.negative_bind_cache:
+            return
+
+        self._entries.set((trait, None, identifier), True)
+
+        for index, bind_key in enumerate(trait.bind_keys):
+            self._entries.set((trait, index, bind_key(identifier)), True)
+
+    def invalidate(
+        self,
+        identifiers: typing.Iterable[str],
+        recursive: bool = False,
+    ) -> int:
+        """
+        Forgets what is known about the given identifiers.
+
+        Entries held against a bind key answer for identifiers we cannot list,
+        so when invalidating recursively every one of them is forgotten.
+        Otherwise only those sharing a key with a given identifier are.
+
+        Returns:
+            The number of entries removed
+        """
+        identifiers = set(identifiers)
+        prefixes = tuple(identifier.rstrip("/") + "/" for identifier in identifiers)
+
+        # -- Gather the keys of the given identifiers, for every trait which
+        # -- has entries held against a key
+        keys = set()
+
+        if not recursive:
+            traits = {key[0] for key in self._entries.keys() if key[1] is not None}
+
+            for trait in traits:
+                for index, bind_key in enumerate(trait.bind_keys):
+                    for identifier in identifiers:
+                        keys.add((trait, index, bind_key(identifier)))
+
+        def is_affected(key: tuple) -> bool:
+            if key[1] is not None:
+                return recursive or key in keys
+
+            return key[2] in identifiers or (
+                recursive and key[2].startswith(prefixes)
+            )
+
+        return self._entries.discard_if(is_affected)
+
+    def clear(self) -> None:
+        """
+        Forgets everything held
+        """
+        self._entries.clear()
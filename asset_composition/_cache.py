@@ -0,0 +1,193 @@
+# ----------------------------------------------------------------------------
+# Copyright (c) Studio Gobo Ltd 2025
+# Licensed under the MIT license.
+# See LICENSE.TXT in the project root for license information.
+# ----------------------------------------------------------------------------
+# File			-> _cache.py
+# Created		-> March 2025
+# Author		-> Michael Malinowski (Studio Gobo)
+# ----------------------------------------------------------------------------
+import collections
+import os
+import threading
+import time
+
+
+def cache_directory(*parts: str) -> str:
+    """
+    Returns the folder which caches should be written to by default. This
+    can be controlled through the ASSET_COMPOSITION_CACHE environment variable
+    and otherwise falls back to a folder within the cache directory of the
+    current user ($XDG_CACHE_HOME, or ~/.cache, or %LOCALAPPDATA% on Windows).
+
+    The folder is created so only the current user can access it, as the
+    caches within it are trusted when read back. If the default folder
+    already exists but belongs to another user a PermissionError is raised.
+
+    Args:
+        parts: Optional sub folder names to append
+
+    Returns:
+        Absolute path to the folder
+    """
+    root = os.environ.get("ASSET_COMPOSITION_CACHE")
+
+    if root:
+        _ensure_private_directory(root, check_owner=False)
+
+    else:
+        root = os.path.join(_user_cache_root(), "asset_composition")
+        _ensure_private_directory(root, check_owner=True)
+
+    return os.path.join(root, *parts)
+
+
+def _user_cache_root() -> str:
+    """
+    Returns the folder the platform expects the current user to keep caches
+    within
+    """
+    if os.name == "nt":
+        return os.environ.get("LOCALAPPDATA") or os.path.expanduser("~")
+
+    return os.environ.get("XDG_CACHE_HOME") or os.path.join(
+        os.path.expanduser("~"),
+        ".cache",
+    )
+
+
+def _ensure_private_directory(directory: str, check_owner: bool) -> None:
+    """
+    Creates the directory (if it does not exist) so that only the current
+    user can access it. When check_owner is True, an existing directory must
+    belong to the current user and not be writable by anyone else.
+    """
+    try:
+        os.makedirs(directory, mode=0o700, exist_ok=True)
+
+    except OSError:
+        # -- Leave the consumer of the cache to report that it cannot be
+        # -- written to
+        return
+
+    # -- Ownership cannot be checked this way on Windows, where the folder
+    # -- is within the profile of the user anyway
+    if not check_owner or not hasattr(os, "getuid"):
+        return
+
+    status = os.stat(directory)
+
+    if status.st_uid != os.getuid() or status.st_mode & 0o022:
+        raise PermissionError(
+            f"The cache directory {directory} must belong to the current "
+            f"user and not be writable by anyone else",
+        )
+
+
+class TTLCache:
+    """
+    A thread safe, size bounded, in-memory cache. When the cache is full the
+    least recently used entry is removed, and entries can optionally expire
+    after a given number of seconds.
+
+    Args:
+        max_entries: The maximum number of entries to hold
+        ttl: The default number of seconds an entry lives for. If None then
+            entries do not expire.
+    """
+
+    _MISSING = object()
+
+    def __init__(self, max_entries: int = 1024, ttl: float | None = None):
+        self._max_entries: int = max_entries
+        self._ttl: float | None = ttl
+        self._entries: collections.OrderedDict = collections.OrderedDict()
+        self._lock: threading.Lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key) -> bool:
+        return self.get(key, self._MISSING) is not self._MISSING
+
+    def get(self, key, default=None):
+        """
+        Returns the value stored against the key, or the default if there is
+        no value or the value has expired.
+        """
+        with self._lock:
+            try:
+                value, expires = self._entries[key]
+
+            except KeyError:
+                return default
+
+            if expires is not None and expires < time.monotonic():
+                del self._entries[key]
+                return default
+
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl: float | None = _MISSING) -> None:
+        """
+        Stores the value against the key.
+
+        Args:
+            key: The key to store the value against
+            value: The value to store
+            ttl: Number of seconds the value should live for. If not given the
+                default for the cache is used.
+        """
+        if ttl is self._MISSING:
+            ttl = self._ttl
+
+        expires = None if ttl is None else time.monotonic() + ttl
+
+        with self._lock:
+            self._entries[key] = (value, expires)
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+    def pop(self, key, default=None):
+        """
+        Removes the given key, returning its value
+        """
+        with self._lock:
+            entry = self._entries.pop(key, None)
+
+        return default if entry is None else entry[0]
+
+    def discard_if(self, test) -> int:
+        """
+        Removes every entry whose key passes the given test
+
+        Args:
+            test: Callable which is given each key
+
+        Returns:
+            The number of entries removed
+        """
+        with self._lock:
+            keys = [key for key in self._entries if test(key)]
+
+            for key in keys:
+                del self._entries[key]
+
+        return len(keys)
+
+    def keys(self) -> list:
+        """
+        Returns a list of the keys held within the cache
+        """
+        with self._lock:
+            return list(self._entries)
+
+    def clear(self) -> None:
+        """
+        Removes all the entries from the cache
+        """
+        with self._lock:
+            self._entries.clear()
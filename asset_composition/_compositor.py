@@ -7,23 +7,158 @@
 # Created		-> March 2025
 # Author		-> Michael Malinowski (Studio Gobo)
 # ----------------------------------------------------------------------------
+import collections
+import concurrent.futures
 import functools
+import heapq
+import itertools
+import os
+import threading
+import time
+import typing
+import weakref
 
-from . import _asset, _config
+import signalling
+
+from . import (
+    _asset,
+    _bind_cache,
+    _cache,
+    _config,
+    _hierarchy,
+    _loader,
+    _prefetch,
+    _shared_cache,
+    _snapshot,
+    _table,
+)
+
+# -- When the compositor is rebuilt within a worker process we hold it
+# -- here so that every task handled by that worker shares the same
+# -- factories rather than re-scanning the plugin paths each time.
+_WORKER_COMPOSITOR: "Compositor | None" = None
+
+# -- The number of locks the assets being resolved through get are spread over
+_LOCK_STRIPES: int = 64
 
 
 class Compositor:
     """
     The compositor is a class which contains the accessors
     to all the factories.
+
+    A compositor can be shared between threads. Concurrent calls to get for
+    the same asset are single-flight, meaning the asset is bound by the first
+    thread whilst the others wait for it and are given the same asset. The
+    requests being resolved are spread over a number of locks, so threads
+    resolving unrelated assets rarely wait on one another. See the Asset class
+    for how binding and composite calls behave across threads.
     """
 
-    def __init__(self, configuration: _config.Configuration | None = None):
+    def __init__(
+        self,
+        configuration: _config.Configuration | None = None,
+        search_cache_ttl: float = 0.0,
+        shared_cache: _shared_cache.SharedCache | None = None,
+        negative_bind_ttl: float = 0.0,
+        hierarchy_ttl: float = 0.0,
+        snapshot_results: bool = False,
+    ):
         self.configuration: _config.Configuration = (
             configuration or _config.Configuration()
         )
 
-    @functools.cache
+        # -- If given a ttl, the identifiers found by each discovery plugin are
+        # -- cached against the plugin, query and search location for that many
+        # -- seconds, so that repeated searches (such as those from a search
+        # -- box) do not re-run every plugin. This is off by default, as unless
+        # -- the changed locations are invalidated (such as by a watcher) files
+        # -- added or removed are not seen until the results expire.
+        self._search_cache: _cache.TTLCache | None = None
+
+        if search_cache_ttl:
+            self._search_cache = _cache.TTLCache(max_entries=256, ttl=search_cache_ttl)
+
+        # -- If given a ttl, the traits which could not bind to an identifier
+        # -- are remembered for that long, so requesting it again (or another
+        # -- identifier with the same bind keys) skips their predicates. This
+        # -- is off by default, as a trait which says no to an identifier may
+        # -- say yes once the data behind it changes.
+        self._negative_binds: _bind_cache.NegativeBindCache | None = None
+
+        if negative_bind_ttl:
+            self._negative_binds = _bind_cache.NegativeBindCache(ttl=negative_bind_ttl)
+
+        # -- If given a ttl, the parent and children of each cached asset are
+        # -- recorded as they are resolved, for that many seconds. Lightweight
+        # -- and full assets are recorded separately as their traits (and
+        # -- therefore answers) can differ. This is off by default, as without
+        # -- invalidation a recorded hierarchy does not see changes on disk.
+        self._hierarchies: dict | None = None
+
+        if hierarchy_ttl:
+            self._hierarchies = {
+                False: _hierarchy.Hierarchy(ttl=hierarchy_ttl),
+                True: _hierarchy.Hierarchy(ttl=hierarchy_ttl),
+            }
+
+        # -- Assets resolved through get are cached against their identifier
+        # -- and lightweight state so that repeated requests return the same
+        # -- asset class
+        self._assets: dict = dict()
+
+        # -- We hold a weak reference to every asset this compositor creates,
+        # -- cached or not, so that we can notify them when they are invalidated
+        self._live_assets: weakref.WeakSet = weakref.WeakSet()
+
+        # -- Guards the live assets (which are added to whilst being iterated
+        # -- by invalidate) and the creation of the prefetcher
+        self._lock: threading.RLock = threading.RLock()
+
+        # -- Each stripe holds a lock and the assets currently being bound
+        # -- for the keys which fall within it
+        self._stripes: tuple = tuple(_Stripe() for _ in range(_LOCK_STRIPES))
+
+        # -- The prefetcher is only instanced when it is first needed
+        self._prefetcher: _prefetch.Prefetcher | None = None
+
+        # -- Incremented (with the lock held) whenever assets are invalidated.
+        # -- The generation at which each asset being bound was last
+        # -- invalidated is recorded, and an asset whose binding started
+        # -- before that may have been bound from stale data, so is not cached.
+        self._generation: int = 0
+        self._invalidated_flights: dict = dict()
+
+        # -- Record loaders are shared by name, allowing multiple traits to
+        # -- share the records they fetch
+        self._loaders: dict = dict()
+
+        # -- Records loaded from a snapshot which have not yet been requested,
+        # -- keyed in the same way as the asset cache, along with the traits
+        # -- which were available when it was loaded
+        self._snapshot: dict = dict()
+        self._snapshot_traits: dict = dict()
+
+        # -- If given, assets are restored from (and written to) a cache which
+        # -- is shared with other processes using the same configuration
+        self._shared_cache: _shared_cache.SharedCache | None = shared_cache
+
+        # -- If True, the assets resolved through get hold the results of
+        # -- their cacheable methods (until they are invalidated) so that
+        # -- save_snapshot can store them. This is off by default, as holding
+        # -- the results costs memory, and a snapshot otherwise holds only
+        # -- the binding of each asset.
+        self._snapshot_results: bool = snapshot_results
+
+        # -- When the configuration changes we drop only what the change
+        # -- affects, rather than everything
+        self.configuration.changed.connect(self._configuration_changed)
+
+        # -- This is emitted with the list of identifiers whenever assets are
+        # -- invalidated, allowing any caches or indexes built on top of the
+        # -- compositor to drop their stale entries too
+        self.invalidated: signalling.Signal = signalling.Signal()
+
     def get(
         self,
         identifier: str,
@@ -39,42 +174,1197 @@ class Compositor:
         Returns:
             Asset
         """
-        return _asset.Asset(
-            identifier=identifier,
-            lightweight=lightweight,
-            compositor=self,
+        key = (identifier, lightweight)
+        stripe = self._stripes[hash(key) % _LOCK_STRIPES]
+
+        while True:
+            try:
+                return self._assets[key]
+
+            except KeyError:
+                pass
+
+            with stripe.lock:
+                asset = self._assets.get(key)
+
+                if asset is not None:
+                    return asset
+
+                flight = stripe.flights.get(key)
+
+                if flight is None:
+                    flight = stripe.flights[key] = threading.Event()
+                    break
+
+            # -- Another thread is binding this asset, so we wait for it and
+            # -- then take the asset it cached. If it failed, or the asset was
+            # -- invalidated in the meantime, we go round again.
+            flight.wait()
+
+        try:
+            generation = self._generation
+            asset = self._restore_asset(identifier, lightweight)
+
+            if asset is None:
+                asset = self._create_asset(identifier, lightweight, share=True)
+
+            # -- If the asset was invalidated whilst we were binding it then
+            # -- the caller is still given it, but it is not cached, so the
+            # -- next request binds it again
+            with self._lock:
+                invalidated = self._invalidated_flights.pop(key, generation)
+
+                if invalidated <= generation:
+                    self._assets[key] = asset
+
+        except BaseException:
+            with self._lock:
+                self._invalidated_flights.pop(key, None)
+
+            raise
+
+        finally:
+            with stripe.lock:
+                stripe.flights.pop(key, None)
+
+            flight.set()
+
+        return asset
+
+    def get_many(
+        self,
+        identifiers: typing.Iterable[str],
+        lightweight: bool = False,
+        workers: int = 1,
+    ) -> list:
+        """
+        Resolves the asset for each of the given identifiers, in the same way
+        as get.
+
+        Args:
+            identifiers: Identifiers of the assets
+            lightweight: If True the assets are bound in lightweight form
+            workers: The number of threads to resolve the assets on. Binding
+                which waits on the disk or network benefits from more than
+                one, and on a free-threaded build of python so does binding
+                which is cpu bound.
+
+        Returns:
+            List of assets, in the same order as the identifiers
+        """
+        identifiers = list(identifiers)
+
+        if workers <= 1 or len(identifiers) < 2:
+            return [self.get(identifier, lightweight) for identifier in identifiers]
+
+        with concurrent.futures.ThreadPoolExecutor(
+            max_workers=min(workers, len(identifiers)),
+        ) as executor:
+            return list(
+                executor.map(
+                    functools.partial(self.get, lightweight=lightweight),
+                    identifiers,
+                ),
+            )
+
+    def is_cached(self, identifier: str, lightweight: bool = False) -> bool:
+        """
+        Returns True if an asset for the given identifier has already been
+        resolved and cached by this compositor.
+        """
+        return (identifier, lightweight) in self._assets
+
+    def invalidate(
+        self,
+        identifiers: list,
+        recursive: bool = False,
+        rebind: bool = False,
+    ) -> None:
+        """
+        This should be called whenever the information behind an asset has
+        changed. Any cached assets for the given identifiers are removed from
+        the cache, and any asset classes which are still alive will have their
+        changed signal emitted.
+
+        Args:
+            identifiers: List of identifiers which have changed
+            recursive: If True any identifier which sits below one of the given
+                identifiers (using "/" as the separator) is invalidated too
+            rebind: If True the traits of any live assets are re-bound and their
+                status_changed signal is emitted. This should be used when the
+                change may affect which traits can bind, such as a file being
+                created or deleted.
+        """
+        identifiers = list(identifiers)
+
+        if not identifiers:
+            return
+
+        exact = set(identifiers)
+
+        def is_affected(identifier: str) -> bool:
+            if identifier in exact:
+                return True
+
+            if recursive:
+                for changed in identifiers:
+                    if identifier.startswith(changed.rstrip("/") + "/"):
+                        return True
+
+            return False
+
+        # -- Remove the cached assets, and mark any affected assets which are
+        # -- being bound right now. This is done with the lock held, so each
+        # -- of those is either cached before we remove it, or not cached.
+        with self._lock:
+            self._generation += 1
+
+            for key in list(self._assets):
+                if is_affected(key[0]):
+                    self._assets.pop(key, None)
+
+            for stripe in self._stripes:
+                with stripe.lock:
+                    flights = list(stripe.flights)
+
+                for key in flights:
+                    if is_affected(key[0]):
+                        self._invalidated_flights[key] = self._generation
+
+        for key in self._snapshot.copy():
+            if is_affected(key[0]):
+                self._snapshot.pop(key, None)
+
+        if self._negative_binds is not None:
+            self._negative_binds.invalidate(identifiers, recursive)
+
+        if self._hierarchies is not None:
+            for hierarchy in self._hierarchies.values():
+                hierarchy.invalidate(identifiers, recursive)
+
+        if self._shared_cache is not None:
+            self._shared_cache.discard(
+                self.configuration.fingerprint(),
+                identifiers,
+                recursive,
+            )
+
+        # -- Notify any assets which are still being held onto
+        for asset in self._live():
+            if not is_affected(asset.identifier()):
+                continue
+
+            if isinstance(asset, _snapshot.RestoredAsset):
+                asset.forget()
+
+            if rebind:
+                asset._perform_trait_binding(asset.is_lightweight())
+                asset.status_changed.emit()
+
+                # -- Having been bound again, the asset holds the current
+                # -- state and can be shared once more
+                if self._shared_cache is not None and isinstance(
+                    asset,
+                    _snapshot.RestoredAsset,
+                ):
+                    self._share_asset(asset)
+
+            asset.changed.emit()
+
+        # -- Let the discovery plugins update any indexes they hold
+        for discovery_plugin in self.configuration.discovery.plugins():
+            discovery_plugin.invalidate(identifiers)
+
+        # -- Any cached search which looked within one of the changed
+        # -- locations may no longer be correct
+        if self._search_cache is not None:
+            self._search_cache.discard_if(
+                lambda key: _roots_overlap(key[2], identifiers),
+            )
+
+        self.invalidated.emit(identifiers)
+
+    def save_snapshot(self, filepath: str) -> int:
+        """
+        Writes every asset cached by this compositor to a snapshot file, which
+        can be loaded by a later compositor to avoid binding them again.
+
+        Args:
+            filepath: The file to write the snapshot to
+
+        Returns:
+            The number of assets written
+        """
+        entries = dict()
+
+        # -- Records we have loaded but not yet needed are carried forward
+        for key, entry in self._snapshot.copy().items():
+            entries[key] = entry
+
+        for key, asset in self._assets.copy().items():
+            entry = _snapshot.record(asset)
+
+            if entry:
+                entries[key] = entry
+
+        _snapshot.write(
+            filepath,
+            self.configuration.fingerprint(),
+            list(entries.values()),
         )
 
+        return len(entries)
+
+    def load_snapshot(self, filepath: str) -> int:
+        """
+        Loads the assets held within a snapshot file. The assets are not bound
+        until they are requested through get, at which point they are checked
+        to ensure they have not changed since the snapshot was written.
+
+        Args:
+            filepath: The snapshot file to read
+
+        Returns:
+            The number of assets loaded. This is zero if the snapshot was
+            written with a different configuration.
+        """
+        entries = _snapshot.read(filepath, self.configuration.fingerprint())
+
+        if not entries:
+            return 0
+
+        for entry in entries:
+            key = (entry[0], entry[1])
+
+            if key not in self._assets:
+                self._snapshot[key] = entry
+
+        return len(entries)
+
+    def loader(
+        self,
+        name: str,
+        load: typing.Callable | None = None,
+        batch_load: typing.Callable | None = None,
+        **kwargs,
+    ) -> _loader.RecordLoader:
+        """
+        Returns the record loader with the given name, creating it if it does
+        not yet exist. Traits which fetch the same records should use the same
+        name so that requests for the same key are only fetched once.
+
+        Args:
+            name: The unique name of the loader
+            load: Callable which is given a key and returns its record
+            batch_load: Callable which is given a list of keys and returns a
+                dictionary of key to record
+            kwargs: Any further arguments are passed to the RecordLoader when
+                it is created
+
+        Returns:
+            RecordLoader
+        """
+        loader = self._loaders.get(name)
+
+        if loader is None:
+            loader = self._loaders.setdefault(
+                name,
+                _loader.RecordLoader(load=load, batch_load=batch_load, **kwargs),
+            )
+
+        return loader
+
+    @property
+    def prefetcher(self) -> _prefetch.Prefetcher:
+        """
+        Accessor to the prefetch scheduler which resolves and caches assets
+        on a bounded pool of background threads.
+
+        Returns:
+            Prefetcher
+        """
+        if not self._prefetcher:
+            with self._lock:
+                if not self._prefetcher:
+                    prefetcher = _prefetch.Prefetcher(compositor=self)
+
+                    # -- The workers must not outlive the compositor, so if we
+                    # -- are garbage collected without being closed we stop
+                    # -- them (without waiting, as we may be collected on one)
+                    weakref.finalize(self, prefetcher.shutdown, False)
+
+                    self._prefetcher = prefetcher
+
+        return self._prefetcher
+
+    def close(self) -> None:
+        """
+        Stops the prefetch worker threads, cancelling any outstanding work.
+        The compositor can still be used afterwards, and prefetching again
+        starts new workers.
+        """
+        with self._lock:
+            prefetcher = self._prefetcher
+            self._prefetcher = None
+
+        if prefetcher:
+            prefetcher.shutdown()
+
+    def __enter__(self) -> "Compositor":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
     # TODO: need to clarify the argument types
-    def search(self, query, search_from=None) -> list:
+    def search(
+        self,
+        query,
+        search_from=None,
+        limit: int | None = None,
+        deadline: float | None = None,
+        sort: bool = True,
+    ) -> list:
         """This will run a search query using all available discovery plugins.
 
         Args:
             query (str): The string to search for. You may use wildcard characters
             search_from (_type_, optional): Location from which to perform the search. Defaults to None.
+            limit (int, optional): The maximum number of assets to return. Where
+                sort is True these are the first results in sorted order.
+            deadline (float, optional): Number of seconds after which the search
+                stops and returns what it has found so far. Plugins are given this
+                deadline, but one which does not check it cannot be interrupted.
+            sort (bool, optional): If True the results are sorted by identifier,
+                otherwise they are returned in the order the plugins found them,
+                which allows a limited search to stop as early as possible.
 
         Returns:
             list: List of found assets
         """
-        if not query:
+        if not query or limit == 0:
             return []
 
-        # -- This is where we will collate the results from each search
-        results = list()
+        if deadline is not None:
+            deadline = time.monotonic() + deadline
+
+        # -- Gather a stream of identifiers from each discovery plugin. These
+        # -- are generators, so no plugin does any work until we pull from it
+        streams = list()
 
-        # -- Cycle all our discovery plugins
         for discovery_plugin in self.configuration.discovery.plugins():
 
-            # -- Extend the results from the discovery plugin
-            results.extend(
-                discovery_plugin.search(
-                    query,
-                    search_from,
+            # -- A plugin can only cut its own search short if the results it
+            # -- yields first are the ones we would keep
+            can_limit = not sort or discovery_plugin.sorted_results
+
+            stream = self._search_plugin(
+                discovery_plugin,
+                query,
+                search_from,
+                max_results=limit if can_limit else None,
+                deadline=deadline,
+            )
+
+            if sort and not discovery_plugin.sorted_results:
+                stream = _sorted_stream(stream)
+
+            streams.append(stream)
+
+        # -- When sorting, every stream is already in order, so we can merge
+        # -- them as they go rather than collating and sorting everything
+        if sort:
+            merged = heapq.merge(*streams)
+
+        else:
+            merged = itertools.chain(*streams)
+
+        results = list()
+        seen = set()
+
+        try:
+            for identifier in merged:
+
+                # -- Ensure the results are unique
+                if identifier in seen:
+                    continue
+
+                seen.add(identifier)
+                results.append(identifier)
+
+                if limit is not None and len(results) >= limit:
+                    break
+
+                if deadline is not None and time.monotonic() >= deadline:
+                    break
+
+        finally:
+            # -- Close any streams we stopped part way through, so plugins
+            # -- can release what they hold (such as open connections)
+            for stream in streams:
+                stream.close()
+
+        # -- Only the results we are returning are converted to asset
+        # -- class instances
+        return [self._create_asset(identifier) for identifier in results]
+
+    def clear_search_cache(self) -> None:
+        """
+        Forgets all the cached search results, meaning the next search will
+        re-run every discovery plugin.
+        """
+        if self._search_cache is not None:
+            self._search_cache.clear()
+
+    def clear_negative_binds(self) -> None:
+        """
+        Forgets which traits could not bind to which identifiers, meaning the
+        next binding of any asset evaluates every predicate again.
+        """
+        if self._negative_binds is not None:
+            self._negative_binds.clear()
+
+    def _search_plugin(
+        self,
+        discovery_plugin,
+        query: str,
+        search_from,
+        max_results: int | None,
+        deadline: float | None,
+    ) -> typing.Iterator[str]:
+        """
+        Returns a stream of the identifiers the plugin finds for the query,
+        taking them from the search cache where possible.
+        """
+        key = None
+
+        if self._search_cache is not None:
+            key = (discovery_plugin, query, _search_roots(search_from))
+
+            try:
+                cached = self._search_cache.get(key)
+
+            # -- The search location cannot be used as a key
+            except TypeError:
+                key = cached = None
+
+            if key and cached is None:
+                cached = self._refine_search(discovery_plugin, query, search_from, key)
+
+            if cached is not None:
+                return _cached_stream(cached, max_results)
+
+        stream = discovery_plugin.iter_search(
+            query,
+            search_from,
+            max_results=max_results,
+            deadline=deadline,
+        )
+
+        if discovery_plugin.index is not None:
+            stream = _indexed_stream(discovery_plugin.index, stream)
+
+        if key is None:
+            return stream
+
+        return self._recorded_stream(key, stream, max_results, deadline)
+
+    def _refine_search(
+        self,
+        discovery_plugin,
+        query: str,
+        search_from,
+        key: tuple,
+    ) -> tuple | None:
+        """
+        Where a plugin declares its matching is monotone, any identifier it
+        finds for a query must also have been found for the shorter queries
+        which prefix it. This means if we hold the results for a prefix of the
+        query we can filter them rather than searching again.
+        """
+        if not discovery_plugin.monotone_matching:
+            return None
+
+        # -- Only literal characters and "*" can narrow a query as it grows.
+        # -- A bracket or "?" can widen it instead, such as "[t" (which only
+        # -- matches itself) becoming "[t]" (which matches any "t").
+        if any(character in query for character in "?[]"):
+            return None
+
+        plugin, _, roots = key
+
+        for length in range(len(query) - 1, 0, -1):
+            previous = self._search_cache.get((plugin, query[:length], roots))
+
+            if previous is None:
+                continue
+
+            refined = tuple(
+                identifier
+                for identifier in previous
+                if discovery_plugin.matches(query, search_from, identifier)
+            )
+            self._search_cache.set(key, refined)
+
+            return refined
+
+        return None
+
+    def _recorded_stream(
+        self,
+        key: tuple,
+        stream: typing.Iterator[str],
+        max_results: int | None,
+        deadline: float | None,
+    ) -> typing.Iterator[str]:
+        """
+        Passes through the given stream, caching the identifiers if the
+        stream runs to completion.
+        """
+        found = list()
+
+        for identifier in stream:
+            found.append(identifier)
+            yield identifier
+
+        # -- If the plugin stopped because it reached the limit or ran out of
+        # -- time then these are not all of the results, so we cannot cache them
+        if max_results is not None and len(found) >= max_results:
+            return
+
+        if deadline is not None and time.monotonic() >= deadline:
+            return
+
+        self._search_cache.set(key, tuple(found))
+
+    def _restore_asset(
+        self,
+        identifier: str,
+        lightweight: bool,
+    ) -> "asset_composition.Asset | None":
+        """
+        Returns an asset restored from the loaded snapshot, or None if the
+        snapshot does not hold it or it has changed since.
+        """
+        entry = self._snapshot.pop((identifier, lightweight), None)
+        version = None
+
+        if entry is None and self._shared_cache is not None:
+            stored = self._shared_cache.get(
+                self.configuration.fingerprint(),
+                identifier,
+                lightweight,
+            )
+
+            if stored:
+                entry, version = stored
+
+        if entry is None:
+            return None
+
+        traits = _snapshot.current_traits(entry, self._traits_by_name())
+
+        if traits is None:
+            return None
+
+        asset = _snapshot.RestoredAsset(
+            identifier,
+            compositor=self,
+            lightweight=lightweight,
+            traits=traits,
+            results=entry[4],
+            hold_results=self._snapshot_results,
+        )
+        self._track(asset)
+
+        # -- Results resolved from here on are written back to the shared
+        # -- cache against the record we restored from
+        if version is not None:
+            asset._on_result = functools.partial(self._shared_cache.put_result, version)
+
+        return asset
+
+    def _create_asset(
+        self,
+        identifier: str,
+        lightweight: bool = False,
+        share: bool = False,
+    ) -> "asset_composition.Asset":
+        """
+        All asset classes created by the compositor are created through this
+        method so they can be tracked for invalidation.
+
+        Args:
+            identifier: Identifier of the asset
+            lightweight: Whether only lightweight traits should be bound
+            share: If True, and the compositor has a shared cache, the asset
+                is written to the shared cache along with any results it
+                resolves. If the compositor holds results for snapshots, the
+                asset holds the results it resolves.
+        """
+        if share and (self._shared_cache is not None or self._snapshot_results):
+            asset = _snapshot.RestoredAsset(
+                identifier,
+                compositor=self,
+                lightweight=lightweight,
+                traits=None,
+                results=dict(),
+                hold_results=self._snapshot_results,
+            )
+
+            if self._shared_cache is not None:
+                self._share_asset(asset)
+
+        else:
+            asset = _asset.Asset(
+                identifier=identifier,
+                lightweight=lightweight,
+                compositor=self,
+            )
+
+        self._track(asset)
+
+        return asset
+
+    def _asset(self, identifier: str, lightweight: bool) -> "asset_composition.Asset":
+        """
+        Returns the cached asset if we have one, otherwise we bind a new asset
+        which is not cached
+        """
+        return self._assets.get(
+            (identifier, lightweight)
+        ) or self._create_asset(identifier, lightweight)
+
+    def _hierarchy(
+        self,
+        asset: "asset_composition.Asset",
+    ) -> _hierarchy.Hierarchy | None:
+        """
+        Returns the hierarchy recorded for assets of the same form as the
+        given asset, or None if the hierarchy is not being recorded or the
+        asset is not cached. Assets which are not cached (such as those bound
+        by walk) are released as soon as the caller is done with them, so
+        nothing is recorded for them either.
+        """
+        if self._hierarchies is None:
+            return None
+
+        lightweight = asset.is_lightweight()
+
+        if self._assets.get((asset.identifier(), lightweight)) is not asset:
+            return None
+
+        return self._hierarchies[bool(lightweight)]
+
+    def _resolve_parent(self, identifier: str, lightweight: bool) -> str:
+        """
+        Returns the parent of the given identifier
+        """
+        return self._asset(identifier, lightweight).parent()
+
+    def _track(self, asset: "asset_composition.Asset") -> None:
+        """
+        Holds a weak reference to the asset so it can be notified when it is
+        invalidated
+        """
+        with self._lock:
+            self._live_assets.add(asset)
+
+    def _live(self) -> list:
+        """
+        Returns the assets created by this compositor which are still alive
+        """
+        with self._lock:
+            return list(self._live_assets)
+
+    def _share_asset(self, asset: "_snapshot.RestoredAsset") -> None:
+        """
+        Writes the binding of the given asset to the shared cache, and has the
+        asset write any results it resolves from here on.
+        """
+        entry = _snapshot.profile(asset)
+
+        if entry is None:
+            return
+
+        version = self._shared_cache.put(self.configuration.fingerprint(), entry)
+
+        if version is not None:
+            asset._on_result = functools.partial(self._shared_cache.put_result, version)
+
+    def _configuration_changed(
+        self,
+        traits: list | None,
+        discoveries: list | None,
+    ) -> None:
+        """
+        Called whenever the configuration changes, along with the identifiers
+        of the traits and discovery plugins which changed (or None if these are
+        not known).
+        """
+        self._snapshot_traits = dict()
+
+        # -- The recorded hierarchy was resolved by the previous traits
+        if traits is None or traits:
+            if self._hierarchies is not None:
+                for hierarchy in self._hierarchies.values():
+                    hierarchy.clear()
+
+        # -- Where we are not told what changed we have to assume everything
+        # -- did, so every search is run again and every asset bound again
+        if traits is None and discoveries is None:
+            self._snapshot.clear()
+            self.clear_search_cache()
+            self.clear_negative_binds()
+
+            with self._lock:
+                identifiers = {key[0] for key in self._assets}
+
+            identifiers.update(asset.identifier() for asset in self._live())
+
+            self.invalidate(sorted(identifiers), rebind=True)
+            return
+
+        if discoveries and self._search_cache is not None:
+            self._search_cache.discard_if(
+                lambda key: getattr(key[0], "__name__", None) in discoveries,
+            )
+
+        if not traits:
+            return
+
+        # -- The records loaded from a snapshot were bound under the previous
+        # -- configuration, so we can no longer trust them
+        self._snapshot.clear()
+
+        available = {
+            trait.__name__: trait
+            for trait in self.configuration.ordered_traits()
+        }
+        changed = set(traits)
+
+        affected = set()
+
+        for asset in self._live():
+            identifier = asset.identifier()
+
+            if identifier in affected:
+                continue
+
+            bound = set(asset.trait_names())
+
+            # -- Assets are affected if one of their traits changed or was
+            # -- removed, or if a trait which is now available can bind to them
+            if bound & changed or _can_bind_any(
+                [
+                    available[name]
+                    for name in changed - bound
+                    if name in available
+                ],
+                identifier,
+                asset.is_lightweight(),
+            ):
+                affected.add(identifier)
+
+        if affected:
+            self.invalidate(sorted(affected), rebind=True)
+
+    def _traits_by_name(self) -> dict:
+        """
+        Returns a dictionary of trait name to trait class. Looking traits up
+        by name through the factory is comparatively slow, so this is only
+        built when first needed after the configuration changes.
+        """
+        if not self._snapshot_traits:
+            self._snapshot_traits = {
+                trait.__name__: trait
+                for trait in self.configuration.ordered_traits()
+            }
+
+        return self._snapshot_traits
+
+    def walk(
+        self,
+        root: "str | asset_composition.Asset",
+        max_depth: int | None = None,
+        predicate: typing.Callable | None = None,
+        lightweight: bool = False,
+        order: str = "bfs",
+    ) -> typing.Iterator[tuple]:
+        """
+        This will traverse the hierarchy below the given root, yielding a tuple
+        of (depth, asset) for each asset it visits. The root is given a depth of
+        zero.
+
+        Only identifiers are held whilst traversing, and assets are not added to
+        the compositor cache, so an asset is released as soon as the caller is
+        done with it. This allows very large hierarchies to be traversed without
+        holding every asset in memory.
+
+        Args:
+            root: The asset or identifier to start the traversal from
+            max_depth: If given, assets deeper than this will not be visited
+            predicate: A callable which is given each asset and should return
+                False if the asset (and everything below it) should be skipped.
+                By default any asset which is not visible or not valid is skipped.
+            lightweight: If True the assets are bound in lightweight form
+            order: Either "bfs" for breadth first or "dfs" for depth first
+
+        Returns:
+            Generator of (depth, asset) tuples
+        """
+        if order not in ("bfs", "dfs"):
+            raise ValueError(f"order must be 'bfs' or 'dfs', not {order}")
+
+        if isinstance(root, _asset.Asset):
+            root = root.identifier()
+
+        predicate = predicate or _is_visible_and_valid
+
+        # -- Each pending item stores its depth, its identifier and its lineage.
+        # -- The lineage is a linked chain of (identifier, parent_lineage) tuples
+        # -- which lets us detect cycles by only looking at the ancestors of an
+        # -- item, rather than remembering every identifier we have visited.
+        pending = collections.deque([(0, root, None)])
+
+        # -- Breadth first takes from the front of the queue whilst depth first
+        # -- takes from the back
+        take = pending.popleft if order == "bfs" else pending.pop
+
+        while pending:
+            depth, identifier, lineage = take()
+
+            asset = self._asset(identifier, lightweight)
+
+            if not predicate(asset):
+                continue
+
+            yield depth, asset
+
+            if max_depth is not None and depth >= max_depth:
+                continue
+
+            lineage = (identifier, lineage)
+            children = [
+                child
+                for child in asset.children()
+                if not _in_lineage(child, lineage)
+            ]
+
+            # -- Depth first takes from the back, so we add the children in
+            # -- reverse to ensure they are visited in the order given
+            if order == "dfs":
+                children.reverse()
+
+            pending.extend((depth + 1, child, lineage) for child in children)
+
+    def map(
+        self,
+        assets_or_identifiers: typing.Iterable,
+        method_name: str,
+        workers: int | None = None,
+        lightweight: bool = False,
+        chunksize: int = 16,
+    ) -> typing.Iterator:
+        """
+        This will call the given composite method on each asset and yield the
+        results in the same order as the assets were given. The work is spread
+        over a pool of processes, which makes it suitable for traits which perform
+        cpu heavy work (such as parsing file headers) that would otherwise be
+        serialised by the GIL.
+
+        Each worker process rebuilds its own Compositor from the serialised
+        Configuration, therefore only traits which are discoverable through the
+        configuration paths will be bound, and every result must be picklable.
+
+        Args:
+            assets_or_identifiers: Iterable of Asset classes or identifiers
+            method_name: The name of the composite method to call, such as
+                "custom_data"
+            workers: The number of processes to use. If None the cpu count is
+                used. If this is one or less the work is done within the current
+                process.
+            lightweight: If True only lightweight traits will be bound to the
+                assets resolved within the workers
+            chunksize: How many assets are sent to a worker in one go
+
+        Returns:
+            Generator of results
+        """
+        identifiers = (
+            item.identifier() if isinstance(item, _asset.Asset) else item
+            for item in assets_or_identifiers
+        )
+
+        workers = workers or os.cpu_count() or 1
+
+        # -- There is no benefit to spinning up a process pool for a single
+        # -- worker, so we resolve the assets directly
+        if workers <= 1:
+            for identifier in identifiers:
+                yield _call_asset_method(self, identifier, method_name, lightweight)
+            return
+
+        with concurrent.futures.ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_initialise_worker,
+            initargs=(self.configuration.serialise(save=False),),
+        ) as executor:
+            yield from executor.map(
+                functools.partial(
+                    _resolve_in_worker,
+                    method_name=method_name,
+                    lightweight=lightweight,
                 ),
+                identifiers,
+                chunksize=chunksize,
+            )
+
+    def table(
+        self,
+        identifiers_or_search,
+        columns: typing.Iterable[str],
+        search_from=None,
+        lightweight: bool = False,
+        workers: int = 1,
+    ) -> _table.AssetTable:
+        """
+        Resolves the given composite methods for every asset and returns the
+        results as a table of columns, which is far more compact than holding
+        an asset and a result per asset. Strings are dictionary encoded and
+        numbers and booleans are held in arrays, so with numpy available the
+        columns can be filtered and grouped in vectorised form.
+
+        Assets which are not already cached are bound without being added to
+        the cache, in the same way as walk.
+
+        Args:
+            identifiers_or_search: Either an iterable of assets or identifiers,
+                or a search query (as a string) whose results are used
+            columns: The names of the composite methods to call, such as
+                "label". A key within a method which returns a dictionary can
+                be given as "method.key", such as "custom_data.size"
+            search_from: The location to search from, when given a query
+            lightweight: If True the assets are bound in lightweight form
+            workers: The number of threads to resolve the assets on
+
+        Returns:
+            AssetTable holding one column per requested name
+        """
+        columns = list(dict.fromkeys(columns))
+
+        # -- Each method is only called once per asset, however many of its
+        # -- keys are requested
+        lookups = [column.partition(".")[::2] for column in columns]
+        method_names = list(dict.fromkeys(method_name for method_name, _ in lookups))
+
+        if isinstance(identifiers_or_search, str):
+            items = self.search(identifiers_or_search, search_from=search_from)
+
+        else:
+            items = list(identifiers_or_search)
+
+        def resolve(item) -> tuple:
+            if isinstance(item, _asset.Asset):
+                asset = item
+
+            else:
+                asset = self._asset(item, lightweight)
+
+            results = {
+                method_name: getattr(asset, method_name)()
+                for method_name in method_names
+            }
+
+            return asset.identifier(), tuple(
+                _table_value(results[method_name], key)
+                for method_name, key in lookups
             )
 
-        # -- Ensure the results are unique
-        unique_results = list(set(results))
+        if workers <= 1 or len(items) < 2:
+            rows = [resolve(item) for item in items]
+
+        else:
+            with concurrent.futures.ThreadPoolExecutor(
+                max_workers=min(workers, len(items)),
+            ) as executor:
+                rows = list(executor.map(resolve, items))
+
+        identifiers = [identifier for identifier, _ in rows]
+        values = list(zip(*(values for _, values in rows))) or [()] * len(columns)
+
+        return _table.AssetTable(
+            identifiers,
+            {
+                column: _table.build_column(list(column_values))
+                for column, column_values in zip(columns, values)
+            },
+        )
+
+
+def _is_visible_and_valid(asset: "asset_composition.Asset") -> bool:
+    """
+    Default walk predicate which skips any asset which is either hidden
+    or invalid.
+    """
+    return asset.is_visible() and asset.is_valid()
+
+
+def _table_value(result, key: str):
+    """
+    Returns the value held under the given key of a method result, or the
+    result itself if no key is given
+    """
+    if not key:
+        return result
+
+    if isinstance(result, dict):
+        return result.get(key)
+
+    return None
+
+
+def _in_lineage(identifier: str, lineage: tuple | None) -> bool:
+    """
+    Returns True if the identifier is within the given lineage chain
+    """
+    while lineage:
+        if lineage[0] == identifier:
+            return True
+        lineage = lineage[1]
+
+    return False
+
+
+def _call_asset_method(
+    compositor: Compositor,
+    identifier: str,
+    method_name: str,
+    lightweight: bool,
+):
+    """
+    Binds an asset for the given identifier and returns the result of calling
+    the given method on it. The asset is not cached, so it is released as soon
+    as the result has been taken.
+    """
+    asset = compositor._create_asset(identifier, lightweight)
+    return getattr(asset, method_name)()
+
+
+def _cached_stream(
+    identifiers: tuple,
+    max_results: int | None,
+) -> typing.Iterator[str]:
+    """
+    Yields the cached identifiers of a search, up to the given maximum
+    """
+    yield from identifiers[:max_results]
+
+
+def _indexed_stream(index, stream: typing.Iterator[str]) -> typing.Iterator[str]:
+    """
+    Passes through the given stream, adding every identifier to the index
+    """
+    for identifier in stream:
+        index.add(identifier)
+        yield identifier
+
+
+def _search_roots(search_from):
+    """
+    Returns the search location in a form which can be used as a key
+    """
+    if isinstance(search_from, (list, tuple)):
+        return tuple(search_from)
+
+    if isinstance(search_from, (set, frozenset)):
+        return tuple(sorted(search_from))
+
+    return search_from
+
+
+def _roots_overlap(roots, identifiers: list) -> bool:
+    """
+    Returns True if any of the identifiers sit within (or contain) any of
+    the search roots
+    """
+    if isinstance(roots, str):
+        roots = (roots,)
+
+    if not isinstance(roots, tuple):
+        return False
+
+    for root in roots:
+        if not isinstance(root, str):
+            continue
+
+        root = root.replace("\\", "/").rstrip("/") + "/"
+
+        for identifier in identifiers:
+            identifier = identifier.rstrip("/") + "/"
+
+            if identifier.startswith(root) or root.startswith(identifier):
+                return True
 
-        # -- Convert the results to asset class instances
-        return [_asset.Asset(p, compositor=self) for p in sorted(unique_results)]
+    return False
+
+
+class _Stripe:
+    """
+    A lock along with the assets being bound for the keys which share it
+    """
+
+    __slots__ = ("lock", "flights")
+
+    def __init__(self):
+        self.lock: threading.Lock = threading.Lock()
+        self.flights: dict = dict()
+
+
+def _can_bind_any(traits: list, identifier: str, lightweight: bool) -> bool:
+    for trait in traits:
+        if lightweight and not trait.lightweight:
+            continue
+
+        try:
+            if trait.can_bind(identifier):
+                return True
+
+        except Exception:
+            continue
+
+    return False
+
+
+def _sorted_stream(stream: typing.Iterator) -> typing.Iterator:
+    """
+    Collects the given stream and yields it in sorted order. This is used for
+    plugins which cannot yield their own results in order.
+    """
+    yield from sorted(stream)
+
+
+def _initialise_worker(configuration_data: dict) -> None:
+    """
+    Process pool initialiser which rebuilds the compositor from the serialised
+    configuration data.
+    """
+    global _WORKER_COMPOSITOR
+
+    configuration = _config.Configuration()
+    configuration.restore_from(configuration_data)
+
+    _WORKER_COMPOSITOR = Compositor(configuration=configuration)
+
+
+def _resolve_in_worker(identifier: str, method_name: str, lightweight: bool):
+    """
+    Process pool task which resolves a single method call using the compositor
+    held by the worker.
+    """
+    return _call_asset_method(
+        _WORKER_COMPOSITOR,
+        identifier,
+        method_name,
+        lightweight,
+    )
@@ -7,10 +7,22 @@
 # Created		-> March 2025
 # Author		-> Michael Malinowski (Studio Gobo)
 # ----------------------------------------------------------------------------
+import hashlib
+import importlib
+import importlib.machinery
+import inspect
 import json
+import logging
 import os
+import sys
+import threading
 
-from . import _discovery, _trait
+import factories
+import signalling
+
+from . import _cost, _discovery, _trait
+
+_log: logging.Logger = logging.getLogger(__name__)
 
 
 class Configuration:
@@ -29,6 +41,29 @@ class Configuration:
         self._discovery_factory: _discovery.DiscoveryFactory | None = None
         self._filepath: str | None = filepath
 
+        # -- The fingerprint is only calculated when first needed after the
+        # -- plugins change, along with the hash of each plugin module as it
+        # -- was when it was loaded
+        self._fingerprint: str | None = None
+        self._module_hashes: dict = dict()
+        self._reloading: bool = False
+
+        # -- The enabled traits in the order they bind, which is held as a
+        # -- tuple so it can be read by any thread without locking
+        self._ordered_traits: tuple | None = None
+        self._lock: threading.RLock = threading.RLock()
+
+        # -- The cost of each trait, and the order their predicates are
+        # -- evaluated in, along with the cost version it was worked out for
+        self.costs: _cost.CostModel = _cost.CostModel()
+        self._binding_plan: tuple | None = None
+
+        # -- This is emitted with the lists of trait and discovery identifiers
+        # -- which changed whenever the configuration is reloaded. Where the
+        # -- factories are changed directly we cannot tell what changed, and
+        # -- it is emitted with None for both.
+        self.changed: signalling.WeakSignal = signalling.WeakSignal()
+
         # -- If we're given a filepath and that filepath exists
         # -- then we load it from a file
         if filepath:
@@ -44,6 +79,29 @@ class Configuration:
         self._trait_factory = _trait.TraitFactory()
         self._discovery_factory = _discovery.DiscoveryFactory()
 
+        self._trait_factory.plugins_changed.connect(self._plugins_changed)
+        self._discovery_factory.plugins_changed.connect(self._plugins_changed)
+
+        self._plugins_changed()
+
+    def _plugins_changed(self) -> None:
+        with self._lock:
+            self._fingerprint = None
+            self._ordered_traits = None
+            self._binding_plan = None
+
+            # -- Hash any plugin modules we have not seen before, so we know
+            # -- what each one held at the point it was loaded
+            for factory in (self._trait_factory, self._discovery_factory):
+                for plugin in factory.plugins(include_disabled=True):
+                    filepath = _module_filepath(plugin)
+
+                    if filepath and filepath not in self._module_hashes:
+                        self._module_hashes[filepath] = _file_hash(filepath)
+
+        if not self._reloading:
+            self.changed.emit(None, None)
+
     # noinspection SpellCheckingInspection
     def _deserialise(self, filepath: str) -> None:
         """
@@ -56,13 +114,25 @@ class Configuration:
         if not os.path.exists(filepath):
             raise FileNotFoundError(filepath)
 
-        # -- Start by initialising the factory objects
-        self._initialise()
-
         # -- Read the data file
         with open(filepath, "r") as f:
             data: dict = json.load(f)
 
+        self.restore_from(data)
+
+    def restore_from(self, data: dict) -> None:
+        """
+        This will reset the configuration and populate it from the
+        dictionary form returned by serialise. This is particularly useful
+        when a configuration needs to be rebuilt somewhere other than where
+        it was created, such as within a worker process.
+
+        Args:
+            :data: Dictionary of serialised configuration data
+        """
+        # -- Start by initialising the factory objects
+        self._initialise()
+
         # -- Add all the factory paths
         for path in data["trait_paths"]:
             self.traits.add_path(path)
@@ -96,13 +166,256 @@ class Configuration:
         """
         return self._discovery_factory
 
-    def serialise(self, filepath=None) -> dict:
+    def ordered_traits(self) -> tuple:
+        """
+        Returns the enabled trait classes in the order they are bound, which
+        is by descending importance. This is worked out once each time the
+        plugins change, rather than every time an asset is bound.
+
+        Returns:
+            Tuple of Trait classes
+        """
+        traits = self._ordered_traits
+
+        if traits is None:
+            with self._lock:
+                if self._ordered_traits is None:
+                    self._ordered_traits = tuple(
+                        sorted(
+                            self.traits.plugins(),
+                            key=lambda t: t.importance,
+                            reverse=True,
+                        ),
+                    )
+
+                traits = self._ordered_traits
+
+        return traits
+
+    def binding_plan(self) -> tuple:
+        """
+        Returns the order in which the can_bind predicates of the traits are
+        evaluated. The traits are split into stages, each of which ends with
+        an exclusive trait (other than the last). If the exclusive trait binds
+        the later stages are skipped, as they hold the traits of lower
+        importance.
+
+        Within a stage every predicate has to be evaluated regardless, so
+        they are evaluated cheapest first. The order the traits are bound in
+        is not changed by this, which is always by importance.
+
+        Returns:
+            Tuple of stages, each a tuple of (position, trait) pairs where the
+            position is that of the trait within ordered_traits
+        """
+        version = self.costs.version()
+        plan = self._binding_plan
+
+        if plan is None or plan[0] != version:
+            with self._lock:
+                stages = list()
+                stage = list()
+
+                for position, trait in enumerate(self.ordered_traits()):
+                    stage.append((position, trait))
+
+                    if trait.exclusive:
+                        stages.append(stage)
+                        stage = list()
+
+                if stage:
+                    stages.append(stage)
+
+                plan = self._binding_plan = (
+                    version,
+                    tuple(
+                        tuple(
+                            sorted(
+                                stage,
+                                key=lambda item: self.costs.bind_cost(item[1]),
+                            ),
+                        )
+                        for stage in stages
+                    ),
+                )
+
+        return plan[1]
+
+    def fingerprint(self) -> str:
+        """
+        Returns a hash of this configuration, covering its paths, disabled
+        plugins, the plugins which are available and the hash of the module
+        each of those plugins was loaded from. Two configurations with the
+        same fingerprint will bind the same traits, which allows anything
+        cached against one to be used by the other.
+
+        Returns:
+            Hex digest string
+        """
+        fingerprint = self._fingerprint
+
+        if fingerprint is not None:
+            return fingerprint
+
+        with self._lock:
+            if self._fingerprint is None:
+                data = self.serialise(save=False)
+
+                data["traits"] = self._plugin_hashes(self.traits)
+                data["discoveries"] = self._plugin_hashes(self.discovery)
+
+                self._fingerprint = hashlib.sha256(
+                    json.dumps(data, sort_keys=True).encode("utf-8"),
+                ).hexdigest()
+
+            return self._fingerprint
+
+    def reload(self, filepath: str | None = None) -> dict:
+        """
+        Reads the configuration file again and applies only what differs
+        from the current state. Paths which were removed or added are removed
+        from or added to the factories, plugins are enabled or disabled, and
+        any path holding a plugin module which has changed since it was loaded
+        is loaded again. The factories themselves are kept, and the changed
+        signal is emitted with the identifiers of the plugins which changed.
+
+        Args:
+            :filepath: The configuration file to read. If not given the file
+                this configuration was last read from or saved to is used.
+
+        Returns:
+            Dictionary holding the lists of changed trait identifiers and
+            changed discovery identifiers under "traits" and "discoveries"
+        """
+        filepath = filepath or self._filepath
+
+        if not filepath or not os.path.exists(filepath):
+            raise FileNotFoundError(filepath)
+
+        with open(filepath, "r") as f:
+            data: dict = json.load(f)
+
+        self._filepath = filepath
+
+        before_traits = self._plugin_hashes(self.traits)
+        before_discoveries = self._plugin_hashes(self.discovery)
+
+        self._reloading = True
+
+        try:
+            self._reload_factory(
+                self.traits,
+                data["trait_paths"],
+                data["disabled_traits"],
+            )
+            self._reload_factory(
+                self.discovery,
+                data["discovery_paths"],
+                data["disabled_discoveries"],
+            )
+
+        finally:
+            self._reloading = False
+
+        changes = dict(
+            traits=_changed(before_traits, self._plugin_hashes(self.traits)),
+            discoveries=_changed(
+                before_discoveries,
+                self._plugin_hashes(self.discovery),
+            ),
+        )
+
+        if changes["traits"] or changes["discoveries"]:
+            self.changed.emit(changes["traits"], changes["discoveries"])
+
+        return changes
+
+    def _reload_factory(
+        self,
+        factory: "factories.Factory",
+        paths: list,
+        disabled: list,
+    ) -> None:
+        """
+        Brings the given factory in line with the given paths and disabled
+        plugin identifiers.
+        """
+        current_paths = factory.paths()
+
+        # -- Any path holding a plugin module which has changed on disk since
+        # -- it was loaded needs to be loaded again
+        stale_paths = set()
+        checked = set()
+
+        for plugin in factory.plugins(include_disabled=True):
+            filepath = _module_filepath(plugin)
+
+            if not filepath or filepath in checked:
+                continue
+
+            checked.add(filepath)
+
+            if _file_hash(filepath) == self._module_hashes.get(filepath):
+                continue
+
+            self._module_hashes.pop(filepath, None)
+
+            # -- Modules which were imported are held within sys.modules, and
+            # -- the factory would simply find them there again
+            module = sys.modules.get(plugin.__module__)
+
+            if module and not _is_direct_load(module):
+                try:
+                    importlib.reload(module)
+
+                # -- A module which fails to reload (such as one saved part
+                # -- way through an edit) keeps its previous plugins, but we
+                # -- report it rather than leave the user wondering why their
+                # -- change was not picked up
+                except Exception:
+                    _log.exception("Failed to reload plugin module %s", filepath)
+
+            for path in current_paths:
+                if _is_within(filepath, path):
+                    stale_paths.add(path)
+
+        for path in current_paths:
+            if path not in paths:
+                factory.remove_path(path)
+
+            elif path in stale_paths:
+                factory.remove_path(path)
+                factory.add_path(path)
+
+        for path in paths:
+            if path not in current_paths:
+                factory.add_path(path)
+
+        for identifier in factory.identifiers(include_disabled=True):
+            factory.set_disabled(identifier, identifier in disabled)
+
+    def _plugin_hashes(self, factory: "factories.Factory") -> dict:
+        """
+        Returns a dictionary of the identifier of each enabled plugin in the
+        given factory to the hash of the module it was loaded from.
+        """
+        results = dict()
+
+        for identifier in factory.identifiers():
+            filepath = _module_filepath(factory.request(identifier))
+            results[identifier] = self._module_hashes.get(filepath, "")
+
+        return results
+
+    def serialise(self, filepath=None, save: bool = True) -> dict:
         """
         This will write the state of the configuration to a json
         file.
 
         Args:
             :filepath: The absolute path to save the configuration file to
+            :save: If False the configuration data is only returned and
+                nothing is written to disk
 
         Return:
             Dictionary of saved data
@@ -123,6 +436,9 @@ class Configuration:
             ],
         )
 
+        if not save:
+            return data
+
         if filepath:
             self._filepath = filepath
 
@@ -137,3 +453,75 @@ class Configuration:
                     json.dump(data, f, indent=4, sort_keys=True)
 
         return data
+
+
+def _module_filepath(plugin: type) -> str | None:
+    """
+    Returns the file the given plugin was loaded from, if it has one
+    """
+    try:
+        return os.path.normpath(inspect.getfile(plugin))
+
+    except (TypeError, OSError):
+        return None
+
+
+def _file_hash(filepath: str) -> str:
+    try:
+        with open(filepath, "rb") as f:
+            return hashlib.sha256(f.read()).hexdigest()
+
+    except OSError:
+        return ""
+
+
+def _is_direct_load(module) -> bool:
+    """
+    Returns True if the factory loaded the module directly from its source
+    rather than importing it, in which case it is given a unique name which
+    cannot be imported again. A module is only considered imported if its
+    name can be found on the import path and leads back to the same file.
+    """
+    filepath = getattr(module, "__file__", None)
+
+    if not filepath:
+        return True
+
+    package, _, name = module.__name__.rpartition(".")
+    search_paths = None
+
+    if package:
+        search_paths = getattr(sys.modules.get(package), "__path__", None)
+
+        if search_paths is None:
+            return True
+
+    try:
+        spec = importlib.machinery.PathFinder.find_spec(name, search_paths)
+
+    except (ImportError, ValueError):
+        return True
+
+    if spec is None or not spec.origin:
+        return True
+
+    return os.path.normcase(os.path.abspath(spec.origin)) != os.path.normcase(
+        os.path.abspath(filepath),
+    )
+
+
+def _is_within(filepath: str, path: str) -> bool:
+    path = os.path.normpath(os.path.abspath(path))
+    return os.path.abspath(filepath).startswith(path + os.sep)
+
+
+def _changed(before: dict, after: dict) -> list:
+    """
+    Returns the sorted identifiers which were added, removed or whose
+    hash differs between the two dictionaries
+    """
+    return sorted(
+        identifier
+        for identifier in set(before) | set(after)
+        if before.get(identifier) != after.get(identifier)
+    )
@@ -0,0 +1,157 @@
+# ----------------------------------------------------------------------------
+# Copyright (c) Studio Gobo Ltd 2025
+# Licensed under the MIT license.
+# See LICENSE.TXT in the project root for license information.
+# ----------------------------------------------------------------------------
+# File			-> _cost.py
+# Created		-> March 2025
+# Author		-> Michael Malinowski (Studio Gobo)
+# ----------------------------------------------------------------------------
+"""
+This module holds the cost of calling the can_bind and composite methods of
+each trait. Traits declare a guess at these costs, and once enough calls
+have been measured the measured cost is used in its place.
+
+```python
+>>> configuration.costs.measuring = True
+>>> compositor.get_many(identifiers)
+>>> configuration.costs.bind_cost(MyTextureTrait)
+```
+
+Costs are given in microseconds, so the guesses a trait declares can be
+compared with the costs which are measured.
+"""
+import threading
+import time
+import typing
+
+
+class CostModel:
+    """
+    The declared and measured costs of the traits within a configuration.
+
+    Measuring is off by default, as timing every predicate has a cost of its
+    own. Whilst it is on every can_bind call made during binding is timed.
+    The composite methods of an asset can be timed with profile.
+
+    Args:
+        min_samples: The number of calls which must be measured before the
+            measured cost replaces the declared cost
+        smoothing: The weight given to each new measurement, where a higher
+            value follows changes in cost more quickly
+    """
+
+    def __init__(self, min_samples: int = 8, smoothing: float = 0.1):
+        self.measuring: bool = False
+
+        self._min_samples: int = min_samples
+        self._smoothing: float = smoothing
+
+        # -- (trait name, method name) -> [average, samples, planned]. The
+        # -- planned value is the cost at the point the version last changed
+        self._measured: dict = dict()
+        self._lock: threading.Lock = threading.Lock()
+        self._version: int = 0
+
+    def version(self) -> int:
+        """
+        Returns a number which changes whenever the costs have changed enough
+        that anything ordered by them should be ordered again
+        """
+        return self._version
+
+    def bind_cost(self, trait) -> float:
+        """
+        Returns the cost of the can_bind method of the given trait class
+        """
+        return self._cost(trait, "can_bind", trait.bind_cost)
+
+    def method_cost(self, trait, method_name: str) -> float:
+        """
+        Returns the cost of the given composite method of the given trait
+        class. Methods the trait does not declare a cost for are assumed to
+        be as costly as its can_bind.
+        """
+        return self._cost(
+            trait,
+            method_name,
+            (trait.method_costs or {}).get(method_name, trait.bind_cost),
+        )
+
+    def record(self, trait, method_name: str, seconds: float) -> None:
+        """
+        Records a measured call of the given method of the given trait class.
+        Binding is recorded under the method name "can_bind".
+        """
+        cost = seconds * 1000000.0
+        key = (trait.__name__, method_name)
+
+        with self._lock:
+            entry = self._measured.get(key)
+
+            if entry is None:
+                self._measured[key] = entry = [cost, 1, None]
+
+            else:
+                entry[0] += (cost - entry[0]) * self._smoothing
+                entry[1] += 1
+
+            if entry[1] < self._min_samples:
+                return
+
+            # -- Only once the measured cost is first used, or has since
+            # -- halved or doubled, is anything ordered by it worth ordering
+            # -- again
+            planned = entry[2]
+
+            if planned is None or not planned / 2 <= entry[0] <= planned * 2:
+                entry[2] = entry[0]
+                self._version += 1
+
+    def measured(self) -> dict:
+        """
+        Returns a dictionary of (trait name, method name) to the measured cost
+        of every method which has been measured enough to be used
+        """
+        with self._lock:
+            return {
+                key: average
+                for key, (average, samples, _) in self._measured.items()
+                if samples >= self._min_samples
+            }
+
+    def reset(self) -> None:
+        """
+        Forgets every measured cost, so the declared costs are used again
+        """
+        with self._lock:
+            self._measured.clear()
+            self._version += 1
+
+    def profile(
+        self,
+        asset: "asset_composition.Asset",
+        method_names: typing.Iterable[str],
+    ) -> None:
+        """
+        Times the given composite methods of every trait bound to the asset
+        which implements them, recording the cost against each trait.
+        """
+        for method_name in method_names:
+            for trait in asset.traits():
+                method = getattr(trait, method_name, None)
+
+                if method is None:
+                    continue
+
+                start = time.perf_counter()
+                method()
+                self.record(type(trait), method_name, time.perf_counter() - start)
+
+    def _cost(self, trait, method_name: str, declared: float) -> float:
+        entry = self._measured.get((trait.__name__, method_name))
+
+        if entry is not None and entry[1] >= self._min_samples:
+            return entry[0]
+
+        return declared
@@ -31,18 +31,253 @@ plugin for the local disk as well as a plugin for perforce or other such source
 control then you can easily search both from the one call.
 
 Results are always returned in the form of Asset classes.
+
+Where a discovery plugin queries a service which returns its results in pages
+you can inherit from the PaginatedDiscoveryPlugin, or the RestDiscoveryPlugin
+if the service is a REST api returning json. These request one page at a time
+and yield the identifiers as each page arrives, meaning broad queries can be
+cut off once enough results have been found.
+
+Plugins which yield their identifiers in ascending order should declare
+sorted_results, allowing the compositor to produce the first results of a
+limited search without waiting for every plugin to finish.
 """
 import os
+import time
+import typing
 
 import factories
 
+from . import _http, _json_stream, _trigram
+
 
 class DiscoveryPlugin:
 
+    # -- Declares whether iter_search yields its identifiers in ascending
+    # -- order. Where it does, the compositor can merge the results of this
+    # -- plugin with others as they arrive rather than collecting them all
+    # -- before sorting.
+    sorted_results: bool = True
+
+    # -- Declares that any identifier matching a query also matches every
+    # -- prefix of that query (such as "vel" for "velo"). Where this is the
+    # -- case the compositor can refine the cached results of a shorter query
+    # -- using the matches method rather than searching again.
+    monotone_matching: bool = False
+
+    # -- An optional TrigramIndex. Where given, every identifier this plugin
+    # -- finds is added to the index, which the plugin may then use to answer
+    # -- queries without searching again.
+    index: "_trigram.TrigramIndex | None" = None
+
     @classmethod
     def search(cls, query, search_from) -> list:
         return list()
 
+    @classmethod
+    def invalidate(cls, identifiers: list) -> None:
+        """
+        This is called by the compositor whenever identifiers are invalidated,
+        allowing plugins which hold an index to keep it up to date.
+        """
+        pass
+
+    @classmethod
+    def matches(cls, query: str, search_from, identifier: str) -> bool:
+        """
+        This should return True if the identifier, which was found by a search
+        from the same location, matches the given query. This only needs to be
+        implemented by plugins which declare monotone_matching.
+        """
+        return False
+
+    @classmethod
+    def iter_search(
+        cls,
+        query: str,
+        search_from,
+        max_results: int | None = None,
+        deadline: float | None = None,
+    ) -> typing.Iterator[str]:
+        """
+        Yields the identifiers found for the query. By default this sorts the
+        results of search, but plugins which can produce their results
+        incrementally should re-implement it.
+
+        Args:
+            query: The string to search for
+            search_from: Location from which to perform the search
+            max_results: If given, no more than this many identifiers should
+                be yielded
+            deadline: If given, the time (as given by time.monotonic) after
+                which no further work should be started
+
+        Returns:
+            Generator of identifiers
+        """
+        results = sorted(set(cls.search(query, search_from)))
+
+        if max_results is not None:
+            results = results[:max_results]
+
+        yield from results
+
+
+class PaginatedDiscoveryPlugin(DiscoveryPlugin):
+    """
+    Base class for discovery plugins which retrieve their results a page at a
+    time. Inheriting classes need to implement fetch_page and identifier.
+    """
+
+    # -- The number of records requested in each page
+    page_size: int = 100
+
+    # -- If set, the search will stop once this many results have been found
+    max_results: int | None = None
+
+    # -- Records are yielded in the order the service returns them, so unless
+    # -- the service sorts by identifier we cannot assume they are sorted
+    sorted_results: bool = False
+
+    @classmethod
+    def fetch_page(
+        cls,
+        query: str,
+        search_from,
+        offset: int,
+        limit: int,
+    ) -> typing.Iterable:
+        """
+        This should return an iterable of the records for the page starting at
+        the given offset. Returning a generator allows records to be processed
+        as they arrive. If fewer records than the limit are returned it is
+        assumed there are no more pages.
+        """
+        return list()
+
+    @classmethod
+    def identifier(cls, record) -> str | None:
+        """
+        This should return the asset identifier for the given record, or None
+        if the record should be skipped.
+        """
+        return record
+
+    @classmethod
+    def iter_search(
+        cls,
+        query: str,
+        search_from,
+        max_results: int | None = None,
+        deadline: float | None = None,
+    ) -> typing.Iterator[str]:
+        """
+        Yields identifiers as each page of records is received.
+
+        Args:
+            query: The string to search for
+            search_from: Location from which to perform the search
+            max_results: If given, no more than this many identifiers will be
+                yielded and no further pages will be requested. The max_results
+                of the plugin is always respected, whatever is given here.
+            deadline: If given, the time (as given by time.monotonic) after
+                which no further records are yielded or pages requested
+
+        Returns:
+            Generator of identifiers
+        """
+        # -- Respect the limit of the plugin itself, as the compositor calls
+        # -- this directly rather than going through search
+        if cls.max_results is not None:
+            max_results = (
+                cls.max_results
+                if max_results is None
+                else min(max_results, cls.max_results)
+            )
+
+        limit = max(1, cls.page_size)
+        offset = 0
+        found = 0
+
+        while True:
+            received = 0
+
+            if deadline is not None and time.monotonic() >= deadline:
+                return
+
+            for record in cls.fetch_page(query, search_from, offset, limit):
+                received += 1
+
+                if deadline is not None and time.monotonic() >= deadline:
+                    return
+
+                identifier = cls.identifier(record)
+
+                if identifier is None:
+                    continue
+
+                yield identifier
+                found += 1
+
+                if max_results is not None and found >= max_results:
+                    return
+
+            if received < limit:
+                return
+
+            offset += limit
+
+    @classmethod
+    def search(cls, query, search_from) -> list:
+        return list(cls.iter_search(query, search_from))
+
+
+class RestDiscoveryPlugin(PaginatedDiscoveryPlugin):
+    """
+    Base class for discovery plugins which page through a REST api returning
+    json. Inheriting classes need to implement page_url and identifier.
+
+    Each page is streamed through the shared HttpClient, and the records are
+    parsed incrementally so they are yielded as they arrive.
+    """
+
+    # -- The key within the json document which holds the list of records. If
+    # -- this is None the document itself is expected to be the list.
+    records_key: str | None = "records"
+
+    @classmethod
+    def page_url(
+        cls,
+        query: str,
+        search_from,
+        offset: int,
+        limit: int,
+    ) -> str | None:
+        """
+        This should return the url to request the given page from, or None if
+        there is nothing to request.
+        """
+        return None
+
+    @classmethod
+    def fetch_page(
+        cls,
+        query: str,
+        search_from,
+        offset: int,
+        limit: int,
+    ) -> typing.Iterator:
+        url = cls.page_url(query, search_from, offset, limit)
+
+        if not url:
+            return
+
+        with _http.HttpClient.instance().open(url) as stream:
+            yield from _json_stream.iter_json_array(
+                stream.chunks(),
+                key=cls.records_key,
+            )
+
 
 class DiscoveryFactory(factories.Factory):
     """
@@ -61,3 +296,15 @@ class DiscoveryFactory(factories.Factory):
             paths=search_paths or list(),
             plugin_identifier="__name__",
         )
+
+    def register(self, class_type) -> bool:
+        """
+        Registers the given class as a plugin. Unlike the base factory this
+        emits plugins_changed, so anything cached against the available
+        plugins is refreshed.
+        """
+        if super(DiscoveryFactory, self).register(class_type) is False:
+            return False
+
+        self.plugins_changed.emit()
+        return True
@@ -0,0 +1,370 @@
+# ----------------------------------------------------------------------------
+# Copyright (c) Studio Gobo Ltd 2025
+# Licensed under the MIT license.
+# See LICENSE.TXT in the project root for license information.
+# ----------------------------------------------------------------------------
+# File			-> _fixtures.py
+# Created		-> March 2025
+# Author		-> Michael Malinowski (Studio Gobo)
+# ----------------------------------------------------------------------------
+"""
+This module allows traits and discovery plugins which are backed by a REST
+api to be tested and benchmarked without access to the network.
+
+Responses are first recorded by running with a RecordingTransport:
+
+```python
+>>> client = asset_composition.HttpClient.instance()
+>>> client.set_transport(asset_composition.RecordingTransport("/my/fixtures"))
+```
+
+Those recordings can then be replayed, either in process with a
+ReplayTransport, or by a local FixtureServer which any http client can
+connect to:
+
+```python
+>>> with asset_composition.FixtureServer("/my/fixtures", latency=0.05) as server:
+>>>     client.get_json(server.url() + "/data1.2/taxa/list.json?name=Dinosauria")
+```
+
+Each response is stored as a json file named after its method and request
+target (the path and query of the url). The host is not part of the name, which
+means a recording made against a live service can be served from any address.
+A fixture directory should therefore only hold the recordings of one service.
+"""
+import base64
+import hashlib
+import http.server
+import io
+import json
+import os
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.parse
+
+from ._http import HttpStream, HttpTransport, PooledTransport
+
+# -- These headers describe how the original response was transferred rather
+# -- than the response itself, so they are not recorded
+_TRANSFER_HEADERS = {
+    "connection",
+    "content-encoding",
+    "content-length",
+    "keep-alive",
+    "transfer-encoding",
+}
+
+
+def _target(url: str) -> str:
+    """
+    Returns the request target (path and query) of the given url
+    """
+    parts = urllib.parse.urlsplit(url)
+    target = parts.path or "/"
+
+    if parts.query:
+        target += "?" + parts.query
+
+    return target
+
+
+def _fixture_filepath(directory: str, method: str, url: str) -> str:
+    key = method.upper() + " " + _target(url)
+
+    return os.path.join(
+        directory,
+        hashlib.sha256(key.encode("utf-8")).hexdigest() + ".json",
+    )
+
+
+def read_fixture(directory: str, method: str, url: str) -> dict | None:
+    """
+    Returns the recorded response for the given request, or None if no
+    response has been recorded for it. The returned dictionary holds the
+    status, headers and body (as bytes).
+    """
+    try:
+        with open(_fixture_filepath(directory, method, url), "r") as f:
+            fixture = json.load(f)
+
+    except (OSError, ValueError):
+        return None
+
+    if "body_base64" in fixture:
+        fixture["body"] = base64.b64decode(fixture.pop("body_base64"))
+
+    else:
+        fixture["body"] = fixture.get("body", "").encode("utf-8")
+
+    return fixture
+
+
+def write_fixture(
+    directory: str,
+    method: str,
+    url: str,
+    status: int,
+    headers: dict,
+    body: bytes,
+) -> str:
+    """
+    Records a response for the given request, returning the path to the
+    fixture file.
+    """
+    fixture = dict(
+        method=method.upper(),
+        url=url,
+        status=status,
+        headers={
+            key.lower(): value
+            for key, value in headers.items()
+            if key.lower() not in _TRANSFER_HEADERS
+        },
+    )
+
+    # -- Text bodies are stored as they are so that the fixtures remain
+    # -- readable (and diffable) when committed alongside tests
+    try:
+        fixture["body"] = body.decode("utf-8")
+
+    except UnicodeDecodeError:
+        fixture["body_base64"] = base64.b64encode(body).decode("ascii")
+
+    filepath = _fixture_filepath(directory, method, url)
+    os.makedirs(directory, exist_ok=True)
+
+    handle, temp_filepath = tempfile.mkstemp(dir=directory, prefix=".")
+
+    with os.fdopen(handle, "w") as f:
+        json.dump(fixture, f, indent=4, sort_keys=True)
+
+    os.replace(temp_filepath, filepath)
+
+    return filepath
+
+
+class RecordingTransport(HttpTransport):
+    """
+    Sends requests through another transport, recording every response to
+    the fixture directory as it passes through.
+
+    Args:
+        directory: The folder to write the fixtures to
+        transport: The transport to send the requests with. If not given a
+            PooledTransport is used.
+    """
+
+    def __init__(self, directory: str, transport: HttpTransport | None = None):
+        self._directory: str = directory
+        self._transport: HttpTransport = transport or PooledTransport()
+
+    def directory(self) -> str:
+        return self._directory
+
+    def open(self, method: str, url: str, headers: dict | None = None) -> HttpStream:
+        with self._transport.open(method, url, headers) as stream:
+            body = stream.read()
+
+        # -- Only genuine responses are recorded, as a 304 is only ever a
+        # -- reply to the validators of whoever happened to be recording
+        if stream.status() != 304:
+            write_fixture(
+                self._directory,
+                method,
+                url,
+                stream.status(),
+                stream.headers(),
+                body,
+            )
+
+        return HttpStream(
+            url=stream.url(),
+            status=stream.status(),
+            headers=stream.headers(),
+            reader=io.BytesIO(body),
+        )
+
+    def close(self) -> None:
+        self._transport.close()
+
+
+class ReplayTransport(HttpTransport):
+    """
+    Answers requests from the fixture directory without touching the network.
+    Requests which have no recorded response raise a URLError.
+
+    Args:
+        directory: The folder to read the fixtures from
+        latency: Number of seconds to wait before answering each request,
+            allowing slow services to be simulated
+    """
+
+    def __init__(self, directory: str, latency: float = 0.0):
+        self._directory: str = directory
+        self._latency: float = latency
+
+    def directory(self) -> str:
+        return self._directory
+
+    def open(self, method: str, url: str, headers: dict | None = None) -> HttpStream:
+        fixture = read_fixture(self._directory, method, url)
+
+        if fixture is None:
+            raise urllib.error.URLError(f"No recorded response : {method} {url}")
+
+        if self._latency:
+            time.sleep(self._latency)
+
+        return HttpStream(
+            url=url,
+            status=fixture["status"],
+            headers=fixture["headers"],
+            reader=io.BytesIO(fixture["body"]),
+        )
+
+
+class _FixtureHandler(http.server.BaseHTTPRequestHandler):
+
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        self._reply("GET")
+
+    def do_HEAD(self):
+        self._reply("HEAD")
+
+    def _reply(self, method: str) -> None:
+        server: "_FixtureHTTPServer" = self.server
+
+        with server.lock:
+            server.requests.append(self.path)
+
+        if server.latency:
+            time.sleep(server.latency)
+
+        fixture = read_fixture(server.directory, method, self.path)
+
+        if fixture is None:
+            self._respond(404, dict(), b"No recorded response", method)
+            return
+
+        # -- Honour the validators of the recorded response so that clients
+        # -- re-validating their cache behave as they would against the service
+        etag = fixture["headers"].get("etag")
+
+        if etag and self.headers.get("If-None-Match") == etag:
+            self._respond(304, dict(etag=etag), b"", method)
+            return
+
+        self._respond(fixture["status"], fixture["headers"], fixture["body"], method)
+
+    def _respond(self, status: int, headers: dict, body: bytes, method: str) -> None:
+        self.send_response(status)
+
+        for key, value in headers.items():
+            self.send_header(key, value)
+
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+
+        if method != "HEAD":
+            self.wfile.write(body)
+
+    def log_message(self, *args) -> None:
+        pass
+
+
+class _FixtureHTTPServer(http.server.ThreadingHTTPServer):
+
+    daemon_threads = True
+
+    def __init__(self, address: tuple, directory: str, latency: float):
+        super().__init__(address, _FixtureHandler)
+
+        self.directory: str = directory
+        self.latency: float = latency
+        self.requests: list = list()
+        self.lock: threading.Lock = threading.Lock()
+
+
+class FixtureServer:
+    """
+    A local http server which serves the recorded responses within a fixture
+    directory. Each request is handled on its own thread, so concurrent
+    clients are served concurrently.
+
+    Args:
+        directory: The folder to read the fixtures from
+        latency: Number of seconds to wait before answering each request
+        host: The address to listen on
+        port: The port to listen on. If zero a free port is chosen.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        latency: float = 0.0,
+        host: str = "127.0.0.1",
+        port: int = 0,
+    ):
+        self._server: _FixtureHTTPServer = _FixtureHTTPServer(
+            (host, port),
+            directory,
+            latency,
+        )
+        self._thread: threading.Thread | None = None
+
+    def url(self) -> str:
+        """
+        Returns the base url of the server, such as http://127.0.0.1:8000
+        """
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def requests(self) -> list:
+        """
+        Returns the request targets which have been served, in the order they
+        were received.
+        """
+        with self._server.lock:
+            return list(self._server.requests)
+
+    def start(self) -> None:
+        """
+        Starts serving on a background thread
+        """
+        if self._thread:
+            return
+
+        self._thread = threading.Thread(
+            target=self._server.serve_forever,
+            kwargs=dict(poll_interval=0.05),
+            daemon=True,
+        )
+        self._thread.start()
+
+    def serve_forever(self) -> None:
+        """
+        Serves on the calling thread until interrupted
+        """
+        self._server.serve_forever()
+
+    def stop(self) -> None:
+        """
+        Stops serving and releases the port
+        """
+        if self._thread:
+            self._server.shutdown()
+            self._thread.join()
+            self._thread = None
+
+        self._server.server_close()
+
+    def __enter__(self) -> "FixtureServer":
+        self.start()
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.stop()
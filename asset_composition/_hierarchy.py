@@ -0,0 +1,256 @@
+# ----------------------------------------------------------------------------
+# Copyright (c) Studio Gobo Ltd 2025
+# Licensed under the MIT license.
+# See LICENSE.TXT in the project root for license information.
+# ----------------------------------------------------------------------------
+# File			-> _hierarchy.py
+# Created		-> March 2025
+# Author		-> Michael Malinowski (Studio Gobo)
+# ----------------------------------------------------------------------------
+import threading
+import typing
+
+from . import _cache
+
+# -- Returned when nothing is known, as None is a valid parent
+UNKNOWN = object()
+
+
+class Hierarchy:
+    """
+    Records the parent and children of each asset as they are resolved, so
+    they are not resolved again until the asset is invalidated or the record
+    expires.
+
+    When the children of an asset are recorded, each child is recorded as
+    having that asset as its parent, meaning the parent of a child found by
+    walking down the hierarchy is known without asking its traits. The
+    ancestors of each asset are held once worked out, so asking again is a
+    single lookup. Forgetting them is not, as every set of ancestors held is
+    checked, but this only happens when an identifier is recorded under a
+    different parent or is invalidated recursively.
+
+    Every record is held in a size bounded cache, with the least recently
+    used removed first, so the hierarchy never grows beyond its maximum.
+
+    Args:
+        max_entries: The maximum number of records of each kind to hold
+        ttl: The number of seconds a record is trusted for
+    """
+
+    def __init__(self, max_entries: int = 65536, ttl: float | None = 30.0):
+        self._parents: _cache.TTLCache = _cache.TTLCache(max_entries, ttl)
+        self._children: _cache.TTLCache = _cache.TTLCache(max_entries, ttl)
+        self._ancestors: _cache.TTLCache = _cache.TTLCache(max_entries, ttl)
+        self._lock: threading.Lock = threading.Lock()
+
+        # -- Changes whenever anything is forgotten, so ancestors worked out
+        # -- whilst something was being forgotten are not held
+        self._generation: int = 0
+
+    def __len__(self) -> int:
+        return len(set(self._parents.keys()) | set(self._children.keys()))
+
+    def parent(self, identifier: str):
+        """
+        Returns the recorded parent of the identifier, or UNKNOWN
+        """
+        return self._parents.get(identifier, UNKNOWN)
+
+    def children(self, identifier: str) -> tuple | None:
+        """
+        Returns the recorded children of the identifier, or None if they have
+        not been recorded
+        """
+        return self._children.get(identifier)
+
+    def siblings(self, identifier: str) -> tuple | None:
+        """
+        Returns the other children of the parent of the identifier, or None if
+        either the parent or its children have not been recorded
+        """
+        parent = self._parents.get(identifier)
+
+        if not parent:
+            return None
+
+        children = self._children.get(parent)
+
+        if children is None:
+            return None
+
+        return tuple(child for child in children if child != identifier)
+
+    def record_parent(self, identifier: str, parent) -> None:
+        """
+        Records the parent of the identifier, where a falsey parent means the
+        identifier has none
+        """
+        with self._lock:
+            if self._parents.get(identifier, parent) != parent:
+                self._forget_ancestors([identifier])
+
+            self._parents.set(identifier, parent)
+
+    def record_children(self, identifier: str, children: typing.Iterable[str]) -> None:
+        """
+        Records the children of the identifier, and records the identifier as
+        the parent of each of them
+        """
+        children = tuple(children)
+
+        with self._lock:
+            self._children.set(identifier, children)
+
+            # -- Only a child whose parent was recorded as something else can
+            # -- be within the ancestors we hold
+            self._forget_ancestors(
+                [
+                    child
+                    for child in children
+                    if self._parents.get(child, identifier) != identifier
+                ],
+            )
+
+            for child in children:
+                self._parents.set(child, identifier)
+
+    def ancestors(
+        self,
+        identifier: str,
+        resolve_parent: typing.Callable[[str], str],
+    ) -> tuple:
+        """
+        Returns the ancestors of the identifier, nearest first.
+
+        Args:
+            identifier: The identifier to find the ancestors of
+            resolve_parent: Callable used to find the parent of any identifier
+                along the way whose parent has not been recorded
+
+        Returns:
+            Tuple of identifiers
+        """
+        ancestors = self._ancestors.get(identifier)
+
+        if ancestors is not None:
+            return ancestors
+
+        generation = self._generation
+
+        # -- Walk up until we reach the top, or an identifier whose ancestors
+        # -- we already hold
+        chain = list()
+        known = tuple()
+        current = identifier
+
+        while True:
+            parent = self._parents.get(current, UNKNOWN)
+
+            if parent is UNKNOWN:
+                parent = resolve_parent(current)
+                self.record_parent(current, parent)
+
+            # -- A parent which is already in the chain is a cycle, which we
+            # -- treat as the top
+            if not parent or parent == identifier or parent in chain:
+                break
+
+            chain.append(parent)
+
+            known = self._ancestors.get(parent)
+
+            if known is not None:
+                break
+
+            known = tuple()
+            current = parent
+
+        ancestors = tuple(chain) + known
+
+        with self._lock:
+            if generation != self._generation:
+                return ancestors
+
+            self._ancestors.set(identifier, ancestors)
+
+            for index, ancestor in enumerate(chain):
+                if self._ancestors.get(ancestor) is None:
+                    self._ancestors.set(ancestor, ancestors[index + 1:])
+
+        return ancestors
+
+    def invalidate(
+        self,
+        identifiers: typing.Iterable[str],
+        recursive: bool = False,
+    ) -> None:
+        """
+        Forgets the children recorded for the given identifiers. When
+        recursive, everything recorded below them (found through the recorded
+        children, and by using "/" as the separator) is forgotten entirely.
+        """
+        identifiers = list(identifiers)
+
+        with self._lock:
+            self._generation += 1
+
+            if not recursive:
+                for identifier in identifiers:
+                    self._children.pop(identifier)
+
+                return
+
+            affected = set(identifiers)
+            pending = list(identifiers)
+
+            while pending:
+                children = self._children.get(pending.pop(), ())
+
+                for child in children:
+                    if child not in affected:
+                        affected.add(child)
+                        pending.append(child)
+
+            prefixes = tuple(identifier.rstrip("/") + "/" for identifier in identifiers)
+
+            affected.update(
+                identifier
+                for identifier in set(self._parents.keys()) | set(self._children.keys())
+                if identifier.startswith(prefixes)
+            )
+
+            for identifier in affected:
+                self._children.pop(identifier)
+                self._parents.pop(identifier)
+
+            self._forget_ancestors(affected)
+
+    def clear(self) -> None:
+        """
+        Forgets everything recorded
+        """
+        with self._lock:
+            self._generation += 1
+            self._parents.clear()
+            self._children.clear()
+            self._ancestors.clear()
+
+    def _forget_ancestors(self, identifiers: typing.Iterable[str]) -> None:
+        """
+        Forgets the ancestors held for the given identifiers, and for every
+        identifier which has one of them as an ancestor. This checks every set
+        of ancestors held, so its cost grows with the size of the hierarchy.
+        """
+        identifiers = set(identifiers)
+
+        if not identifiers:
+            return
+
+        self._generation += 1
+
+        for identifier in self._ancestors.keys():
+            ancestors = self._ancestors.get(identifier, ())
+
+            if identifier in identifiers or not identifiers.isdisjoint(ancestors):
+                self._ancestors.pop(identifier)
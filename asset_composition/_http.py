@@ -0,0 +1,727 @@
+# ----------------------------------------------------------------------------
+# Copyright (c) Studio Gobo Ltd 2025
+# Licensed under the MIT license.
+# See LICENSE.TXT in the project root for license information.
+# ----------------------------------------------------------------------------
+# File			-> _http.py
+# Created		-> March 2025
+# Author		-> Michael Malinowski (Studio Gobo)
+# ----------------------------------------------------------------------------
+"""
+This module contains a shared http client which traits and discovery plugins
+that are backed by a REST api can use, rather than opening a new connection
+for every call.
+
+```python
+>>> import asset_composition
+>>>
+>>> client = asset_composition.HttpClient.instance()
+>>> data = client.get_json("https://paleobiodb.org/data1.2/taxa/single.json?name=Dinosauria")
+```
+
+The client gives you:
+
+    * Keep-alive connections which are pooled and re-used per host
+    * De-duplication of identical requests which are in-flight at the same time,
+      so only one of them reaches the server
+    * A response cache held in memory and (optionally) on disk. Responses are
+      kept for a time to live, after which they are re-validated using their
+      ETag or Last-Modified header where the server provides them.
+
+The way requests are actually sent is handled by a transport, which can be
+swapped out. This allows you to provide your own transport should you need to
+route requests differently.
+"""
+import hashlib
+import http.client
+import io
+import json
+import os
+import struct
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+
+from . import _cache
+
+
+class HttpResponse:
+    """
+    A fully read http response
+    """
+
+    def __init__(self, url: str, status: int, headers: dict, body: bytes):
+        self._url: str = url
+        self._status: int = status
+        self._headers: dict = {key.lower(): value for key, value in headers.items()}
+        self._body: bytes = body
+
+    def url(self) -> str:
+        return self._url
+
+    def status(self) -> int:
+        return self._status
+
+    def headers(self) -> dict:
+        return dict(self._headers)
+
+    def header(self, name: str, default: str | None = None) -> str | None:
+        return self._headers.get(name.lower(), default)
+
+    def body(self) -> bytes:
+        return self._body
+
+    def text(self) -> str:
+        return self._body.decode("utf-8")
+
+    def json(self):
+        return json.loads(self._body)
+
+    def __repr__(self) -> str:
+        return f"[HttpResponse:{self._status}:{self._url}]"
+
+
+class HttpStream:
+    """
+    A response whose body has not yet been read, allowing it to be
+    consumed in chunks as it arrives. This should always be closed, which
+    is easiest done by using it as a context manager.
+    """
+
+    def __init__(self, url: str, status: int, headers: dict, reader):
+        self._url: str = url
+        self._status: int = status
+        self._headers: dict = {key.lower(): value for key, value in headers.items()}
+        self._reader = reader
+
+    def url(self) -> str:
+        return self._url
+
+    def status(self) -> int:
+        return self._status
+
+    def headers(self) -> dict:
+        return dict(self._headers)
+
+    def header(self, name: str, default: str | None = None) -> str | None:
+        return self._headers.get(name.lower(), default)
+
+    def read(self, size: int = -1) -> bytes:
+        return self._reader.read(size)
+
+    def chunks(self, size: int = 1024 * 64):
+        """
+        Generator yielding the body in chunks of (at most) the given size
+        """
+        while True:
+            chunk = self.read(size)
+
+            if not chunk:
+                return
+
+            yield chunk
+
+    def close(self) -> None:
+        self._reader.close()
+
+    def __enter__(self) -> "HttpStream":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+
+class HttpTransport:
+    """
+    A transport is responsible for actually sending a request. This base class
+    defines the interface which all transports must implement, and sends each
+    request through urllib on a new connection.
+    """
+
+    def open(self, method: str, url: str, headers: dict | None = None) -> HttpStream:
+        """
+        Sends the request and returns a stream from which the body can be read
+        """
+        request = urllib.request.Request(
+            url,
+            headers=dict(headers or dict()),
+            method=method,
+        )
+
+        # -- urllib raises for any error status, but the error is itself a
+        # -- response we can read the body from
+        try:
+            response = urllib.request.urlopen(request)
+
+        except urllib.error.HTTPError as error:
+            response = error
+
+        return HttpStream(
+            url=response.geturl(),
+            status=response.status,
+            headers=dict(response.headers.items()),
+            reader=response,
+        )
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        headers: dict | None = None,
+    ) -> HttpResponse:
+        """
+        Sends the request and returns the fully read response
+        """
+        with self.open(method, url, headers) as stream:
+            return HttpResponse(
+                url=stream.url(),
+                status=stream.status(),
+                headers=stream.headers(),
+                body=stream.read(),
+            )
+
+    def close(self) -> None:
+        """
+        Releases any resources (such as connections) held by the transport
+        """
+        pass
+
+
+class _PooledReader:
+    """
+    Wraps a http.client response, returning the connection to the pool once
+    the body has been fully read and closed.
+    """
+
+    def __init__(self, transport: "PooledTransport", key: tuple, connection, response):
+        self._transport: PooledTransport = transport
+        self._key: tuple = key
+        self._connection = connection
+        self._response = response
+
+    def read(self, size: int = -1) -> bytes:
+        if size is None or size < 0:
+            return self._response.read()
+
+        return self._response.read(size)
+
+    def close(self) -> None:
+        if self._connection is None:
+            return
+
+        # -- A connection can only be re-used if the response body was fully
+        # -- consumed and the server is happy to keep the connection open
+        if self._response.isclosed() and not self._response.will_close:
+            self._transport._release(self._key, self._connection)
+
+        else:
+            self._response.close()
+            self._connection.close()
+
+        self._connection = None
+
+
+class PooledTransport(HttpTransport):
+    """
+    Sends requests using keep-alive connections which are pooled per host, so
+    repeated requests to the same service do not pay for a new connection
+    (and tls handshake) every time.
+
+    Note that unlike urllib, this does not read any proxy settings from the
+    environment.
+
+    Args:
+        max_idle_per_host: The maximum number of idle connections to keep open
+            for any one host
+        timeout: Socket timeout in seconds
+    """
+
+    _REDIRECTS = (301, 302, 303, 307, 308)
+    _MAX_REDIRECTS = 5
+
+    def __init__(self, max_idle_per_host: int = 8, timeout: float = 30.0):
+        self._max_idle_per_host: int = max_idle_per_host
+        self._timeout: float = timeout
+        self._idle: dict = dict()
+        self._lock: threading.Lock = threading.Lock()
+
+    def open(self, method: str, url: str, headers: dict | None = None) -> HttpStream:
+        headers = dict(headers or dict())
+
+        for _ in range(self._MAX_REDIRECTS + 1):
+            parts = urllib.parse.urlsplit(url)
+            key = (parts.scheme, parts.hostname, parts.port)
+
+            path = parts.path or "/"
+
+            if parts.query:
+                path += "?" + parts.query
+
+            connection, response = self._send(key, method, path, headers)
+            location = response.getheader("Location")
+
+            if response.status in self._REDIRECTS and location:
+                response.read()
+                _PooledReader(self, key, connection, response).close()
+                url = urllib.parse.urljoin(url, location)
+                continue
+
+            return HttpStream(
+                url=url,
+                status=response.status,
+                headers=dict(response.getheaders()),
+                reader=_PooledReader(self, key, connection, response),
+            )
+
+        raise urllib.error.URLError(f"Too many redirects : {url}")
+
+    def close(self) -> None:
+        with self._lock:
+            idle = self._idle
+            self._idle = dict()
+
+        for connections in idle.values():
+            for connection in connections:
+                connection.close()
+
+    def _send(self, key: tuple, method: str, path: str, headers: dict) -> tuple:
+        """
+        Sends the request on a pooled connection. If a re-used connection has
+        been dropped by the server we retry once on a fresh connection.
+        """
+        connection, reused = self._acquire(key)
+
+        try:
+            connection.request(method, path, headers=headers)
+            return connection, connection.getresponse()
+
+        except (http.client.HTTPException, ConnectionError):
+            connection.close()
+
+            if not reused:
+                raise
+
+        connection = self._connect(key)
+        connection.request(method, path, headers=headers)
+        return connection, connection.getresponse()
+
+    def _connect(self, key: tuple):
+        scheme, host, port = key
+
+        if scheme == "https":
+            return http.client.HTTPSConnection(host, port, timeout=self._timeout)
+
+        if scheme == "http":
+            return http.client.HTTPConnection(host, port, timeout=self._timeout)
+
+        raise urllib.error.URLError(f"Unsupported url scheme : {scheme}")
+
+    def _acquire(self, key: tuple) -> tuple:
+        with self._lock:
+            idle = self._idle.get(key)
+
+            if idle:
+                return idle.pop(), True
+
+        return self._connect(key), False
+
+    def _release(self, key: tuple, connection) -> None:
+        with self._lock:
+            idle = self._idle.setdefault(key, list())
+
+            if len(idle) < self._max_idle_per_host:
+                idle.append(connection)
+                return
+
+        connection.close()
+
+
+class _Flight:
+    """
+    Represents a request which is currently in progress, allowing other threads
+    requesting the same url to wait for its result.
+    """
+
+    def __init__(self):
+        self.event: threading.Event = threading.Event()
+        self.response: HttpResponse | None = None
+        self.error: BaseException | None = None
+
+
+class _CacheEntry:
+    """
+    A cached response along with the information needed to decide whether it
+    is still fresh, and how to re-validate it if it is not.
+    """
+
+    def __init__(self, response: HttpResponse, expires: float):
+        self.response: HttpResponse = response
+        self.expires: float = expires
+
+    def is_fresh(self) -> bool:
+        return time.time() < self.expires
+
+    def validators(self) -> dict:
+        headers = dict()
+
+        if self.response.header("etag"):
+            headers["If-None-Match"] = self.response.header("etag")
+
+        if self.response.header("last-modified"):
+            headers["If-Modified-Since"] = self.response.header("last-modified")
+
+        return headers
+
+
+class HttpClient:
+    """
+    The http client is the entry point for making requests. In most situations
+    you should use the shared client returned by HttpClient.instance() so that
+    every trait benefits from the same connections and cache.
+
+    Args:
+        transport: The transport used to send requests. If not given a
+            PooledTransport is used.
+        ttl: The default number of seconds a response is considered fresh for,
+            where the server does not declare a max-age.
+        cache_directory: If given, responses are also cached to this folder
+            so they persist between sessions.
+        max_entries: The maximum number of responses held in memory
+    """
+
+    # -- Private variable for holding the shared instance
+    _INSTANCE: "HttpClient" = None
+    _INSTANCE_LOCK: threading.Lock = threading.Lock()
+
+    _DEFAULT = object()
+
+    # -- We store the header length ahead of the json header in the
+    # -- disk cache files
+    _HEADER_SIZE = struct.Struct(">I")
+
+    def __init__(
+        self,
+        transport: HttpTransport | None = None,
+        ttl: float = 300.0,
+        cache_directory: str | None = None,
+        max_entries: int = 1024,
+    ):
+        self._transport: HttpTransport = transport or PooledTransport()
+        self._ttl: float = ttl
+        self._cache_directory: str | None = cache_directory
+        self._memory: _cache.TTLCache = _cache.TTLCache(max_entries=max_entries)
+
+        self._flights: dict = dict()
+        self._lock: threading.Lock = threading.Lock()
+
+    @classmethod
+    def instance(cls) -> "HttpClient":
+        """
+        Returns the shared http client, creating it if it does not yet exist.
+        The shared client caches responses to disk within the asset_composition
+        cache directory.
+        """
+        with cls._INSTANCE_LOCK:
+            if not cls._INSTANCE:
+
+                # -- If the cache directory belongs to someone else we cannot
+                # -- trust it, so we only cache responses in memory
+                try:
+                    cache_directory = _cache.cache_directory("http")
+
+                except PermissionError:
+                    cache_directory = None
+
+                cls._INSTANCE = HttpClient(cache_directory=cache_directory)
+
+            return cls._INSTANCE
+
+    @classmethod
+    def set_instance(cls, client: "HttpClient | None") -> None:
+        """
+        Replaces the shared http client. Passing None will cause a new default
+        client to be created the next time one is requested.
+        """
+        with cls._INSTANCE_LOCK:
+            cls._INSTANCE = client
+
+    def transport(self) -> HttpTransport:
+        """
+        Returns the transport used to send requests
+        """
+        return self._transport
+
+    def set_transport(self, transport: HttpTransport) -> None:
+        """
+        Replaces the transport used to send requests
+        """
+        self._transport.close()
+        self._transport = transport
+
+    def get(self, url: str, headers: dict | None = None, ttl=_DEFAULT) -> HttpResponse:
+        """
+        Requests the given url, returning a cached response where one is
+        available and fresh.
+
+        Args:
+            url: The url to request
+            headers: Optional additional headers to send
+            ttl: The number of seconds the response should be cached for. This
+                takes precedence over any max-age declared by the server. Zero
+                prevents the response from being cached.
+
+        Returns:
+            HttpResponse
+        """
+        # -- Requests with different headers (such as authorisation) can be
+        # -- given different responses, so they never share one
+        key = self._cache_key(url, headers)
+        entry = self._cached(key)
+
+        if entry and entry.is_fresh():
+            return entry.response
+
+        # -- If the same request is already being sent then we wait for it
+        # -- rather than sending our own
+        with self._lock:
+            flight = self._flights.get(key)
+            is_leader = flight is None
+
+            if is_leader:
+                flight = self._flights[key] = _Flight()
+
+        if not is_leader:
+            flight.event.wait()
+
+            if flight.error:
+                raise flight.error
+
+            return flight.response
+
+        try:
+            flight.response = self._fetch(url, headers, key, entry, ttl)
+            return flight.response
+
+        except BaseException as error:
+            flight.error = error
+            raise
+
+        finally:
+            with self._lock:
+                self._flights.pop(key, None)
+
+            flight.event.set()
+
+    def get_json(self, url: str, headers: dict | None = None, ttl=_DEFAULT):
+        """
+        Convenience function for requesting a url and decoding the body
+        as json.
+        """
+        return self.get(url, headers=headers, ttl=ttl).json()
+
+    def open(self, url: str, headers: dict | None = None) -> HttpStream:
+        """
+        Requests the given url, returning a stream which allows the body to be
+        read as it arrives. Streamed responses bypass the cache.
+        """
+        stream = self._transport.open("GET", url, self._headers(headers))
+
+        if stream.status() >= 400:
+            body = stream.read()
+            stream.close()
+            self._raise(url, stream.status(), stream.headers(), body)
+
+        return stream
+
+    def clear(self) -> None:
+        """
+        Removes all cached responses, both in memory and on disk
+        """
+        self._memory.clear()
+
+        if self._cache_directory and os.path.exists(self._cache_directory):
+            for filename in os.listdir(self._cache_directory):
+                if filename.endswith(".http"):
+                    try:
+                        os.remove(os.path.join(self._cache_directory, filename))
+
+                    except OSError:
+                        pass
+
+    def _fetch(
+        self,
+        url: str,
+        headers: dict | None,
+        key: str,
+        entry: _CacheEntry | None,
+        ttl,
+    ) -> HttpResponse:
+        """
+        Sends the request, re-validating any stale cache entry, and stores
+        the result in the cache under the given key.
+        """
+        request_headers = self._headers(headers)
+
+        if entry:
+            request_headers.update(entry.validators())
+
+        response = self._transport.request("GET", url, request_headers)
+
+        # -- The server has told us our cached copy is still valid
+        if entry and response.status() == 304:
+            self._store(key, entry.response, self._lifetime(response, ttl))
+            return entry.response
+
+        if response.status() >= 400:
+            self._raise(url, response.status(), response.headers(), response.body())
+
+        if response.status() == 200:
+            self._store(key, response, self._lifetime(response, ttl))
+
+        return response
+
+    def _lifetime(self, response: HttpResponse, ttl) -> float:
+        """
+        Returns how many seconds the response should be cached for
+        """
+        if ttl is not self._DEFAULT:
+            return ttl
+
+        cache_control = response.header("cache-control", "").lower()
+
+        if "no-store" in cache_control:
+            return 0
+
+        for directive in cache_control.split(","):
+            name, _, value = directive.strip().partition("=")
+
+            if name == "max-age" and value.isdigit():
+                return int(value)
+
+        return self._ttl
+
+    @classmethod
+    def _cache_key(cls, url: str, headers: dict | None) -> str:
+        """
+        Returns the key a request is cached and de-duplicated under, which is
+        the url along with any headers given for it
+        """
+        if not headers:
+            return url
+
+        lines = sorted(f"{name.lower()}: {value}" for name, value in headers.items())
+
+        return "\n".join([url] + lines)
+
+    def _cached(self, key: str) -> _CacheEntry | None:
+        """
+        Returns the cache entry for the key, looking on disk if it is not held
+        in memory.
+        """
+        entry = self._memory.get(key)
+
+        if entry or not self._cache_directory:
+            return entry
+
+        try:
+            with open(self._cache_filepath(key), "rb") as f:
+                data = f.read()
+
+            (header_size,) = self._HEADER_SIZE.unpack_from(data)
+            body_offset = self._HEADER_SIZE.size + header_size
+            header = json.loads(data[self._HEADER_SIZE.size:body_offset])
+
+        except (OSError, ValueError, struct.error):
+            return None
+
+        entry = _CacheEntry(
+            response=HttpResponse(
+                url=header["url"],
+                status=header["status"],
+                headers=header["headers"],
+                body=data[body_offset:],
+            ),
+            expires=header["expires"],
+        )
+        self._memory.set(key, entry)
+
+        return entry
+
+    def _store(self, key: str, response: HttpResponse, lifetime: float) -> None:
+        """
+        Stores the response in the memory cache, and in the disk cache if
+        there is one.
+        """
+        # -- Responses which carry no validator are of no use once they have
+        # -- expired, so there is no point in caching them for zero seconds
+        has_validator = response.header("etag") or response.header("last-modified")
+
+        if lifetime <= 0 and not has_validator:
+            return
+
+        entry = _CacheEntry(response, time.time() + lifetime)
+        self._memory.set(key, entry)
+
+        if not self._cache_directory:
+            return
+
+        header = json.dumps(
+            dict(
+                url=response.url(),
+                status=response.status(),
+                headers=response.headers(),
+                expires=entry.expires,
+            ),
+        ).encode("utf-8")
+
+        # -- Write to a temporary file and move it into place so that other
+        # -- processes never see a partially written file
+        try:
+            os.makedirs(self._cache_directory, exist_ok=True)
+
+            handle, temp_filepath = tempfile.mkstemp(dir=self._cache_directory)
+
+            try:
+                with os.fdopen(handle, "wb") as f:
+                    f.write(self._HEADER_SIZE.pack(len(header)))
+                    f.write(header)
+                    f.write(response.body())
+
+                os.replace(temp_filepath, self._cache_filepath(key))
+
+            # -- Once moved into place the temporary file no longer exists, so
+            # -- it is only still here if something went wrong
+            finally:
+                if os.path.exists(temp_filepath):
+                    os.remove(temp_filepath)
+
+        except OSError:
+            pass
+
+    def _cache_filepath(self, key: str) -> str:
+        return os.path.join(
+            self._cache_directory,
+            hashlib.sha256(key.encode("utf-8")).hexdigest() + ".http",
+        )
+
+    @classmethod
+    def _headers(cls, headers: dict | None) -> dict:
+        from . import __version__
+
+        result = {"User-Agent": f"asset_composition/{__version__}"}
+        result.update(headers or dict())
+
+        return result
+
+    @classmethod
+    def _raise(cls, url: str, status: int, headers: dict, body: bytes) -> None:
+        raise urllib.error.HTTPError(
+            url,
+            status,
+            http.client.responses.get(status, "Error"),
+            headers,
+            io.BytesIO(body),
+        )
@@ -0,0 +1,361 @@
+# ----------------------------------------------------------------------------
+# Copyright (c) Studio Gobo Ltd 2025
+# Licensed under the MIT license.
+# See LICENSE.TXT in the project root for license information.
+# ----------------------------------------------------------------------------
+# File			-> _icons.py
+# Created		-> March 2025
+# Author		-> Michael Malinowski (Studio Gobo)
+# ----------------------------------------------------------------------------
+"""
+This module contains a cache for icons and thumbnails which traits have to
+download or generate before they can return a path from their icon method.
+
+```python
+>>> def icon(self):
+>>>     return asset_composition.IconCache.instance().resolve(
+>>>         key="my_service/" + self.asset().identifier(),
+>>>         fetch=self.download_thumbnail,
+>>>     )
+```
+
+The image data is stored on disk under the hash of its content, meaning any
+number of assets sharing the same image only store it once. A small reference
+file is written for each key, so the image is still found in later sessions.
+Once the first call for a key has been made, later calls are answered from
+memory.
+
+The cache is bounded in size, and when it grows beyond that size the least
+recently used images are removed along with the reference files pointing at
+them.
+"""
+import hashlib
+import os
+import tempfile
+import threading
+import typing
+
+from . import _cache
+
+
+class IconCache:
+    """
+    A content addressed, size bounded, store for icon images.
+
+    Args:
+        directory: The folder to store the images within. If not given the
+            icons folder within the asset_composition cache directory is used.
+        max_bytes: The maximum total size of the images held on disk
+        max_keys: The maximum number of keys whose paths are held in memory.
+            Keys beyond this are still found through their reference files.
+    """
+
+    # -- Private variable for holding the shared instance
+    _INSTANCE: "IconCache" = None
+    _INSTANCE_LOCK: threading.Lock = threading.Lock()
+
+    def __init__(
+        self,
+        directory: str | None = None,
+        max_bytes: int = 256 * 1024 * 1024,
+        max_keys: int = 4096,
+    ):
+        self._directory: str = directory or _cache.cache_directory("icons")
+        self._max_bytes: int = max_bytes
+
+        # -- Map of key to the absolute path of its image
+        self._paths: _cache.TTLCache = _cache.TTLCache(max_entries=max_keys)
+
+        # -- Map of image filename to its size, ordered from least to most
+        # -- recently used. This is populated from disk the first time we
+        # -- need it.
+        self._usage: dict | None = None
+        self._total_bytes: int = 0
+
+        self._lock: threading.RLock = threading.RLock()
+
+    @classmethod
+    def instance(cls) -> "IconCache":
+        """
+        Returns the shared icon cache, creating it if it does not yet exist
+        """
+        with cls._INSTANCE_LOCK:
+            if not cls._INSTANCE:
+                cls._INSTANCE = IconCache()
+
+            return cls._INSTANCE
+
+    @classmethod
+    def set_instance(cls, cache: "IconCache | None") -> None:
+        """
+        Replaces the shared icon cache. Passing None will cause a new default
+        cache to be created the next time one is requested.
+        """
+        with cls._INSTANCE_LOCK:
+            cls._INSTANCE = cache
+
+    def directory(self) -> str:
+        """
+        Returns the folder the images are stored within
+        """
+        return self._directory
+
+    def get(self, key: str) -> str | None:
+        """
+        Returns the path to the image stored against the given key, or None
+        if there is no image stored against it.
+        """
+        path = self._paths.get(key)
+
+        # -- The image may have been evicted since, either by us or by another
+        # -- process sharing the folder
+        if path and os.path.exists(path):
+            self._touch(os.path.basename(path))
+            return path
+
+        if path:
+            self._paths.pop(key)
+            self._forget(os.path.basename(path))
+
+        # -- We may have stored this key in a previous session, in which case
+        # -- there will be a reference file pointing to the image
+        reference_filepath = self._reference_filepath(key)
+
+        try:
+            with open(reference_filepath, "r") as f:
+                filename = f.read().strip()
+
+        except OSError:
+            return None
+
+        path = os.path.join(self._directory, filename).replace("\\", "/")
+
+        # -- A reference to an image which has been evicted is of no further
+        # -- use, so we remove it
+        if not os.path.exists(path):
+            self._forget(filename)
+
+            try:
+                os.remove(reference_filepath)
+
+            except OSError:
+                pass
+
+            return None
+
+        self._paths.set(key, path)
+
+        self._touch(filename)
+        return path
+
+    def store(
+        self,
+        data: bytes,
+        key: str | None = None,
+        suffix: str = ".png",
+    ) -> str:
+        """
+        Stores the given image data, returning the path it was stored at.
+
+        Args:
+            data: The image data
+            key: Optional key which the image can later be retrieved by
+            suffix: The file extension to give the image
+
+        Returns:
+            Absolute path to the image
+        """
+        filename = hashlib.sha256(data).hexdigest() + suffix
+        path = os.path.join(self._directory, filename).replace("\\", "/")
+
+        with self._lock:
+            usage = self._read_usage()
+
+            if filename not in usage:
+                self._write(path, data)
+                usage[filename] = len(data)
+                self._total_bytes += len(data)
+
+            if key is not None:
+                self._paths.set(key, path)
+                self._write(self._reference_filepath(key), filename.encode("utf-8"))
+
+            self._touch(filename)
+            self._evict(keep=filename)
+
+        return path
+
+    def resolve(
+        self,
+        key: str,
+        fetch: typing.Callable[[], bytes | None],
+        suffix: str = ".png",
+    ) -> str:
+        """
+        Returns the path to the image stored against the given key. If there is
+        no image stored, the fetch callable is called to retrieve the image data
+        which is then stored.
+
+        Args:
+            key: The key to store the image against
+            fetch: Callable returning the image data, or None if there is
+                no image
+            suffix: The file extension to give the image
+
+        Returns:
+            Absolute path to the image, or an empty string if there is no image
+        """
+        path = self.get(key)
+
+        if path:
+            return path
+
+        data = fetch()
+
+        if not data:
+            return ""
+
+        return self.store(data, key=key, suffix=suffix)
+
+    def size(self) -> int:
+        """
+        Returns the total size in bytes of the images held on disk
+        """
+        with self._lock:
+            self._read_usage()
+            return self._total_bytes
+
+    def clear(self) -> None:
+        """
+        Removes all the images and references from the cache
+        """
+        with self._lock:
+            for root, _, filenames in os.walk(self._directory):
+                for filename in filenames:
+                    try:
+                        os.remove(os.path.join(root, filename))
+
+                    except OSError:
+                        pass
+
+            self._paths.clear()
+            self._usage = dict()
+            self._total_bytes = 0
+
+    def _touch(self, filename: str) -> None:
+        """
+        Marks the given image as being the most recently used
+        """
+        with self._lock:
+            usage = self._read_usage()
+
+            if filename in usage:
+                usage[filename] = usage.pop(filename)
+
+    def _forget(self, filename: str) -> None:
+        """
+        Removes an image which no longer exists from the usage, so it is
+        written again if it is stored again
+        """
+        with self._lock:
+            size = self._read_usage().pop(filename, None)
+
+            if size is not None:
+                self._total_bytes -= size
+
+    def _evict(self, keep: str) -> None:
+        """
+        Removes the least recently used images until we are within our size
+        limit. The given image is never removed.
+        """
+        usage = self._read_usage()
+        evicted = set()
+
+        for filename in list(usage):
+            if self._total_bytes <= self._max_bytes:
+                break
+
+            if filename == keep:
+                continue
+
+            try:
+                os.remove(os.path.join(self._directory, filename))
+
+            except OSError:
+                pass
+
+            self._total_bytes -= usage.pop(filename)
+            evicted.add(filename)
+
+        # -- Keys held in memory which pointed at these images are dropped
+        # -- when they are next requested, as their image no longer exists
+        if evicted:
+            self._remove_references(evicted)
+
+    def _remove_references(self, filenames: set) -> None:
+        """
+        Removes the reference files which point at any of the given images
+        """
+        try:
+            entries = list(os.scandir(os.path.join(self._directory, "keys")))
+
+        except OSError:
+            return
+
+        for entry in entries:
+            try:
+                with open(entry.path, "r") as f:
+                    filename = f.read().strip()
+
+                if filename in filenames:
+                    os.remove(entry.path)
+
+            except OSError:
+                pass
+
+    def _read_usage(self) -> dict:
+        """
+        Returns the image usage, reading it from disk if we have not done
+        so already. The modification time is used as the initial usage order.
+        """
+        if self._usage is not None:
+            return self._usage
+
+        entries = list()
+
+        try:
+            for entry in os.scandir(self._directory):
+                if entry.is_file() and not entry.name.startswith("."):
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime, entry.name, stat.st_size))
+
+        except OSError:
+            pass
+
+        self._usage = {name: size for _, name, size in sorted(entries)}
+        self._total_bytes = sum(self._usage.values())
+
+        return self._usage
+
+    def _reference_filepath(self, key: str) -> str:
+        return os.path.join(
+            self._directory,
+            "keys",
+            hashlib.sha256(key.encode("utf-8")).hexdigest(),
+        )
+
+    @classmethod
+    def _write(cls, path: str, data: bytes) -> None:
+        """
+        Writes the data to a temporary file and then moves it into place, so
+        another process never reads a partially written file.
+        """
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+
+        handle, temp_filepath = tempfile.mkstemp(dir=directory, prefix=".")
+
+        with os.fdopen(handle, "wb") as f:
+            f.write(data)
+
+        os.replace(temp_filepath, path)
@@ -0,0 +1,184 @@
+# ----------------------------------------------------------------------------
+# Copyright (c) Studio Gobo Ltd 2025
+# Licensed under the MIT license.
+# See LICENSE.TXT in the project root for license information.
+# ----------------------------------------------------------------------------
+# File			-> _json_stream.py
+# Created		-> March 2025
+# Author		-> Michael Malinowski (Studio Gobo)
+# ----------------------------------------------------------------------------
+"""
+This module contains an incremental json parser which yields the items of a
+json array as the data arrives, rather than waiting for the whole document.
+
+```python
+>>> with client.open(url) as stream:
+>>>     for record in iter_json_array(stream.chunks(), key="records"):
+>>>         print(record)
+```
+"""
+import codecs
+import json
+import typing
+
+_WHITESPACE = " \t\n\r"
+_NUMERIC = "0123456789+-.eE"
+
+
+class _Reader:
+    """
+    Holds a buffer of decoded text which is topped up from the chunks
+    as required.
+    """
+
+    def __init__(self, chunks: typing.Iterable):
+        self._chunks: typing.Iterator = iter(chunks)
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+        self._json_decoder: json.JSONDecoder = json.JSONDecoder()
+        self._exhausted: bool = False
+
+        self.buffer: str = ""
+        self.position: int = 0
+
+    def fill(self) -> bool:
+        """
+        Reads the next chunk into the buffer, returning False if there
+        is nothing left to read.
+        """
+        if self._exhausted:
+            return False
+
+        try:
+            chunk = next(self._chunks)
+
+        except StopIteration:
+            self._exhausted = True
+            text = self._decoder.decode(b"", final=True)
+
+        else:
+            if isinstance(chunk, bytes):
+                text = self._decoder.decode(chunk)
+
+            else:
+                text = chunk
+
+        # -- Drop anything we have already consumed so the buffer only ever
+        # -- holds the data we have not yet parsed
+        self.buffer = self.buffer[self.position:] + text
+        self.position = 0
+
+        return True
+
+    def peek(self) -> str:
+        """
+        Returns the next character which is not whitespace without consuming
+        it, or an empty string if there is no more data.
+        """
+        while True:
+            while self.position < len(self.buffer):
+                if self.buffer[self.position] not in _WHITESPACE:
+                    return self.buffer[self.position]
+
+                self.position += 1
+
+            if not self.fill():
+                return ""
+
+    def expect(self, character: str) -> None:
+        """
+        Consumes the given character, raising a ValueError if it is not
+        the next character.
+        """
+        found = self.peek()
+
+        if found != character:
+            raise ValueError(f"Expected '{character}' but found '{found}'")
+
+        self.position += 1
+
+    def value(self):
+        """
+        Consumes and returns the next complete json value
+        """
+        self.peek()
+
+        while True:
+            try:
+                value, end = self._json_decoder.raw_decode(
+                    self.buffer,
+                    self.position,
+                )
+
+            except json.JSONDecodeError:
+                if self.fill():
+                    continue
+
+                raise
+
+            # -- A number which finishes at the end of the buffer may continue
+            # -- in the next chunk (such as "0." followed by "1"), so we need
+            # -- more data to be sure we have all of it
+            if self._is_partial_number(value, end) and self.fill():
+                continue
+
+            self.position = end
+            return value
+
+    def _is_partial_number(self, value, end: int) -> bool:
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            return False
+
+        return all(character in _NUMERIC for character in self.buffer[end:])
+
+
+def iter_json_array(
+    chunks: typing.Iterable,
+    key: str | None = None,
+) -> typing.Iterator:
+    """
+    Yields the items of a json array from the given chunks of data as soon
+    as each item has been received.
+
+    Args:
+        chunks: Iterable of bytes (or str) which together make up the document
+        key: If given the document is expected to be an object, and the array
+            is taken from this key. Otherwise the document must be an array.
+
+    Returns:
+        Generator of the array items
+    """
+    reader = _Reader(chunks)
+
+    if key is not None:
+        reader.expect("{")
+
+        while True:
+            if reader.peek() == "}":
+                return
+
+            name = reader.value()
+            reader.expect(":")
+
+            if name == key:
+                break
+
+            # -- Skip over the value of any other key
+            reader.value()
+
+            if reader.peek() == ",":
+                reader.expect(",")
+
+    reader.expect("[")
+
+    if reader.peek() == "]":
+        return
+
+    while True:
+        yield reader.value()
+
+        if reader.peek() == ",":
+            reader.expect(",")
+            continue
+
+        reader.expect("]")
+        return
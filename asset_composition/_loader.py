@@ -0,0 +1,224 @@
+# ----------------------------------------------------------------------------
+# Copyright (c) Studio Gobo Ltd 2025
+# Licensed under the MIT license.
+# See LICENSE.TXT in the project root for license information.
+# ----------------------------------------------------------------------------
+# File			-> _loader.py
+# Created		-> March 2025
+# Author		-> Michael Malinowski (Studio Gobo)
+# ----------------------------------------------------------------------------
+"""
+This module contains the record loader, which allows multiple traits (or
+multiple methods on the same trait) to share the records they fetch from a
+backing service.
+
+Rather than each trait fetching the record it needs, traits request the record
+by key through a loader held by the compositor:
+
+```python
+>>> class MyTrait(asset_composition.Trait):
+>>>
+>>>     def record(self):
+>>>         loader = self.asset().compositor.loader(
+>>>             "my_service.record",
+>>>             batch_load=fetch_records,
+>>>         )
+>>>         return loader.load(self.asset().identifier())
+```
+
+Any requests for the same key, whether they are made at the same time from
+different threads or repeatedly within the time to live, are collapsed into a
+single fetch. Where a batch_load function is given, requests for multiple keys
+are fetched in a single call.
+"""
+import threading
+import time
+import typing
+
+from . import _cache
+
+
+class _Pending:
+    """
+    A key which has been requested but not yet fetched
+    """
+
+    def __init__(self):
+        self.event: threading.Event = threading.Event()
+        self.value = None
+        self.error: BaseException | None = None
+
+
+class RecordLoader:
+    """
+    Collapses requests for keyed records into as few fetches as possible.
+
+    Args:
+        load: Callable which is given a single key and returns its record
+        batch_load: Callable which is given a list of keys and returns a
+            dictionary of key to record. Any keys missing from the dictionary
+            are given a record of None. Where given this is used in preference
+            to load.
+        ttl: Number of seconds a record is held for. If None records are held
+            until they are cleared.
+        max_batch: The maximum number of keys given to batch_load at once
+        batch_window: Number of seconds to wait before fetching, allowing
+            requests from other threads to be collected into the same batch
+        max_entries: The maximum number of records to hold
+    """
+
+    _MISSING = object()
+
+    def __init__(
+        self,
+        load: typing.Callable | None = None,
+        batch_load: typing.Callable | None = None,
+        ttl: float | None = 60.0,
+        max_batch: int = 100,
+        batch_window: float = 0.0,
+        max_entries: int = 4096,
+    ):
+        if not load and not batch_load:
+            raise ValueError("Either load or batch_load must be given")
+
+        self._load: typing.Callable | None = load
+        self._batch_load: typing.Callable | None = batch_load
+        self._max_batch: int = max(1, max_batch)
+        self._batch_window: float = batch_window
+
+        self._records: _cache.TTLCache = _cache.TTLCache(
+            max_entries=max_entries,
+            ttl=ttl,
+        )
+
+        self._pending: dict = dict()
+        self._queue: list = list()
+        self._dispatching: bool = False
+        self._lock: threading.Lock = threading.Lock()
+
+    def load(self, key):
+        """
+        Returns the record for the given key, fetching it if required
+        """
+        return self.load_many([key])[0]
+
+    def load_many(self, keys: list) -> list:
+        """
+        Returns the records for the given keys, in the same order. Any keys
+        which are not already held are fetched together.
+        """
+        results = dict()
+        waiting = dict()
+
+        with self._lock:
+            for key in keys:
+                if key in results or key in waiting:
+                    continue
+
+                record = self._records.get(key, self._MISSING)
+
+                if record is not self._MISSING:
+                    results[key] = record
+                    continue
+
+                # -- If this key is not already being fetched then we queue it
+                pending = self._pending.get(key)
+
+                if pending is None:
+                    pending = self._pending[key] = _Pending()
+                    self._queue.append(key)
+
+                waiting[key] = pending
+
+            # -- Only one thread dispatches the queue at a time, and it will
+            # -- keep dispatching until the queue is empty
+            dispatch = bool(self._queue) and not self._dispatching
+
+            if dispatch:
+                self._dispatching = True
+
+        if dispatch:
+            self._dispatch()
+
+        for key, pending in waiting.items():
+            pending.event.wait()
+
+            if pending.error:
+                raise pending.error
+
+            results[key] = pending.value
+
+        return [results[key] for key in keys]
+
+    def prime(self, key, record) -> None:
+        """
+        Stores a record against a key without fetching it. This is useful when
+        a record has been returned as part of another request.
+        """
+        self._records.set(key, record)
+
+    def clear(self, key=_MISSING) -> None:
+        """
+        Forgets the record held for the given key, or all records if no key
+        is given.
+        """
+        if key is self._MISSING:
+            self._records.clear()
+
+        else:
+            self._records.pop(key)
+
+    def _dispatch(self) -> None:
+        """
+        Fetches the queued keys in batches until the queue is empty
+        """
+        if self._batch_window:
+            time.sleep(self._batch_window)
+
+        while True:
+            with self._lock:
+                keys = self._queue[:self._max_batch]
+                del self._queue[:self._max_batch]
+
+                if not keys:
+                    self._dispatching = False
+                    return
+
+            self._fetch(keys)
+
+    def _fetch(self, keys: list) -> None:
+        """
+        Fetches the given keys and resolves anything waiting upon them
+        """
+        records = dict()
+        errors = dict()
+
+        if self._batch_load:
+            try:
+                records = self._batch_load(keys) or dict()
+
+            except BaseException as exception:
+                errors = {key: exception for key in keys}
+
+        # -- When loading individually a failure for one key should not
+        # -- fail every other key in the batch
+        else:
+            for key in keys:
+                try:
+                    records[key] = self._load(key)
+
+                except BaseException as exception:
+                    errors[key] = exception
+
+        with self._lock:
+            pending = [(key, self._pending.pop(key)) for key in keys]
+
+        for key, item in pending:
+            if key in errors:
+                item.error = errors[key]
+
+            else:
+                item.value = records.get(key)
+                self._records.set(key, item.value)
+
+            item.event.set()
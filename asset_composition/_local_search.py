@@ -0,0 +1,597 @@
+# ----------------------------------------------------------------------------
+# Copyright (c) Studio Gobo Ltd 2025
+# Licensed under the MIT license.
+# See LICENSE.TXT in the project root for license information.
+# ----------------------------------------------------------------------------
+# File			-> _local_search.py
+# Created		-> March 2025
+# Author		-> Michael Malinowski (Studio Gobo)
+# ----------------------------------------------------------------------------
+"""
+This module contains the search engine used to find files and folders on a
+local (or mounted) drive. It gives the same results as the recursive glob of
+a wildcard query:
+
+```python
+>>> glob.glob(root + "/**/*" + query + "*", recursive=True)
+```
+
+But rather than glob, the query is compiled once into a regular expression and
+the folders are walked iteratively using os.scandir. Roots which sit within
+other roots are only walked once, and folders whose names match any of the
+ignore patterns (such as .git or __pycache__) are skipped entirely.
+
+```python
+>>> engine = asset_composition.LocalSearch(workers=4)
+>>> for path in engine.iter_search("*.py", ["/my/project"]):
+>>>     print(path)
+```
+"""
+import fnmatch
+import functools
+import os
+import queue
+import re
+import threading
+import time
+import typing
+
+from . import _trigram
+
+# -- Glob does not match hidden files and folders with a wildcard, so by
+# -- default we skip them along with the python byte code caches
+DEFAULT_IGNORE: tuple = (".*", "__pycache__")
+
+# -- Whether the filesystem is case insensitive, in which case we match in
+# -- the same way glob would
+_IGNORE_CASE: bool = os.path.normcase("A") == "a"
+
+# -- A folder modified within this many nanoseconds of being read may change
+# -- again within the same tick of the filesystem clock, so its modification
+# -- time cannot be trusted and it is read again by the next refresh
+_SETTLE_TIME: int = 2_000_000_000
+
+
+@functools.lru_cache(maxsize=256)
+def compile_query(query: str) -> tuple:
+    """
+    Compiles the query into a tuple of regular expressions, one for each
+    folder level the query spans. Most queries do not contain a separator
+    and therefore only have one expression, which is matched against the
+    name of each file or folder.
+
+    The query is wrapped in wildcards in the same way the local disk discovery
+    plugin always has.
+    """
+    query = query.replace("\\", "/")
+
+    if not query.startswith("*"):
+        query = "*" + query
+
+    if not query.endswith("*"):
+        query += "*"
+
+    flags = re.IGNORECASE if _IGNORE_CASE else 0
+
+    return tuple(
+        re.compile(fnmatch.translate(segment), flags)
+        for segment in query.split("/")
+        if segment
+    )
+
+
+@functools.lru_cache(maxsize=64)
+def _compile_ignore(patterns: tuple) -> re.Pattern | None:
+    if not patterns:
+        return None
+
+    flags = re.IGNORECASE if _IGNORE_CASE else 0
+
+    return re.compile(
+        "|".join(fnmatch.translate(pattern) for pattern in patterns),
+        flags,
+    )
+
+
+def unique_roots(roots: typing.Iterable) -> list:
+    """
+    Returns the given roots with any duplicates, and any roots which sit
+    within another root, removed. The remaining roots keep the form they
+    were given in, but with "/" as the separator.
+    """
+    candidates = list()
+
+    for root in roots:
+        if not root:
+            continue
+
+        root = str(root).replace("\\", "/")
+        key = os.path.normcase(os.path.abspath(root)).replace("\\", "/")
+        candidates.append((key.rstrip("/") + "/", root))
+
+    # -- Sorting by the normalised path puts every root straight after
+    # -- anything which contains it
+    results = list()
+    previous = None
+
+    for key, root in sorted(candidates):
+        if previous and key.startswith(previous):
+            continue
+
+        previous = key
+        results.append(root)
+
+    return results
+
+
+class LocalSearch:
+    """
+    Searches folders for files and folders whose names match a query.
+
+    Args:
+        ignore: Wildcard patterns for the names of files and folders which
+            should never be matched or walked into
+        workers: The number of threads to walk with, which is also the maximum
+            number of folders being read at any one time. When greater than one
+            the folders of every root are read concurrently, which is most
+            beneficial on network drives where each read waits on the server.
+        max_buffered: When walking with multiple threads, the maximum number of
+            folders worth of results held waiting to be consumed. Once this is
+            reached the threads pause until results are taken.
+    """
+
+    DEFAULT_IGNORE: tuple = DEFAULT_IGNORE
+
+    def __init__(
+        self,
+        ignore: typing.Iterable = DEFAULT_IGNORE,
+        workers: int = 1,
+        max_buffered: int = 256,
+    ):
+        self._ignore: re.Pattern | None = _compile_ignore(tuple(ignore or ()))
+        self._workers: int = max(1, workers)
+        self._max_buffered: int = max(1, max_buffered)
+
+    def search(self, query: str, roots) -> list:
+        """
+        Returns a list of the paths matching the query within the given roots
+        """
+        return list(self.iter_search(query, roots))
+
+    def iter_search(
+        self,
+        query: str,
+        roots,
+        deadline: float | None = None,
+    ) -> typing.Iterator[str]:
+        """
+        Yields the paths matching the query within the given roots as they
+        are found.
+
+        Args:
+            query: The wildcard query to match
+            roots: A folder, or list of folders, to search within
+            deadline: If given, the time (as given by time.monotonic) after
+                which no further folders are read
+
+        Returns:
+            Generator of paths, using "/" as the separator
+        """
+        if isinstance(roots, (str, os.PathLike)):
+            roots = [roots]
+
+        patterns = compile_query(query)
+
+        # -- Each folder to read is held along with its path in the form we
+        # -- yield it, and (only where the query spans folders) the names of
+        # -- the folders leading to it from the root
+        folders = [(root, root.rstrip("/"), ()) for root in unique_roots(roots or ())]
+
+        if self._workers == 1:
+            yield from self._walk(folders, patterns, deadline)
+
+        else:
+            yield from _ParallelWalk(self, folders, patterns, deadline)
+
+    def build_index(
+        self,
+        roots,
+        index: "_trigram.TrigramIndex | None" = None,
+    ) -> "_trigram.TrigramIndex":
+        """
+        Walks the given roots, adding every file and folder within them to a
+        trigram index, and marks the roots as being covered by that index.
+        The modification time of each folder is stored alongside, allowing
+        refresh_index to find the folders which have changed since.
+
+        Args:
+            roots: A folder, or list of folders, to index
+            index: The index to add to. If not given a new index is created
+                which indexes each path by its name.
+
+        Returns:
+            TrigramIndex
+        """
+        if isinstance(roots, (str, os.PathLike)):
+            roots = [roots]
+
+        roots = unique_roots(roots or ())
+
+        if index is None:
+            index = _trigram.TrigramIndex(key=_name)
+
+        self._index_folders(index, [(root, root.rstrip("/"), ()) for root in roots])
+
+        for root in roots:
+            index.add_scope(root)
+
+        return index
+
+    def refresh_index(
+        self,
+        index: "_trigram.TrigramIndex",
+        roots,
+    ) -> None:
+        """
+        Reads again every folder within the given roots whose modification
+        time differs from the one stored in the index, adding anything new
+        within it. This costs a single stat of each indexed folder rather
+        than reading every one of them.
+
+        Note that only folders added through build_index have a modification
+        time stored, so this does nothing for indexes built by other means.
+        """
+        if isinstance(roots, (str, os.PathLike)):
+            roots = [roots]
+
+        stamps = index.stamps(unique_roots(roots or ()))
+        changed = list()
+
+        for folder, stamp in stamps.items():
+            try:
+                modified = os.stat(folder).st_mtime_ns
+
+            # -- The folder has gone, and the paths within it are removed
+            # -- from the index as they are found to be missing
+            except OSError:
+                index.discard_stamp(folder)
+                continue
+
+            if modified != stamp:
+                changed.append(folder)
+
+        patterns = compile_query("*")
+
+        for folder in changed:
+            self._stamp(index, folder)
+
+            matches, folders = self._read((folder, folder, ()), patterns)
+            index.update(matches)
+
+            # -- Any folder we hold no stamp for is new (or has been moved
+            # -- here), so everything within it has to be added
+            self._index_folders(
+                index,
+                [entry for entry in folders if entry[1] not in stamps],
+            )
+
+    def search_index(
+        self,
+        index: "_trigram.TrigramIndex",
+        query: str,
+        roots,
+    ) -> list:
+        """
+        Answers the query from the given index rather than walking the
+        folders. Folders which have changed since they were indexed are read
+        again first, and paths which no longer exist are removed from the
+        index.
+        """
+        if isinstance(roots, (str, os.PathLike)):
+            roots = [roots]
+
+        self.refresh_index(index, roots)
+
+        # -- Only the last part of the query is matched against the names, so
+        # -- that is the only part we can take trigrams from
+        lookup = query.replace("\\", "/").rsplit("/", 1)[-1]
+
+        results = list()
+
+        for path in index.search(query, self.matches, unique_roots(roots), lookup):
+            if os.path.lexists(path):
+                results.append(path)
+
+            else:
+                index.discard(path)
+
+        return results
+
+    def matches(self, query: str, path: str) -> bool:
+        """
+        Returns True if the given path, which was found within one of the
+        searched roots, would match the query.
+        """
+        parts = path.replace("\\", "/").rstrip("/").split("/")
+        return _matches_lineage(compile_query(query), tuple(parts))
+
+    def _index_folders(self, index: "_trigram.TrigramIndex", stack: list) -> None:
+        """
+        Walks the folders in the given stack, adding everything within them to
+        the index along with the modification time of each folder.
+        """
+        patterns = compile_query("*")
+
+        while stack:
+            folder = stack.pop()
+
+            # -- The stamp is taken before reading, so anything changing
+            # -- whilst we read gives the folder a newer time than we hold
+            self._stamp(index, folder[1])
+
+            matches, folders = self._read(folder, patterns)
+
+            index.update(matches)
+            stack.extend(folders)
+
+    @staticmethod
+    def _stamp(index: "_trigram.TrigramIndex", folder: str) -> None:
+        """
+        Stores the modification time of the folder within the index
+        """
+        try:
+            modified = os.stat(folder).st_mtime_ns
+
+        except OSError:
+            index.discard_stamp(folder)
+            return
+
+        if time.time_ns() - modified < _SETTLE_TIME:
+            modified = None
+
+        index.set_stamp(folder, modified)
+
+    def _walk(
+        self,
+        stack: list,
+        patterns: tuple,
+        deadline: float | None,
+    ) -> typing.Iterator[str]:
+        """
+        Walks the folders in the given stack iteratively on this thread,
+        yielding every matching path.
+        """
+        while stack:
+            if deadline is not None and time.monotonic() >= deadline:
+                return
+
+            matches, folders = self._read(stack.pop(), patterns)
+
+            yield from matches
+            stack.extend(folders)
+
+    def _read(self, folder: tuple, patterns: tuple) -> tuple:
+        """
+        Reads a single folder, returning a list of the matching paths within
+        it, and a list of the folders within it to walk into.
+        """
+        ignore = self._ignore
+        pattern = patterns[-1]
+        spans_folders = len(patterns) > 1
+
+        path, prefix, lineage = folder
+
+        matches = list()
+        folders = list()
+
+        try:
+            entries = os.scandir(path)
+
+        except OSError:
+            return matches, folders
+
+        # -- The folder can become unreadable whilst we are part way through
+        # -- it (such as it being removed), in which case we keep whatever we
+        # -- read before that happened
+        try:
+            with entries:
+                for entry in entries:
+                    name = entry.name
+
+                    if ignore and ignore.match(name):
+                        continue
+
+                    if pattern.match(name):
+                        if not spans_folders or _matches_lineage(
+                            patterns,
+                            lineage + (name,),
+                        ):
+                            matches.append(prefix + "/" + name)
+
+                    # -- Symbolic links to folders are not walked into, as
+                    # -- they can lead to cycles
+                    try:
+                        is_dir = entry.is_dir(follow_symlinks=False)
+
+                    except OSError:
+                        is_dir = False
+
+                    if is_dir:
+                        folders.append(
+                            (
+                                entry.path,
+                                prefix + "/" + name,
+                                lineage + (name,) if spans_folders else (),
+                            ),
+                        )
+
+        except OSError:
+            pass
+
+        return matches, folders
+
+
+class _ParallelWalk:
+    """
+    Walks folders using a fixed number of threads which share a single stack
+    of folders to read, so every thread stays busy regardless of how the
+    folders are spread between the roots.
+
+    The matches are passed back through a bounded queue, meaning the threads
+    only ever get so far ahead of whoever is consuming the results.
+    """
+
+    # -- Placed on the results queue once every folder has been read
+    _DONE = object()
+
+    def __init__(
+        self,
+        engine: LocalSearch,
+        folders: list,
+        patterns: tuple,
+        deadline: float | None,
+    ):
+        self._engine: LocalSearch = engine
+        self._patterns: tuple = patterns
+        self._deadline: float | None = deadline
+
+        self._folders: list = list(folders)
+
+        # -- The number of folders which are either waiting to be read or
+        # -- being read. Once this reaches zero the walk is complete.
+        self._outstanding: int = len(self._folders)
+
+        self._results: queue.Queue = queue.Queue(maxsize=engine._max_buffered)
+        self._condition: threading.Condition = threading.Condition()
+
+        # -- Set once the threads should stop reading folders, and once the
+        # -- results are no longer being consumed respectively
+        self._stopped: bool = False
+        self._closed: bool = False
+
+    def __iter__(self) -> typing.Iterator[str]:
+        if not self._outstanding:
+            return
+
+        threads = [
+            threading.Thread(target=self._work, daemon=True)
+            for _ in range(self._engine._workers)
+        ]
+
+        for thread in threads:
+            thread.start()
+
+        try:
+            while True:
+                matches = self._results.get()
+
+                if matches is self._DONE:
+                    return
+
+                yield from matches
+
+        finally:
+            # -- If we are stopped early (such as the consumer having enough
+            # -- results) we need to release any threads waiting for folders
+            # -- or waiting to put their results
+            with self._condition:
+                self._closed = True
+                self._stop()
+
+            for thread in threads:
+                thread.join()
+
+    def _work(self) -> None:
+        deadline = self._deadline
+
+        while True:
+            with self._condition:
+                while not self._folders and self._outstanding and not self._stopped:
+                    self._condition.wait()
+
+                if self._stopped:
+                    return
+
+                if deadline is not None and time.monotonic() >= deadline:
+                    self._stop()
+                    break
+
+                folder = self._folders.pop()
+
+            # -- The folder must be counted as done whatever happens whilst
+            # -- reading it, otherwise the walk would never complete and the
+            # -- consumer would wait forever
+            finished = False
+
+            try:
+                matches, folders = self._engine._read(folder, self._patterns)
+
+                # -- We queue the sub folders straight away so other threads
+                # -- can start on them whilst we wait to hand over our results
+                if folders:
+                    with self._condition:
+                        self._folders.extend(folders)
+                        self._outstanding += len(folders)
+                        self._condition.notify_all()
+
+                if matches:
+                    self._put(matches)
+
+            finally:
+                # -- The folder is only counted as done once its results have
+                # -- been queued, so they can never arrive after the walk is
+                # -- complete
+                with self._condition:
+                    self._outstanding -= 1
+
+                    if not self._outstanding:
+                        self._stop()
+                        finished = True
+
+                if finished:
+                    self._put(self._DONE)
+
+            if finished:
+                return
+
+        # -- Only the thread which stopped the walk at the deadline reaches
+        # -- here
+        self._put(self._DONE)
+
+    def _stop(self) -> None:
+        """
+        Stops the threads from reading any further folders. This must be
+        called with the condition held.
+        """
+        self._stopped = True
+        self._condition.notify_all()
+
+    def _put(self, item) -> None:
+        """
+        Puts the item on the results queue, giving up if the results are no
+        longer being consumed whilst waiting for space.
+        """
+        while not self._closed:
+            try:
+                self._results.put(item, timeout=0.05)
+                return
+
+            except queue.Full:
+                pass
+
+
+def _name(path: str) -> str:
+    return path.rstrip("/").rsplit("/", 1)[-1]
+
+
+def _matches_lineage(patterns: tuple, lineage: tuple) -> bool:
+    """
+    Returns True if the trailing names of the lineage match the patterns
+    """
+    if len(lineage) < len(patterns):
+        return False
+
+    return all(
+        pattern.match(part)
+        for pattern, part in zip(patterns, lineage[-len(patterns):])
+    )
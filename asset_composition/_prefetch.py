@@ -0,0 +1,335 @@
+# ----------------------------------------------------------------------------
+# Copyright (c) Studio Gobo Ltd 2025
+# Licensed under the MIT license.
+# See LICENSE.TXT in the project root for license information.
+# ----------------------------------------------------------------------------
+# File			-> _prefetch.py
+# Created		-> March 2025
+# Author		-> Michael Malinowski (Studio Gobo)
+# ----------------------------------------------------------------------------
+"""
+This module contains the prefetch scheduler which allows assets to be resolved
+ahead of the user needing them. A typical use case is an asset browser, where
+the children of an expanded node can be resolved in the background before the
+user expands them.
+
+```python
+>>> asset = compositor.get(folder)
+>>>
+>>> # -- Resolve the children (and grandchildren) in the background
+>>> request = asset.prefetch_children(depth=2)
+>>>
+>>> # -- If the user navigates away we can stop any outstanding work
+>>> request.cancel()
+```
+
+Work is resolved on a bounded pool of worker threads and is taken in order of
+priority, where a lower value is resolved first. This allows visible nodes to
+be given a priority of zero and be resolved before anything else.
+
+The workers run until the prefetcher is shut down, which happens when the
+compositor is closed or garbage collected.
+"""
+import itertools
+import queue
+import threading
+import weakref
+
+
+class PrefetchRequest:
+    """
+    This is returned whenever work is scheduled with the Prefetcher and
+    allows that work to be cancelled or waited upon.
+    """
+
+    def __init__(self):
+        self._cancelled: bool = False
+        self._outstanding: int = 0
+        self._condition: threading.Condition = threading.Condition()
+
+    def cancel(self) -> None:
+        """
+        Marks this request as cancelled. Any work which has not yet started
+        will be skipped.
+        """
+        self._cancelled = True
+
+    def is_cancelled(self) -> bool:
+        """
+        Returns True if this request has been cancelled
+        """
+        return self._cancelled
+
+    def is_done(self) -> bool:
+        """
+        Returns True if there is no outstanding work for this request
+        """
+        with self._condition:
+            return self._outstanding == 0
+
+    def wait(self, timeout: float | None = None) -> bool:
+        """
+        Blocks until all the work for this request (including any work
+        scheduled for deeper levels) has completed or been skipped.
+
+        Args:
+            timeout: Maximum time in seconds to wait
+
+        Returns:
+            True if the request completed within the timeout
+        """
+        with self._condition:
+            return self._condition.wait_for(
+                lambda: self._outstanding == 0,
+                timeout=timeout,
+            )
+
+    def _add(self, count: int = 1) -> None:
+        with self._condition:
+            self._outstanding += count
+
+    def _complete(self) -> None:
+        with self._condition:
+            self._outstanding -= 1
+
+            if not self._outstanding:
+                self._condition.notify_all()
+
+
+class Prefetcher:
+    """
+    The prefetcher resolves and caches assets on a bounded pool of worker
+    threads. Assets are resolved through Compositor.get, therefore once they
+    have been prefetched any subsequent call to get is served from the
+    compositor cache.
+
+    Only a weak reference to the compositor is held, so the worker threads
+    never keep it alive.
+
+    Args:
+        compositor: The compositor to resolve assets through
+        workers: The maximum number of threads resolving assets at once
+    """
+
+    # -- Placed on the queue once for each worker to have it exit. It is
+    # -- given the lowest priority, so work queued before it is still taken
+    _STOP = float("inf")
+
+    def __init__(
+        self,
+        compositor: "asset_composition.Compositor",
+        workers: int = 4,
+    ):
+        self._compositor: weakref.ref = weakref.ref(compositor)
+        self._workers: int = max(1, workers)
+
+        # -- Tasks are held in a priority queue, and the counter ensures that
+        # -- tasks with the same priority are taken in the order they were given
+        self._queue: queue.PriorityQueue = queue.PriorityQueue()
+        self._counter = itertools.count()
+
+        # -- Threads are only started when work is first scheduled
+        self._threads: list = []
+        self._lock: threading.Lock = threading.Lock()
+
+        # -- Track the requests which have work outstanding so we can
+        # -- cancel them all in one go
+        self._requests: set = set()
+
+        # -- Once shut down, any work scheduled is skipped
+        self._shutdown: bool = False
+
+    def schedule(
+        self,
+        identifiers: list,
+        depth: int = 0,
+        lightweight: bool = True,
+        priority: int = 0,
+        request: PrefetchRequest | None = None,
+    ) -> PrefetchRequest:
+        """
+        Schedules the given identifiers to be resolved in the background.
+
+        Args:
+            identifiers: List of identifiers to resolve
+            depth: How many levels of children below each identifier should
+                also be resolved. Zero means only the given identifiers are
+                resolved.
+            lightweight: If True the assets are resolved in lightweight form
+            priority: Lower values are resolved first. Children are always
+                resolved at one priority level below their parent.
+            request: Optional request to add this work to. If not given a new
+                request is created.
+
+        Returns:
+            PrefetchRequest
+        """
+        request = request or PrefetchRequest()
+
+        for identifier in identifiers:
+            self._put(
+                priority,
+                request,
+                self._resolve,
+                identifier,
+                depth,
+                lightweight,
+            )
+
+        return request
+
+    def schedule_children(
+        self,
+        asset: "asset_composition.Asset",
+        depth: int = 1,
+        lightweight: bool = True,
+        priority: int = 0,
+    ) -> PrefetchRequest:
+        """
+        Schedules the children of the given asset to be resolved in the
+        background. The children are listed on a worker thread too, so this
+        call returns immediately.
+
+        Args:
+            asset: The asset whose children should be resolved
+            depth: How many levels of children to resolve. One will resolve
+                the children, two will resolve the children and grandchildren.
+            lightweight: If True the assets are resolved in lightweight form
+            priority: Lower values are resolved first
+
+        Returns:
+            PrefetchRequest
+        """
+        request = PrefetchRequest()
+
+        if depth > 0:
+            self._put(
+                priority,
+                request,
+                self._expand,
+                asset,
+                depth,
+                lightweight,
+            )
+
+        return request
+
+    def cancel_all(self) -> None:
+        """
+        Cancels all the requests which currently have work outstanding
+        """
+        with self._lock:
+            requests = list(self._requests)
+
+        for request in requests:
+            request.cancel()
+
+    def shutdown(self, wait: bool = True) -> None:
+        """
+        Cancels all outstanding work and stops the worker threads. Any work
+        scheduled from here on is skipped.
+
+        Args:
+            wait: If True, this blocks until every worker thread has exited
+        """
+        with self._lock:
+            self._shutdown = True
+            threads = list(self._threads)
+            self._threads = []
+
+        self.cancel_all()
+
+        for _ in threads:
+            self._queue.put((self._STOP, next(self._counter), None, None))
+
+        if not wait:
+            return
+
+        for thread in threads:
+            if thread is not threading.current_thread():
+                thread.join()
+
+    def _put(self, priority: int, request: PrefetchRequest, *task) -> None:
+        """
+        Adds a task to the queue, ensuring there are threads available
+        to process it.
+        """
+        with self._lock:
+            if self._shutdown:
+                return
+
+            request._add()
+            self._requests.add(request)
+
+            if len(self._threads) < self._workers:
+                thread = threading.Thread(
+                    target=self._run,
+                    name="AssetPrefetcher",
+                    daemon=True,
+                )
+                self._threads.append(thread)
+                thread.start()
+
+        self._queue.put((priority, next(self._counter), request, task))
+
+    def _run(self) -> None:
+        """
+        The main loop for each worker thread
+        """
+        while True:
+            priority, _, request, task = self._queue.get()
+
+            if request is None:
+                return
+
+            try:
+                if not request.is_cancelled():
+                    function, *args = task
+                    function(request, priority, *args)
+
+            # -- Prefetching is opportunistic, so a failure to resolve
+            # -- an asset must never take down the worker thread. The asset
+            # -- will simply be resolved when it is explicitly requested.
+            except Exception:
+                pass
+
+            finally:
+                request._complete()
+
+                if request.is_done():
+                    with self._lock:
+                        self._requests.discard(request)
+
+    def _resolve(
+        self,
+        request: PrefetchRequest,
+        priority: int,
+        identifier: str,
+        depth: int,
+        lightweight: bool,
+    ) -> None:
+        compositor = self._compositor()
+
+        if compositor is None:
+            return
+
+        asset = compositor.get(identifier, lightweight=lightweight)
+
+        if depth > 0:
+            self._expand(request, priority, asset, depth, lightweight)
+
+    def _expand(
+        self,
+        request: PrefetchRequest,
+        priority: int,
+        asset: "asset_composition.Asset",
+        depth: int,
+        lightweight: bool,
+    ) -> None:
+        self.schedule(
+            asset.children(),
+            depth=depth - 1,
+            lightweight=lightweight,
+            priority=priority + 1,
+            request=request,
+        )
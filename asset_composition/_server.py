@@ -0,0 +1,667 @@
+# ----------------------------------------------------------------------------
+# Copyright (c) Studio Gobo Ltd 2025
+# Licensed under the MIT license.
+# See LICENSE.TXT in the project root for license information.
+# ----------------------------------------------------------------------------
+# File			-> _server.py
+# Created		-> March 2025
+# Author		-> Michael Malinowski (Studio Gobo)
+# ----------------------------------------------------------------------------
+"""
+This module allows a single, long lived compositor to answer the asset queries
+of any number of short lived tools on the same machine. The server holds the
+compositor (so plugins are only imported and assets only bound once) and the
+tools talk to it through a unix domain socket.
+
+```python
+>>> # -- Within the server process (or python -m asset_composition serve)
+>>> server = asset_composition.AssetServer(compositor)
+>>> server.serve_forever()
+>>>
+>>> # -- Within each tool
+>>> client = asset_composition.AssetClient()
+>>> asset = client.get("/my/project/file.ma")
+>>> asset.children()
+```
+
+Each message is a four byte (big endian) length followed by that many bytes of
+utf-8 encoded json. Every request is a dictionary holding the name of the
+operation under "op" along with its arguments, and every response holds
+either the "result" or an "error" along with the name of the exception type.
+"""
+import builtins
+import errno
+import json
+import os
+import socket
+import socketserver
+import stat
+import struct
+import threading
+import typing
+
+from . import _cache, _compositor
+
+_LENGTH = struct.Struct(">I")
+
+# -- Guards against reading an absurd amount of data from a bad client
+_MAX_MESSAGE_SIZE: int = 64 * 1024 * 1024
+
+# -- The composite methods a client may call on an asset
+SERVED_METHODS: tuple = (
+    "label",
+    "info",
+    "icon",
+    "status_icons",
+    "parent",
+    "children",
+    "ancestors",
+    "siblings",
+    "is_visible",
+    "is_valid",
+    "custom_data",
+    "trait_names",
+)
+
+
+def default_address() -> str:
+    """
+    Returns the socket the server listens on by default. This can be set with
+    the ASSET_COMPOSITION_SERVER environment variable and otherwise sits
+    within the cache directory.
+    """
+    return os.environ.get(
+        "ASSET_COMPOSITION_SERVER",
+        _cache.cache_directory("server.sock"),
+    )
+
+
+def send_message(connection: socket.socket, message) -> None:
+    """
+    Writes a single length prefixed message to the socket
+    """
+    data = json.dumps(message, separators=(",", ":"), default=str).encode("utf-8")
+    connection.sendall(_LENGTH.pack(len(data)) + data)
+
+
+def receive_message(connection: socket.socket):
+    """
+    Reads a single length prefixed message from the socket, returning None
+    if the other side closed the connection.
+    """
+    header = _receive_exactly(connection, _LENGTH.size)
+
+    if header is None:
+        return None
+
+    (size,) = _LENGTH.unpack(header)
+
+    if size > _MAX_MESSAGE_SIZE:
+        raise ValueError(f"Message of {size} bytes exceeds the maximum size")
+
+    data = _receive_exactly(connection, size)
+
+    if data is None:
+        raise ConnectionError("Connection closed part way through a message")
+
+    return json.loads(data)
+
+
+def _receive_exactly(connection: socket.socket, size: int) -> bytes | None:
+    chunks = list()
+    remaining = size
+
+    while remaining:
+        chunk = connection.recv(min(remaining, 1024 * 1024))
+
+        if not chunk:
+            if remaining == size:
+                return None
+
+            raise ConnectionError("Connection closed part way through a message")
+
+        chunks.append(chunk)
+        remaining -= len(chunk)
+
+    return b"".join(chunks)
+
+
+class AssetServer:
+    """
+    Serves the assets of a compositor over a unix domain socket. Each client
+    connection is handled on its own thread, all sharing the one compositor.
+
+    Args:
+        compositor: The compositor to serve. If not given one is created with
+            the default configuration.
+        address: The path of the socket. If not given the default address is
+            used.
+        allow_actions: If True clients may call the actions of an asset, which
+            then run within the server process. Listing actions is always
+            allowed.
+    """
+
+    def __init__(
+        self,
+        compositor: "asset_composition.Compositor | None" = None,
+        address: str | None = None,
+        allow_actions: bool = False,
+    ):
+        if not hasattr(socket, "AF_UNIX"):
+            raise OSError("Unix domain sockets are not supported on this platform")
+
+        if compositor is None:
+            compositor = _compositor.Compositor()
+
+        self.compositor: "asset_composition.Compositor" = compositor
+
+        self._address: str = address or default_address()
+        self._allow_actions: bool = allow_actions
+        self._thread: threading.Thread | None = None
+
+        _remove_stale_socket(self._address)
+        os.makedirs(os.path.dirname(os.path.abspath(self._address)), exist_ok=True)
+
+        # -- Only the user running the server may connect to it. The socket
+        # -- is created with these permissions rather than changed once it is
+        # -- listening, so there is no moment at which others can connect.
+        umask = os.umask(0o177)
+
+        try:
+            self._server: _UnixServer = _UnixServer(self._address, self)
+
+        finally:
+            os.umask(umask)
+
+    def address(self) -> str:
+        """
+        Returns the path of the socket the server is listening on
+        """
+        return self._address
+
+    def start(self) -> None:
+        """
+        Starts serving on a background thread
+        """
+        if self._thread:
+            return
+
+        self._thread = threading.Thread(
+            target=self._server.serve_forever,
+            kwargs=dict(poll_interval=0.05),
+            daemon=True,
+        )
+        self._thread.start()
+
+    def serve_forever(self) -> None:
+        """
+        Serves on the calling thread until interrupted
+        """
+        self._server.serve_forever()
+
+    def stop(self) -> None:
+        """
+        Stops serving and removes the socket
+        """
+        if self._thread:
+            self._server.shutdown()
+            self._thread.join()
+            self._thread = None
+
+        self._server.server_close()
+
+        try:
+            os.remove(self._address)
+
+        except OSError:
+            pass
+
+    def __enter__(self) -> "AssetServer":
+        self.start()
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.stop()
+
+    def handle(self, request: dict):
+        """
+        Answers a single request, returning the result
+        """
+        op = request.get("op")
+        compositor = self.compositor
+
+        if op == "ping":
+            return True
+
+        if op == "search":
+            assets = compositor.search(
+                request["query"],
+                search_from=request.get("search_from"),
+                limit=request.get("limit"),
+                deadline=request.get("deadline"),
+                sort=request.get("sort", True),
+            )
+            return [asset.identifier() for asset in assets]
+
+        if op == "invalidate":
+            compositor.invalidate(
+                request["identifiers"],
+                recursive=request.get("recursive", False),
+                rebind=request.get("rebind", False),
+            )
+            return None
+
+        asset = compositor.get(
+            request["identifier"],
+            lightweight=request.get("lightweight", False),
+        )
+
+        if op == "get":
+            return asset.trait_names()
+
+        if op == "call":
+            method_name = request["method"]
+
+            if method_name not in SERVED_METHODS:
+                raise ValueError(f"{method_name} cannot be called remotely")
+
+            return getattr(asset, method_name)()
+
+        if op == "actions":
+            return [
+                dict(
+                    name=action.name(),
+                    category=action.category(),
+                    icon=action.icon(),
+                    hidden=action.hidden(),
+                )
+                for action in asset.actions()
+            ]
+
+        if op == "call_action":
+            if not self._allow_actions:
+                raise PermissionError("This server does not allow actions to be called")
+
+            action = asset.action(request["name"])
+
+            if action is None:
+                raise KeyError(request["name"])
+
+            return action.call()
+
+        raise ValueError(f"Unknown operation : {op}")
+
+
+class _UnixServer(socketserver.ThreadingUnixStreamServer):
+
+    daemon_threads = True
+
+    def __init__(self, address: str, asset_server: AssetServer):
+        self.asset_server: AssetServer = asset_server
+        super(_UnixServer, self).__init__(address, _Handler)
+
+
+class _Handler(socketserver.BaseRequestHandler):
+    """
+    Answers the requests on a single connection until the client closes it
+    """
+
+    def handle(self) -> None:
+        while True:
+            try:
+                request = receive_message(self.request)
+
+            except (OSError, ValueError):
+                return
+
+            if request is None:
+                return
+
+            try:
+                response = dict(result=self.server.asset_server.handle(request))
+
+            except Exception as exception:
+                response = dict(
+                    error=str(exception),
+                    type=exception.__class__.__name__,
+                )
+
+            try:
+                send_message(self.request, response)
+
+            except OSError:
+                return
+
+
+class AssetClient:
+    """
+    Talks to an AssetServer, giving back assets which offer the same methods
+    as an Asset but are answered by the server. A client can be shared between
+    threads, though requests on one client are sent one at a time.
+
+    Args:
+        address: The path of the server socket. If not given the default
+            address is used.
+        timeout: Number of seconds to wait for each response
+    """
+
+    def __init__(self, address: str | None = None, timeout: float | None = None):
+        self._address: str = address or default_address()
+        self._timeout: float | None = timeout
+        self._connection: socket.socket | None = None
+        self._lock: threading.Lock = threading.Lock()
+
+    def request(self, op: str, **kwargs):
+        """
+        Sends a request to the server and returns its result. If the server
+        raised an error it is raised here, as a RuntimeError if its type is not
+        a builtin exception.
+        """
+        kwargs["op"] = op
+
+        with self._lock:
+            connection = self._connect()
+
+            try:
+                send_message(connection, kwargs)
+                response = receive_message(connection)
+
+            except OSError:
+                self._disconnect()
+                raise
+
+            if response is None:
+                self._disconnect()
+                raise ConnectionError("The asset server closed the connection")
+
+        if "error" in response:
+            raise _error_type(response.get("type"))(response["error"])
+
+        return response.get("result")
+
+    def ping(self) -> bool:
+        """
+        Returns True if the server can be reached
+        """
+        try:
+            return self.request("ping")
+
+        except OSError:
+            return False
+
+    def get(self, identifier: str, lightweight: bool = False) -> "RemoteAsset":
+        """
+        Resolves the asset for the given identifier on the server
+        """
+        trait_names = self.request(
+            "get",
+            identifier=identifier,
+            lightweight=lightweight,
+        )
+        return RemoteAsset(self, identifier, lightweight, trait_names)
+
+    def search(
+        self,
+        query: str,
+        search_from=None,
+        limit: int | None = None,
+        deadline: float | None = None,
+        sort: bool = True,
+    ) -> list:
+        """
+        Runs a search on the server, in the same way as Compositor.search
+        """
+        identifiers = self.request(
+            "search",
+            query=query,
+            search_from=search_from,
+            limit=limit,
+            deadline=deadline,
+            sort=sort,
+        )
+        return [RemoteAsset(self, identifier) for identifier in identifiers]
+
+    def invalidate(
+        self,
+        identifiers: list,
+        recursive: bool = False,
+        rebind: bool = False,
+    ) -> None:
+        """
+        Invalidates the given identifiers on the server
+        """
+        self.request(
+            "invalidate",
+            identifiers=list(identifiers),
+            recursive=recursive,
+            rebind=rebind,
+        )
+
+    def close(self) -> None:
+        """
+        Closes the connection to the server
+        """
+        with self._lock:
+            self._disconnect()
+
+    def __enter__(self) -> "AssetClient":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def _connect(self) -> socket.socket:
+        if self._connection is None:
+            connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            connection.settimeout(self._timeout)
+
+            try:
+                connection.connect(self._address)
+
+            except OSError:
+                connection.close()
+                raise
+
+            self._connection = connection
+
+        return self._connection
+
+    def _disconnect(self) -> None:
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+
+class RemoteAsset:
+    """
+    An asset held by an asset server. This offers the same accessors as an
+    Asset, each of which is answered by the server.
+    """
+
+    def __init__(
+        self,
+        client: AssetClient,
+        identifier: str,
+        lightweight: bool = False,
+        trait_names: list | None = None,
+    ):
+        self._client: AssetClient = client
+        self._identifier: str = identifier
+        self._lightweight: bool = lightweight
+        self._trait_names: list | None = trait_names
+
+    def __repr__(self) -> str:
+        return f"[RemoteAsset ({self._identifier})]"
+
+    def identifier(self) -> str:
+        return self._identifier
+
+    def is_lightweight(self) -> bool:
+        return self._lightweight
+
+    def trait_names(self) -> list:
+        if self._trait_names is None:
+            self._trait_names = self._call("trait_names")
+
+        return list(self._trait_names)
+
+    def label(self) -> str:
+        return self._call("label")
+
+    def info(self) -> str:
+        return self._call("info")
+
+    def icon(self) -> str:
+        return self._call("icon")
+
+    def status_icons(self) -> list:
+        return self._call("status_icons")
+
+    def parent(self) -> str:
+        return self._call("parent")
+
+    def children(self) -> list:
+        return self._call("children")
+
+    def ancestors(self) -> list:
+        return self._call("ancestors")
+
+    def siblings(self) -> list:
+        return self._call("siblings")
+
+    def is_visible(self) -> bool:
+        return self._call("is_visible")
+
+    def is_valid(self) -> bool:
+        return self._call("is_valid")
+
+    def custom_data(self) -> dict:
+        return self._call("custom_data")
+
+    def actions(self) -> list:
+        descriptions = self._client.request(
+            "actions",
+            identifier=self._identifier,
+            lightweight=self._lightweight,
+        )
+        return [RemoteAction(self, **description) for description in descriptions]
+
+    def action(self, action_name: str) -> "RemoteAction | None":
+        for action in self.actions():
+            if action.name() == action_name:
+                return action
+
+        return None
+
+    def has_action(self, action_name: str) -> bool:
+        return self.action(action_name) is not None
+
+    def _call(self, method_name: str):
+        return self._client.request(
+            "call",
+            identifier=self._identifier,
+            lightweight=self._lightweight,
+            method=method_name,
+        )
+
+
+class RemoteAction:
+    """
+    Describes an action of a remote asset. Calling it runs the action within
+    the server process, which the server must allow.
+    """
+
+    def __init__(
+        self,
+        asset: RemoteAsset,
+        name: str,
+        category: str = "",
+        icon: str = "",
+        hidden: bool = False,
+    ):
+        self._asset: RemoteAsset = asset
+        self._name: str = name
+        self._category: str = category
+        self._icon: str = icon
+        self._hidden: bool = hidden
+
+    def name(self) -> str:
+        return self._name
+
+    def category(self) -> str:
+        return self._category
+
+    def icon(self) -> str:
+        return self._icon
+
+    def hidden(self) -> bool:
+        return self._hidden
+
+    @property
+    def call(self) -> typing.Callable:
+        return self._call
+
+    def _call(self):
+        return self._asset._client.request(
+            "call_action",
+            identifier=self._asset.identifier(),
+            lightweight=self._asset.is_lightweight(),
+            name=self._name,
+        )
+
+    def __repr__(self) -> str:
+        return f"[Action:{self.category()}:{self.name()}]"
+
+
+def _remove_stale_socket(address: str) -> None:
+    """
+    Removes a socket left behind by a server which is no longer running. An
+    error is raised if a server is still listening on it, or if the address
+    is taken by something other than a socket, which is never removed.
+    """
+    try:
+        mode = os.lstat(address).st_mode
+
+    except FileNotFoundError:
+        return
+
+    if not stat.S_ISSOCK(mode):
+        raise FileExistsError(
+            errno.EEXIST,
+            "The server address is taken by something other than a socket",
+            address,
+        )
+
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+
+    try:
+        probe.connect(address)
+
+    # -- Only a socket nothing is listening on is left behind. Any other
+    # -- failure (such as a lack of permission) is not ours to resolve.
+    except (ConnectionRefusedError, FileNotFoundError):
+        try:
+            os.remove(address)
+
+        except FileNotFoundError:
+            pass
+
+        return
+
+    finally:
+        probe.close()
+
+    raise OSError(f"An asset server is already listening on {address}")
+
+
+def _error_type(name: str | None) -> type:
+    """
+    Returns the builtin exception type with the given name, falling back to
+    RuntimeError for anything else
+    """
+    error_type = getattr(builtins, name or "", None)
+
+    if isinstance(error_type, type) and issubclass(error_type, Exception):
+        return error_type
+
+    return RuntimeError
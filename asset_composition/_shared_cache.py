@@ -0,0 +1,409 @@
+# ----------------------------------------------------------------------------
+# Copyright (c) Studio Gobo Ltd 2025
+# Licensed under the MIT license.
+# See LICENSE.TXT in the project root for license information.
+# ----------------------------------------------------------------------------
+# File			-> _shared_cache.py
+# Created		-> March 2025
+# Author		-> Michael Malinowski (Studio Gobo)
+# ----------------------------------------------------------------------------
+"""
+This module contains a cache of resolved assets which can be shared between
+processes on the same machine, such as a group of batch workers which would
+otherwise each bind the same assets.
+
+```python
+>>> shared_cache = asset_composition.SharedCache()
+>>> compositor = asset_composition.Compositor(shared_cache=shared_cache)
+```
+
+The cache is an SQLite database in write ahead log mode, meaning any number
+of processes can read from it whilst another is writing. For every asset it
+holds the binding profile (the names of the bound traits along with a stamp
+from each of them) and the results of the composite methods which can safely
+be cached, in the same form as a snapshot.
+
+Entries are scoped by the fingerprint of the configuration which wrote them,
+so a compositor only ever sees the entries written by compositors with the
+same configuration. Once the cache holds more than its maximum number of
+assets those least recently used are removed.
+
+Any failure to read or write the database (such as it being locked for longer
+than the timeout) is treated as a cache miss rather than an error.
+"""
+import marshal
+import os
+import sqlite3
+import sys
+import threading
+import time
+import typing
+
+from . import _cache
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS profiles (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    scope TEXT NOT NULL,
+    identifier TEXT NOT NULL,
+    lightweight INTEGER NOT NULL,
+    traits BLOB NOT NULL,
+    stamps BLOB NOT NULL,
+    accessed REAL NOT NULL,
+    UNIQUE (scope, identifier, lightweight)
+);
+CREATE INDEX IF NOT EXISTS profiles_accessed ON profiles (accessed);
+CREATE TABLE IF NOT EXISTS results (
+    profile INTEGER NOT NULL REFERENCES profiles (id) ON DELETE CASCADE,
+    method TEXT NOT NULL,
+    value BLOB NOT NULL,
+    PRIMARY KEY (profile, method)
+) WITHOUT ROWID;
+"""
+
+# -- How often (in seconds) the access time of an entry is refreshed when it
+# -- is read. Refreshing it on every read would turn every read into a write.
+_TOUCH_INTERVAL: float = 60.0
+
+# -- The number of profiles written between checks of the cache size
+_EVICT_INTERVAL: int = 64
+
+
+class SharedCache:
+    """
+    A cache of asset binding profiles and composite results, held in a
+    database which can be used by multiple processes at once.
+
+    Args:
+        filepath: The database file. If not given the file is placed within
+            the asset composition cache directory.
+        max_entries: The maximum number of assets to hold, across every
+            configuration using the database
+        timeout: The number of seconds to wait for another process which is
+            writing to the database
+    """
+
+    def __init__(
+        self,
+        filepath: str | None = None,
+        max_entries: int = 100000,
+        timeout: float = 5.0,
+    ):
+        self._filepath: str = filepath or _cache.cache_directory(
+            "shared",
+            "assets.sqlite",
+        )
+        self._max_entries: int = max_entries
+        self._timeout: float = timeout
+
+        # -- Connections cannot be shared between threads or carried over to
+        # -- a forked process, so each thread of each process opens its own
+        self._local: threading.local = threading.local()
+        self._lock: threading.Lock = threading.Lock()
+        self._writes: int = 0
+
+    def filepath(self) -> str:
+        """
+        Returns the path of the database file
+        """
+        return self._filepath
+
+    def get(
+        self,
+        fingerprint: str,
+        identifier: str,
+        lightweight: bool,
+    ) -> tuple | None:
+        """
+        Returns the stored record for the given asset, along with the version
+        of that record, or None if it is not held.
+
+        Args:
+            fingerprint: The fingerprint of the configuration
+            identifier: The identifier of the asset
+            lightweight: Whether the asset is lightweight
+
+        Returns:
+            Tuple of the snapshot record and its version
+        """
+        try:
+            connection = self._connection()
+
+            row = connection.execute(
+                "SELECT id, traits, stamps, accessed FROM profiles "
+                "WHERE scope = ? AND identifier = ? AND lightweight = ?",
+                (_scope(fingerprint), identifier, int(lightweight)),
+            ).fetchone()
+
+            if row is None:
+                return None
+
+            version, traits, stamps, accessed = row
+
+            results = {
+                method: marshal.loads(value)
+                for method, value in connection.execute(
+                    "SELECT method, value FROM results WHERE profile = ?",
+                    (version,),
+                )
+            }
+
+            now = time.time()
+
+            if now - accessed > _TOUCH_INTERVAL:
+                with connection:
+                    connection.execute(
+                        "UPDATE profiles SET accessed = ? WHERE id = ?",
+                        (now, version),
+                    )
+
+            entry = (
+                identifier,
+                lightweight,
+                marshal.loads(traits),
+                marshal.loads(stamps),
+                results,
+            )
+
+        except (sqlite3.Error, ValueError, EOFError, TypeError):
+            return None
+
+        return entry, version
+
+    def put(self, fingerprint: str, entry: tuple) -> int | None:
+        """
+        Stores the given snapshot record, replacing (along with its results)
+        any record already held for the same asset.
+
+        Args:
+            fingerprint: The fingerprint of the configuration
+            entry: The snapshot record
+
+        Returns:
+            The version of the stored record, which is needed to store
+            further results against it, or None if it could not be stored.
+        """
+        identifier, lightweight, traits, stamps, results = entry
+        scope = _scope(fingerprint)
+
+        try:
+            traits = marshal.dumps(tuple(traits))
+            stamps = marshal.dumps(tuple(stamps))
+
+            results = [
+                (method, marshal.dumps(value))
+                for method, value in results.items()
+            ]
+
+        except ValueError:
+            return None
+
+        try:
+            connection = self._connection()
+
+            with connection:
+                connection.execute(
+                    "DELETE FROM profiles "
+                    "WHERE scope = ? AND identifier = ? AND lightweight = ?",
+                    (scope, identifier, int(lightweight)),
+                )
+
+                version = connection.execute(
+                    "INSERT INTO profiles "
+                    "(scope, identifier, lightweight, traits, stamps, accessed) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (scope, identifier, int(lightweight), traits, stamps, time.time()),
+                ).lastrowid
+
+                connection.executemany(
+                    "INSERT INTO results (profile, method, value) VALUES (?, ?, ?)",
+                    [(version, method, value) for method, value in results],
+                )
+
+        except sqlite3.Error:
+            return None
+
+        with self._lock:
+            self._writes += 1
+            evict = not self._writes % _EVICT_INTERVAL
+
+        if evict:
+            self.evict()
+
+        return version
+
+    def put_result(self, version: int, method_name: str, value) -> bool:
+        """
+        Stores the result of a composite method against a stored record. If
+        the record has since been replaced or removed the result is dropped.
+
+        Returns:
+            True if the result was stored
+        """
+        try:
+            value = marshal.dumps(value)
+
+        except ValueError:
+            return False
+
+        try:
+            with self._connection() as connection:
+                connection.execute(
+                    "INSERT OR REPLACE INTO results (profile, method, value) "
+                    "VALUES (?, ?, ?)",
+                    (version, method_name, value),
+                )
+
+        # -- The foreign key fails if the record no longer exists
+        except sqlite3.Error:
+            return False
+
+        return True
+
+    def discard(
+        self,
+        fingerprint: str,
+        identifiers: typing.Iterable[str],
+        recursive: bool = False,
+    ) -> None:
+        """
+        Removes the records for the given identifiers
+
+        Args:
+            fingerprint: The fingerprint of the configuration
+            identifiers: The identifiers to remove
+            recursive: If True any identifier which sits below one of the
+                given identifiers (using "/" as the separator) is removed too
+        """
+        scope = _scope(fingerprint)
+
+        try:
+            with self._connection() as connection:
+                for identifier in identifiers:
+                    connection.execute(
+                        "DELETE FROM profiles WHERE scope = ? AND identifier = ?",
+                        (scope, identifier),
+                    )
+
+                    if recursive:
+                        # -- A range rather than LIKE, so identifiers holding
+                        # -- wildcard characters are matched literally
+                        prefix = identifier.rstrip("/") + "/"
+
+                        connection.execute(
+                            "DELETE FROM profiles WHERE scope = ? "
+                            "AND identifier >= ? AND identifier < ?",
+                            (scope, prefix, prefix[:-1] + "0"),
+                        )
+
+        except sqlite3.Error:
+            pass
+
+    def evict(self) -> int:
+        """
+        Removes the least recently used records until the cache holds no more
+        than its maximum number of assets.
+
+        Returns:
+            The number of records removed
+        """
+        try:
+            with self._connection() as connection:
+                (count,) = connection.execute(
+                    "SELECT COUNT(*) FROM profiles",
+                ).fetchone()
+
+                excess = count - self._max_entries
+
+                if excess <= 0:
+                    return 0
+
+                connection.execute(
+                    "DELETE FROM profiles WHERE id IN ("
+                    "SELECT id FROM profiles ORDER BY accessed LIMIT ?)",
+                    (excess,),
+                )
+
+        except sqlite3.Error:
+            return 0
+
+        return excess
+
+    def clear(self) -> None:
+        """
+        Removes every record, regardless of the configuration which wrote it
+        """
+        try:
+            with self._connection() as connection:
+                connection.execute("DELETE FROM profiles")
+
+        except sqlite3.Error:
+            pass
+
+    def close(self) -> None:
+        """
+        Closes the connection held for the calling thread
+        """
+        connection = getattr(self._local, "connection", None)
+        self._local.connection = None
+
+        if connection is not None:
+            connection.close()
+
+    def __len__(self) -> int:
+        try:
+            (count,) = self._connection().execute(
+                "SELECT COUNT(*) FROM profiles",
+            ).fetchone()
+
+        except sqlite3.Error:
+            return 0
+
+        return count
+
+    def _connection(self) -> sqlite3.Connection:
+        """
+        Returns the connection for the calling thread, opening it (and
+        creating the database) if needed.
+        """
+        connection = getattr(self._local, "connection", None)
+
+        if connection is not None and self._local.pid == os.getpid():
+            return connection
+
+        os.makedirs(os.path.dirname(os.path.abspath(self._filepath)), exist_ok=True)
+
+        connection = sqlite3.connect(
+            self._filepath,
+            timeout=self._timeout,
+            isolation_level=None,
+        )
+
+        try:
+            connection.execute("PRAGMA journal_mode = WAL")
+            connection.execute("PRAGMA synchronous = NORMAL")
+            connection.execute("PRAGMA foreign_keys = ON")
+
+            connection.executescript(_SCHEMA)
+
+            # -- Writes take the write lock as soon as their transaction
+            # -- begins, so concurrent writers wait on the timeout rather than
+            # -- failing part way through
+            connection.isolation_level = "IMMEDIATE"
+
+        except sqlite3.Error:
+            connection.close()
+            raise
+
+        self._local.connection = connection
+        self._local.pid = os.getpid()
+
+        return connection
+
+
+def _scope(fingerprint: str) -> str:
+    """
+    Records are stored with marshal, so they are only shared between
+    processes running the same version of python.
+    """
+    return f"{fingerprint}:{sys.implementation.cache_tag}:{marshal.version}"
@@ -0,0 +1,324 @@
+# ----------------------------------------------------------------------------
+# Copyright (c) Studio Gobo Ltd 2025
+# Licensed under the MIT license.
+# See LICENSE.TXT in the project root for license information.
+# ----------------------------------------------------------------------------
+# File			-> _snapshot.py
+# Created		-> March 2025
+# Author		-> Michael Malinowski (Studio Gobo)
+# ----------------------------------------------------------------------------
+"""
+This module allows the assets resolved by a compositor to be written to a
+snapshot file, and restored into a later compositor without binding them
+again.
+
+```python
+>>> compositor.save_snapshot("/tmp/browser.snapshot")
+>>>
+>>> # -- In a later session
+>>> compositor.load_snapshot("/tmp/browser.snapshot")
+>>> compositor.get(identifier).children()
+```
+
+For every asset the snapshot holds the names of the bound traits, the results
+of the composite methods which can safely be cached (such as label, parent,
+children and custom_data) which the asset has already resolved, and a stamp
+from each trait describing the state the asset was in.
+
+Restoring is lazy. Nothing is bound when the snapshot is loaded, instead each
+asset is restored the first time it is requested. At that point the stamp of
+each trait is taken again, and if any differ the snapshot entry is discarded
+and the asset is bound as normal.
+
+Snapshots are only loaded by a compositor whose configuration has the same
+fingerprint as the one which wrote it, and by the same version of python.
+"""
+import copy
+import marshal
+import os
+import struct
+import sys
+import tempfile
+import typing
+import zlib
+
+from . import _asset
+
+_MAGIC = b"ACSS"
+_VERSION = 1
+_HEADER = struct.Struct("<4sBI")
+
+# -- The composite methods whose results are stored. Methods returning objects
+# -- which cannot be stored, such as actions, are never included.
+CACHEABLE_METHODS: tuple = (
+    "label",
+    "info",
+    "icon",
+    "parent",
+    "children",
+    "is_visible",
+    "is_valid",
+    "custom_data",
+)
+
+
+class RestoredAsset(_asset.Asset):
+    """
+    An asset which was restored from a snapshot. Its traits are bound by name
+    rather than by asking each trait whether it can bind, and the cacheable
+    methods return their stored results until the asset is invalidated.
+
+    Assets held within a shared cache are created with no traits, in which
+    case they are bound as normal, and given an on_result callable so that
+    the results they resolve are held and written back to the shared cache.
+    Where hold_results is True the results they resolve are held too, so they
+    can be written to a snapshot.
+    """
+
+    def __init__(
+        self,
+        identifier: str,
+        compositor: "asset_composition.Compositor",
+        lightweight: bool,
+        traits: tuple | None,
+        results: dict,
+        on_result: typing.Callable | None = None,
+        hold_results: bool = False,
+    ):
+        # -- These must be set before the asset binds its traits
+        self._restored_traits: tuple | None = traits
+        self._results: dict = dict(results)
+        self._bound: bool = False
+
+        # -- If given, results which are resolved through the traits are held
+        # -- too, and this is called with the method name and the result
+        self._on_result: typing.Callable | None = on_result
+        self._hold_results: bool = hold_results
+
+        super(RestoredAsset, self).__init__(
+            identifier=identifier,
+            compositor=compositor,
+            lightweight=lightweight,
+        )
+
+    def forget(self) -> None:
+        """
+        Drops the stored results, so every method is resolved through the
+        traits from now on.
+        """
+        self._results = dict()
+        self._on_result = None
+        self._hold_results = False
+
+    def resolved(self) -> dict:
+        """
+        Returns the results this asset holds, keyed by method name
+        """
+        return dict(self._results)
+
+    def _perform_trait_binding(self, lightweight: bool = False) -> None:
+        with self._binding_lock:
+            traits = self._restored_traits
+            self._restored_traits = None
+
+            # -- Any binding other than the first is a genuine re-bind, in
+            # -- which case the stored results can no longer be trusted
+            if self._bound:
+                self.forget()
+
+            self._bound = True
+
+            if traits is None:
+                super(RestoredAsset, self)._perform_trait_binding(lightweight)
+                return
+
+            self._set_components([trait(asset=self) for trait in traits])
+            self._lightweight = lightweight
+
+    def _stored(self, method_name: str):
+        # -- We hold onto the results we started with, so a result resolved
+        # -- whilst another thread forgets them is not held afterwards
+        results = self._results
+        on_result = self._on_result
+
+        try:
+            # -- Lists and dictionaries are copied, so callers can change
+            # -- what they are given without changing what we hold
+            return copy.copy(results[method_name])
+
+        except KeyError:
+            pass
+
+        result = getattr(super(RestoredAsset, self), method_name)()
+
+        if on_result is not None or self._hold_results:
+            try:
+                marshal.dumps(result)
+
+            except ValueError:
+                return result
+
+            results[method_name] = copy.copy(result)
+
+            if on_result is not None:
+                on_result(method_name, result)
+
+        return result
+
+    def label(self) -> str:
+        return self._stored("label")
+
+    def info(self) -> str:
+        return self._stored("info")
+
+    def icon(self) -> str:
+        return self._stored("icon")
+
+    def parent(self) -> str:
+        return self._stored("parent")
+
+    def children(self) -> list:
+        return self._stored("children")
+
+    def is_visible(self) -> bool:
+        return self._stored("is_visible")
+
+    def is_valid(self) -> bool:
+        return self._stored("is_valid")
+
+    def custom_data(self) -> dict:
+        return self._stored("custom_data")
+
+
+def record(asset: "asset_composition.Asset") -> tuple | None:
+    """
+    Returns the snapshot record for the given asset, or None if the asset
+    cannot be stored. Only the results the asset already holds are stored,
+    so nothing is resolved for the sake of the snapshot.
+    """
+    # -- Only results which could be stored are ever held
+    held = asset.resolved() if isinstance(asset, RestoredAsset) else dict()
+
+    results = {
+        method_name: result
+        for method_name, result in held.items()
+        if method_name in CACHEABLE_METHODS
+    }
+
+    return profile(asset, results)
+
+
+def profile(
+    asset: "asset_composition.Asset",
+    results: dict | None = None,
+) -> tuple | None:
+    """
+    Returns the snapshot record for the given asset holding only its binding
+    (and any given results), or None if the asset cannot be stored.
+    """
+    identifier = asset.identifier()
+    traits = asset.traits()
+
+    stamps = tuple(trait.stamp(identifier) for trait in traits)
+
+    try:
+        marshal.dumps(stamps)
+
+    except ValueError:
+        return None
+
+    return (
+        identifier,
+        asset.is_lightweight(),
+        tuple(trait.__class__.__name__ for trait in traits),
+        stamps,
+        dict(results or {}),
+    )
+
+
+def current_traits(entry: tuple, traits: dict) -> tuple | None:
+    """
+    Returns the trait classes for the given record, provided they are all
+    still available and the stamps they give are unchanged. Otherwise None
+    is returned.
+
+    Args:
+        entry: The snapshot record
+        traits: Dictionary of trait name to trait class
+    """
+    identifier, _, trait_names, stamps, _ = entry
+    results = list()
+
+    for name, stamp in zip(trait_names, stamps):
+        trait = traits.get(name)
+
+        if trait is None:
+            return None
+
+        try:
+            if trait.stamp(identifier) != stamp:
+                return None
+
+        except Exception:
+            return None
+
+        results.append(trait)
+
+    return tuple(results)
+
+
+def write(filepath: str, fingerprint: str, entries: list) -> None:
+    """
+    Writes the given records to a snapshot file
+    """
+    data = zlib.compress(
+        marshal.dumps(
+            (
+                fingerprint,
+                sys.implementation.cache_tag,
+                entries,
+            ),
+        ),
+    )
+
+    directory = os.path.dirname(os.path.abspath(filepath))
+    os.makedirs(directory, exist_ok=True)
+
+    handle, temp_filepath = tempfile.mkstemp(dir=directory, prefix=".")
+
+    with os.fdopen(handle, "wb") as f:
+        f.write(_HEADER.pack(_MAGIC, _VERSION, marshal.version))
+        f.write(data)
+
+    os.replace(temp_filepath, filepath)
+
+
+def read(filepath: str, fingerprint: str) -> list | None:
+    """
+    Reads the records from a snapshot file. None is returned if the snapshot
+    was written by an incompatible configuration or version of python.
+    """
+    with open(filepath, "rb") as f:
+        data = f.read()
+
+    try:
+        magic, version, marshal_version = _HEADER.unpack_from(data)
+
+    except struct.error:
+        return None
+
+    if magic != _MAGIC or version != _VERSION or marshal_version != marshal.version:
+        return None
+
+    try:
+        snapshot_fingerprint, cache_tag, entries = marshal.loads(
+            zlib.decompress(data[_HEADER.size:]),
+        )
+
+    except (ValueError, EOFError, TypeError, zlib.error):
+        return None
+
+    if snapshot_fingerprint != fingerprint or cache_tag != sys.implementation.cache_tag:
+        return None
+
+    return entries
@@ -0,0 +1,304 @@
+# ----------------------------------------------------------------------------
+# Copyright (c) Studio Gobo Ltd 2025
+# Licensed under the MIT license.
+# See LICENSE.TXT in the project root for license information.
+# ----------------------------------------------------------------------------
+# File			-> _table.py
+# Created		-> March 2025
+# Author		-> Michael Malinowski (Studio Gobo)
+# ----------------------------------------------------------------------------
+"""
+This module holds the results of composite methods for many assets in
+column form, rather than as an asset class and a dictionary per asset.
+
+```python
+>>> table = compositor.table(identifiers, ["label", "is_valid", "custom_data.size"])
+>>> invalid = [
+>>>     table.identifiers[row]
+>>>     for row, valid in enumerate(table["is_valid"])
+>>>     if valid == 0
+>>> ]
+```
+
+Each column is stored in the most compact form its values allow:
+
+- Strings are dictionary encoded, giving an array of 32 bit codes which index
+  a list of the unique strings. A code of -1 marks a missing value.
+- Booleans are an array of 8 bit integers, with -1 marking a missing value.
+- Integers are an array of 64 bit integers, or of doubles (with NaN marking a
+  missing value) if any are missing.
+- Anything else (such as lists) is held in a plain list.
+
+These are the same layouts numpy and arrow use, so if numpy is available the
+columns can be viewed as numpy arrays without copying them, allowing them to
+be filtered and grouped in vectorised form.
+"""
+import array
+import math
+import typing
+
+try:
+    import numpy
+
+except ImportError:
+    numpy = None
+
+
+class DictionaryColumn:
+    """
+    A column of strings stored as an array of codes into a list of the
+    unique strings (the categories).
+    """
+
+    def __init__(self, codes: array.array, categories: list):
+        self.codes: array.array = codes
+        self.categories: list = categories
+
+    @classmethod
+    def encode(cls, values: typing.Iterable) -> "DictionaryColumn":
+        """
+        Builds a column from the given strings, where None is a missing value
+        """
+        codes = array.array("i")
+        categories = list()
+        lookup = dict()
+
+        for value in values:
+            if value is None:
+                codes.append(-1)
+                continue
+
+            code = lookup.get(value)
+
+            if code is None:
+                code = lookup[value] = len(categories)
+                categories.append(value)
+
+            codes.append(code)
+
+        return cls(codes, categories)
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def __getitem__(self, row: int) -> str | None:
+        code = self.codes[row]
+        return self.categories[code] if code >= 0 else None
+
+    def __iter__(self) -> typing.Iterator:
+        categories = self.categories
+
+        for code in self.codes:
+            yield categories[code] if code >= 0 else None
+
+    def __repr__(self) -> str:
+        return f"DictionaryColumn({len(self)} rows, {len(self.categories)} categories)"
+
+    def code(self, value: str) -> int:
+        """
+        Returns the code for the given string, or -1 if the column does not
+        hold it. This allows a column to be compared against a string by
+        comparing its codes against a single integer.
+        """
+        try:
+            return self.categories.index(value)
+
+        except ValueError:
+            return -1
+
+    def take(self, rows: list) -> "DictionaryColumn":
+        """
+        Returns a column holding only the given rows. The categories are
+        shared with this column.
+        """
+        codes = self.codes
+        return DictionaryColumn(array.array("i", (codes[row] for row in rows)), self.categories)
+
+
+class AssetTable:
+    """
+    The results of a set of composite methods for a number of assets, held
+    as one column per method.
+
+    Args:
+        identifiers: The identifier of the asset for each row
+        columns: Dictionary of column name to column
+    """
+
+    def __init__(self, identifiers: list, columns: dict):
+        self.identifiers: list = identifiers
+        self._columns: dict = columns
+
+    def __len__(self) -> int:
+        return len(self.identifiers)
+
+    def __getitem__(self, name: str):
+        return self._columns[name]
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._columns
+
+    def __repr__(self) -> str:
+        return f"AssetTable({len(self)} rows, columns={self.column_names()})"
+
+    def column_names(self) -> list:
+        """
+        Returns the names of the columns, in the order they were requested
+        """
+        return list(self._columns)
+
+    def row(self, row: int) -> dict:
+        """
+        Returns a dictionary of column name to value for a single row
+        """
+        return {name: _value(column, row) for name, column in self._columns.items()}
+
+    def filter(self, mask: typing.Iterable) -> "AssetTable":
+        """
+        Returns a table holding only the rows for which the mask is true. The
+        mask can be any iterable of one value per row, such as a numpy array
+        of booleans.
+        """
+        rows = [row for row, keep in enumerate(mask) if keep]
+
+        return AssetTable(
+            [self.identifiers[row] for row in rows],
+            {name: _take(column, rows) for name, column in self._columns.items()},
+        )
+
+    def group_by(self, name: str) -> dict:
+        """
+        Returns a dictionary of each value within the given column to the list
+        of rows holding it
+        """
+        column = self._columns[name]
+        groups = dict()
+
+        if isinstance(column, DictionaryColumn):
+            for row, code in enumerate(column.codes):
+                groups.setdefault(code, list()).append(row)
+
+            return {
+                column.categories[code] if code >= 0 else None: rows
+                for code, rows in groups.items()
+            }
+
+        for row in range(len(self)):
+            groups.setdefault(_value(column, row), list()).append(row)
+
+        return groups
+
+    def to_numpy(self) -> dict:
+        """
+        Returns a dictionary of column name to numpy array. Dictionary encoded
+        columns are given as their codes, and their strings can be found
+        through the column's categories. Other than lists, no column is
+        copied.
+        """
+        if numpy is None:
+            raise ImportError("numpy is required to convert a table to numpy arrays")
+
+        results = dict()
+
+        for name, column in self._columns.items():
+            if isinstance(column, DictionaryColumn):
+                column = column.codes
+
+            if isinstance(column, array.array):
+                results[name] = numpy.frombuffer(column, dtype=column.typecode)
+
+            else:
+                results[name] = numpy.array(column, dtype=object)
+
+        return results
+
+    def to_arrow(self) -> "pyarrow.Table":
+        """
+        Returns the table as a pyarrow Table, with the strings as dictionary
+        arrays. Requires pyarrow.
+        """
+        import pyarrow
+
+        data = dict(identifier=pyarrow.array(self.identifiers, pyarrow.string()))
+
+        for name, column in self._columns.items():
+            if isinstance(column, DictionaryColumn):
+                data[name] = pyarrow.DictionaryArray.from_arrays(
+                    pyarrow.array(
+                        [code if code >= 0 else None for code in column.codes],
+                        pyarrow.int32(),
+                    ),
+                    pyarrow.array(column.categories, pyarrow.string()),
+                )
+
+            elif isinstance(column, array.array) and column.typecode == "b":
+                data[name] = pyarrow.array(
+                    [bool(value) if value >= 0 else None for value in column],
+                    pyarrow.bool_(),
+                )
+
+            elif isinstance(column, array.array):
+                data[name] = pyarrow.array(column, from_pandas=True)
+
+            else:
+                data[name] = pyarrow.array(column)
+
+        return pyarrow.table(data)
+
+
+def build_column(values: list):
+    """
+    Returns the given values (where None is a missing value) in the most
+    compact column form they allow
+    """
+    present = [value for value in values if value is not None]
+
+    if all(isinstance(value, str) for value in present):
+        return DictionaryColumn.encode(values)
+
+    if all(isinstance(value, bool) for value in present):
+        return array.array("b", (-1 if value is None else int(value) for value in values))
+
+    if all(isinstance(value, int) and not isinstance(value, bool) for value in present):
+        if len(present) == len(values):
+            try:
+                return array.array("q", values)
+
+            except OverflowError:
+                return list(values)
+
+    if all(
+        isinstance(value, (int, float)) and not isinstance(value, bool)
+        for value in present
+    ):
+        return array.array(
+            "d",
+            (math.nan if value is None else value for value in values),
+        )
+
+    return list(values)
+
+
+def _value(column, row: int):
+    if isinstance(column, array.array):
+        value = column[row]
+
+        if column.typecode == "b":
+            return None if value < 0 else bool(value)
+
+        if column.typecode == "d" and math.isnan(value):
+            return None
+
+        return value
+
+    return column[row]
+
+
+def _take(column, rows: list):
+    if isinstance(column, DictionaryColumn):
+        return column.take(rows)
+
+    if isinstance(column, array.array):
+        return array.array(column.typecode, (column[row] for row in rows))
+
+    return [column[row] for row in rows]
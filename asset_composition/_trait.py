@@ -7,7 +7,8 @@
 # Created		-> March 2025
 # Author		-> Michael Malinowski (Studio Gobo)
 # ----------------------------------------------------------------------------
-from typing import Callable
+import types
+from typing import Callable, Mapping
 
 import factories
 
@@ -31,6 +32,35 @@ class Trait:
     # -- that resolve with a take_first logic.
     importance: int = 0
 
+    # -- The cost of calling can_bind, and of calling each of the composite
+    # -- methods (by name), in microseconds. These only need to be rough
+    # -- guesses, as they are replaced by measured costs when a configuration
+    # -- is measuring them. Cheaper predicates are evaluated first. The
+    # -- method costs are read only, so one trait cannot change the costs of
+    # -- another by changing them in place, and should be replaced instead.
+    bind_cost: float = 1.0
+    method_costs: Mapping[str, float] = types.MappingProxyType({})
+
+    # -- If an exclusive trait binds then no trait of lower importance will
+    # -- be bound, and their predicates are not evaluated.
+    exclusive: bool = False
+
+    # -- Traits sharing an exclusive group can never bind to the same asset,
+    # -- such as a file trait and a folder trait. Once one member of a group
+    # -- binds, the predicates of the other members are not evaluated.
+    exclusive_group: str = ""
+
+    # -- When can_bind returns False the compositor remembers it for a short
+    # -- time, and until the identifier is invalidated. A trait whose answer
+    # -- can change without the asset being invalidated should disable this.
+    negative_bind_cache: bool = True
+
+    # -- Functions which each take an identifier and return a key, such as
+    # -- its extension, where can_bind is guaranteed to return the same
+    # -- answer for every identifier with the same key. A False is then
+    # -- remembered for the key as well as for the identifier.
+    bind_keys: tuple = ()
+
     def __init__(self, asset: "asset_composition.Asset"):
         self._asset: "asset_composition.Asset" = asset
 
@@ -48,6 +78,19 @@ class Trait:
         """
         return False
 
+    @classmethod
+    def stamp(cls, identifier: str):
+        """
+        This should return a value describing the current state of the data
+        behind the given identifier, such as a modification time. When an asset
+        is restored from a snapshot its stamps are compared to those taken when
+        the snapshot was written, and if any differ the asset is bound again.
+
+        The value must be made up of simple types (numbers, strings, tuples
+        etc). Returning None means the trait has no state which can go stale.
+        """
+        return None
+
     def create_action(
         self, name, function, category=None, icon=None, hidden=False
     ) -> "_TraitAction":
@@ -122,3 +165,15 @@ class TraitFactory(factories.Factory):
             paths=search_paths or list(),
             plugin_identifier="__name__",
         )
+
+    def register(self, class_type) -> bool:
+        """
+        Registers the given class as a plugin. Unlike the base factory this
+        emits plugins_changed, so anything cached against the available
+        plugins is refreshed.
+        """
+        if super(TraitFactory, self).register(class_type) is False:
+            return False
+
+        self.plugins_changed.emit()
+        return True
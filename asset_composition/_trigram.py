@@ -0,0 +1,494 @@
+# ----------------------------------------------------------------------------
+# Copyright (c) Studio Gobo Ltd 2025
+# Licensed under the MIT license.
+# See LICENSE.TXT in the project root for license information.
+# ----------------------------------------------------------------------------
+# File			-> _trigram.py
+# Created		-> March 2025
+# Author		-> Michael Malinowski (Studio Gobo)
+# ----------------------------------------------------------------------------
+"""
+This module contains a trigram index, which allows substring queries such as
+*hero_rig* to be answered across millions of identifiers without scanning
+every one of them.
+
+Every identifier added to the index is broken into the three character
+sequences it contains, and for each sequence we hold the (sorted) list of the
+identifiers which contain it. A query is answered by taking the sequences
+within its literal text and intersecting their lists, which leaves a small
+number of candidates to be checked against the query itself.
+
+```python
+>>> index = asset_composition.TrigramIndex()
+>>> index.update(["/assets/chars/hero_rig.ma", "/assets/chars/villain_rig.ma"])
+>>> index.search("hero_rig")
+['/assets/chars/hero_rig.ma']
+```
+
+A discovery plugin can hold an index in its index attribute. The compositor
+adds every identifier the plugin finds to that index, and the plugin can
+answer queries from the index once it covers the location being searched.
+"""
+import array
+import bisect
+import fnmatch
+import json
+import os
+import struct
+import sys
+import tempfile
+import threading
+import typing
+
+# -- Characters which have a special meaning within a wildcard query
+_WILDCARDS = "*?["
+
+_MAGIC = b"ACTI"
+_VERSION = 2
+_HEADER = struct.Struct("<4sBBI")
+_COUNT = struct.Struct("<I")
+_SIZE = struct.Struct("<Q")
+
+
+def _trigrams(text: str) -> set:
+    text = text.lower()
+    return {text[index:index + 3] for index in range(len(text) - 2)}
+
+
+def literals(query: str) -> list:
+    """
+    Returns the runs of literal text within a wildcard query. Character
+    classes (such as [abc]) are not literal and split the runs.
+    """
+    runs = list()
+    current = ""
+    index = 0
+
+    while index < len(query):
+        character = query[index]
+
+        if character in _WILDCARDS:
+            runs.append(current)
+            current = ""
+
+            if character == "[":
+                end = query.find("]", index + 2)
+                index = end if end != -1 else len(query)
+
+        else:
+            current += character
+
+        index += 1
+
+    runs.append(current)
+
+    return [run for run in runs if run]
+
+
+class TrigramIndex:
+    """
+    An inverted index from three character sequences to the identifiers
+    containing them.
+
+    Args:
+        key: Optional callable which is given an identifier and returns the
+            text to index it by. For instance, a plugin which matches queries
+            against file names can index only the name rather than the full
+            path, which keeps the index much smaller.
+    """
+
+    def __init__(self, key: typing.Callable[[str], str] | None = None):
+        self._key: typing.Callable[[str], str] | None = key
+
+        # -- Each identifier is given a number, which is its position in
+        # -- this list. The postings hold these numbers.
+        self._identifiers: list = list()
+        self._numbers: dict = dict()
+        self._removed: set = set()
+
+        # -- Map of trigram to an array of identifier numbers. Because numbers
+        # -- are handed out in increasing order, each array is always sorted.
+        self._postings: dict = dict()
+
+        # -- The locations for which every identifier has been added
+        self._scopes: set = set()
+
+        # -- Map of location to a stamp (such as the modification time of a
+        # -- folder) taken when its contents were added. This allows whoever
+        # -- built the index to tell which locations have changed since.
+        self._stamps: dict = dict()
+
+        self._lock: threading.RLock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._numbers) - len(self._removed)
+
+    def __contains__(self, identifier: str) -> bool:
+        number = self._numbers.get(identifier)
+        return number is not None and number not in self._removed
+
+    def add(self, identifier: str) -> None:
+        """
+        Adds the identifier to the index
+        """
+        self.update([identifier])
+
+    def update(self, identifiers: typing.Iterable[str]) -> None:
+        """
+        Adds all the given identifiers to the index
+        """
+        key = self._key
+        numbers = self._numbers
+        postings = self._postings
+
+        with self._lock:
+            for identifier in identifiers:
+                number = numbers.get(identifier)
+
+                if number is not None:
+                    self._removed.discard(number)
+                    continue
+
+                number = numbers[identifier] = len(self._identifiers)
+                self._identifiers.append(identifier)
+
+                for trigram in _trigrams(key(identifier) if key else identifier):
+                    try:
+                        postings[trigram].append(number)
+
+                    except KeyError:
+                        postings[trigram] = array.array("I", (number,))
+
+    def discard(self, identifier: str) -> None:
+        """
+        Removes the identifier from the index, if it is present
+        """
+        with self._lock:
+            number = self._numbers.get(identifier)
+
+            if number is not None:
+                self._removed.add(number)
+
+    def add_scope(self, scope: str) -> None:
+        """
+        Declares that every identifier within the given location (such as a
+        folder) has been added to the index, meaning searches within that
+        location can be answered by the index alone.
+        """
+        with self._lock:
+            self._scopes.add(scope.replace("\\", "/").rstrip("/"))
+
+    def scopes(self) -> list:
+        """
+        Returns the locations which are fully held by the index
+        """
+        return sorted(self._scopes)
+
+    def set_stamp(self, location: str, stamp) -> None:
+        """
+        Stores a stamp for the given location, taken when its contents were
+        added to the index
+        """
+        with self._lock:
+            self._stamps[location.replace("\\", "/").rstrip("/")] = stamp
+
+    def discard_stamp(self, location: str) -> None:
+        """
+        Removes the stamp of the given location, if it has one
+        """
+        with self._lock:
+            self._stamps.pop(location.replace("\\", "/").rstrip("/"), None)
+
+    def stamps(self, locations=None) -> dict:
+        """
+        Returns the stamps of every location, or only of those which sit
+        within one of the given locations
+        """
+        with self._lock:
+            stamps = dict(self._stamps)
+
+        if locations is None:
+            return stamps
+
+        if isinstance(locations, str):
+            locations = [locations]
+
+        locations = [location.replace("\\", "/").rstrip("/") for location in locations]
+        prefixes = tuple(location + "/" for location in locations)
+
+        return {
+            location: stamp
+            for location, stamp in stamps.items()
+            if location in locations or location.startswith(prefixes)
+        }
+
+    def covers(self, locations) -> bool:
+        """
+        Returns True if every one of the given locations sits within a scope
+        which is fully held by the index.
+        """
+        if isinstance(locations, str):
+            locations = [locations]
+
+        if not locations:
+            return False
+
+        for location in locations:
+            if not isinstance(location, str):
+                return False
+
+            location = location.replace("\\", "/").rstrip("/")
+
+            if not any(
+                location == scope or location.startswith(scope + "/")
+                for scope in self._scopes
+            ):
+                return False
+
+        return True
+
+    def candidates(self, query: str) -> list | None:
+        """
+        Returns the identifiers which contain every trigram within the literal
+        text of the query. These may not all match the query, and so should be
+        checked. If the query has no literal text long enough to give us a
+        trigram then None is returned, as every identifier is a candidate.
+        """
+        trigrams = set()
+
+        for run in literals(query):
+            trigrams.update(_trigrams(run))
+
+        if not trigrams:
+            return None
+
+        with self._lock:
+            postings = list()
+
+            for trigram in trigrams:
+                numbers = self._postings.get(trigram)
+
+                if not numbers:
+                    return list()
+
+                postings.append(numbers)
+
+            # -- Start from the shortest list and look up the remaining
+            # -- candidates in each of the others, so the cost follows the
+            # -- size of the answer rather than the size of the index
+            postings.sort(key=len)
+            numbers = postings[0]
+
+            for other in postings[1:]:
+                numbers = [number for number in numbers if _contains(other, number)]
+
+                if not numbers:
+                    break
+
+            return [
+                self._identifiers[number]
+                for number in numbers
+                if number not in self._removed
+            ]
+
+    def search(
+        self,
+        query: str,
+        matcher: typing.Callable[[str, str], bool] | None = None,
+        locations=None,
+        lookup: str | None = None,
+    ) -> list:
+        """
+        Returns the identifiers which match the query.
+
+        Args:
+            query: The wildcard query
+            matcher: Callable which is given the query and an identifier and
+                returns True if they match. By default the query is wrapped in
+                wildcards and matched against the whole identifier.
+            locations: If given, only identifiers within one of these locations
+                are returned
+            lookup: If given, the trigrams are taken from this rather than the
+                query. This allows a plugin to use only the part of the query
+                which applies to the indexed text.
+
+        Returns:
+            Sorted list of identifiers
+        """
+        candidates = self.candidates(query if lookup is None else lookup)
+
+        if candidates is None:
+            with self._lock:
+                candidates = [
+                    identifier
+                    for number, identifier in enumerate(self._identifiers)
+                    if number not in self._removed
+                ]
+
+        if matcher is None:
+            matcher = _wildcard_match
+
+        if isinstance(locations, str):
+            locations = [locations]
+
+        prefixes = None
+
+        if locations:
+            prefixes = tuple(
+                location.replace("\\", "/").rstrip("/") + "/"
+                for location in locations
+            )
+
+        return sorted(
+            identifier
+            for identifier in candidates
+            if (prefixes is None or identifier.startswith(prefixes))
+            and matcher(query, identifier)
+        )
+
+    def clear(self) -> None:
+        """
+        Removes everything from the index
+        """
+        with self._lock:
+            self._identifiers.clear()
+            self._numbers.clear()
+            self._removed.clear()
+            self._postings.clear()
+            self._scopes.clear()
+            self._stamps.clear()
+
+    def save(self, filepath: str) -> None:
+        """
+        Writes the index to the given file. Note that the key callable is not
+        stored, and must be given again when loading.
+        """
+        with self._lock:
+            identifiers = "\0".join(self._identifiers).encode("utf-8")
+            scopes = json.dumps(sorted(self._scopes)).encode("utf-8")
+            stamps = json.dumps(self._stamps).encode("utf-8")
+            removed = array.array("I", sorted(self._removed))
+
+            directory = os.path.dirname(os.path.abspath(filepath))
+            os.makedirs(directory, exist_ok=True)
+
+            handle, temp_filepath = tempfile.mkstemp(dir=directory, prefix=".")
+
+            with os.fdopen(handle, "wb") as f:
+                f.write(
+                    _HEADER.pack(
+                        _MAGIC,
+                        _VERSION,
+                        sys.byteorder == "little",
+                        len(self._identifiers),
+                    ),
+                )
+
+                f.write(_SIZE.pack(len(identifiers)))
+                f.write(identifiers)
+
+                f.write(_SIZE.pack(len(scopes)))
+                f.write(scopes)
+
+                f.write(_SIZE.pack(len(stamps)))
+                f.write(stamps)
+
+                f.write(_COUNT.pack(len(removed)))
+                f.write(removed.tobytes())
+
+                f.write(_COUNT.pack(len(self._postings)))
+
+                for trigram, numbers in self._postings.items():
+                    encoded = trigram.encode("utf-8")
+                    f.write(bytes([len(encoded)]))
+                    f.write(encoded)
+                    f.write(_COUNT.pack(len(numbers)))
+                    f.write(numbers.tobytes())
+
+        os.replace(temp_filepath, filepath)
+
+    @classmethod
+    def load(
+        cls,
+        filepath: str,
+        key: typing.Callable[[str], str] | None = None,
+    ) -> "TrigramIndex":
+        """
+        Reads an index previously written with save. A ValueError is raised
+        if the file is not a valid index.
+        """
+        with open(filepath, "rb") as f:
+            data = memoryview(f.read())
+
+        try:
+            magic, version, little, count = _HEADER.unpack_from(data)
+
+        except struct.error:
+            raise ValueError(f"Not a trigram index : {filepath}")
+
+        if magic != _MAGIC or version != _VERSION:
+            raise ValueError(f"Not a trigram index : {filepath}")
+
+        swap = little != (sys.byteorder == "little")
+        offset = _HEADER.size
+
+        def read_block() -> bytes:
+            nonlocal offset
+            (size,) = _SIZE.unpack_from(data, offset)
+            offset += _SIZE.size + size
+            return bytes(data[offset - size:offset])
+
+        def read_numbers() -> array.array:
+            nonlocal offset
+            (size,) = _COUNT.unpack_from(data, offset)
+            offset += _COUNT.size
+            numbers = array.array("I")
+            numbers.frombytes(data[offset:offset + size * numbers.itemsize])
+            offset += size * numbers.itemsize
+
+            if swap:
+                numbers.byteswap()
+
+            return numbers
+
+        index = cls(key=key)
+
+        identifiers = read_block().decode("utf-8")
+        index._identifiers = identifiers.split("\0") if count else list()
+        index._numbers = {
+            identifier: number
+            for number, identifier in enumerate(index._identifiers)
+        }
+
+        index._scopes = set(json.loads(read_block()))
+        index._stamps = json.loads(read_block())
+        index._removed = set(read_numbers())
+
+        (trigram_count,) = _COUNT.unpack_from(data, offset)
+        offset += _COUNT.size
+
+        for _ in range(trigram_count):
+            size = data[offset]
+            trigram = bytes(data[offset + 1:offset + 1 + size]).decode("utf-8")
+            offset += 1 + size
+            index._postings[trigram] = read_numbers()
+
+        return index
+
+
+def _contains(numbers: array.array, number: int) -> bool:
+    """
+    Returns True if the sorted array contains the given number
+    """
+    position = bisect.bisect_left(numbers, number)
+    return position < len(numbers) and numbers[position] == number
+
+
+def _wildcard_match(query: str, identifier: str) -> bool:
+    if not query.startswith("*"):
+        query = "*" + query
+
+    if not query.endswith("*"):
+        query += "*"
+
+    return fnmatch.fnmatch(identifier, query)
@@ -0,0 +1,576 @@
+# ----------------------------------------------------------------------------
+# Copyright (c) Studio Gobo Ltd 2025
+# Licensed under the MIT license.
+# See LICENSE.TXT in the project root for license information.
+# ----------------------------------------------------------------------------
+# File			-> _watcher.py
+# Created		-> March 2025
+# Author		-> Michael Malinowski (Studio Gobo)
+# ----------------------------------------------------------------------------
+"""
+This module contains an optional service which watches local folders and
+invalidates the assets of a compositor whenever anything within those
+folders changes.
+
+```python
+>>> watcher = asset_composition.FileSystemWatcher(compositor, [project_root])
+>>> watcher.start()
+>>>
+>>> # -- Any live asset will now have its changed signal emitted when
+>>> # -- the file (or the contents of the folder) it represents changes
+>>> asset = compositor.get(project_root)
+>>> asset.changed.connect(refresh_view)
+```
+
+On Linux the watcher uses inotify, and on every other platform it falls back
+to periodically polling the folders for changes.
+
+Note that the signals are emitted from the watcher thread. If you need them to
+be emitted on another thread (such as a Qt main thread) you can provide a
+dispatcher, which is a callable that is given a function to call.
+"""
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import threading
+import typing
+
+CREATED: str = "created"
+DELETED: str = "deleted"
+MODIFIED: str = "modified"
+
+
+class _PollingBackend:
+    """
+    Detects changes by periodically taking a snapshot of the modification
+    time and size of every file and folder, and comparing it to the last.
+    """
+
+    def __init__(self, interval: float = 1.0, lock: "threading.RLock | None" = None):
+        self._interval: float = interval
+        self._snapshots: dict = dict()
+        self._closed: threading.Event = threading.Event()
+
+        # -- Guards the snapshots, which are added to from the thread calling
+        # -- watch whilst the watcher thread is comparing them
+        self._lock: threading.RLock = lock or threading.RLock()
+
+    def add(self, path: str) -> None:
+        snapshot = self._snapshot(path)
+
+        with self._lock:
+            self._snapshots[path] = snapshot
+
+    def remove(self, path: str) -> None:
+        with self._lock:
+            self._snapshots.pop(path, None)
+
+    def read(self, timeout: float | None = None) -> list:
+        """
+        Waits for the polling interval (or the given timeout) and returns a
+        list of (kind, path) tuples describing what has changed since the
+        last call.
+        """
+        if timeout is None:
+            timeout = self._interval
+
+        if timeout and self._closed.wait(timeout):
+            return []
+
+        if self._closed.is_set():
+            return []
+
+        events = list()
+
+        with self._lock:
+            snapshots = list(self._snapshots.items())
+
+        for root, previous in snapshots:
+            current = self._snapshot(root)
+
+            with self._lock:
+                # -- The folder was unwatched (or watched afresh) whilst we
+                # -- were taking the snapshot
+                if self._snapshots.get(root) is not previous:
+                    continue
+
+                self._snapshots[root] = current
+
+            for path in previous.keys() - current.keys():
+                events.append((DELETED, path))
+
+            for path in current.keys() - previous.keys():
+                events.append((CREATED, path))
+
+            for path in current.keys() & previous.keys():
+                is_dir, stamp = current[path]
+
+                # -- A folder changes its modification time when its contents
+                # -- change, but that is already represented by the created and
+                # -- deleted events of its contents
+                if not is_dir and stamp != previous[path][1]:
+                    events.append((MODIFIED, path))
+
+        return events
+
+    def close(self) -> None:
+        self._closed.set()
+
+    @classmethod
+    def _snapshot(cls, root: str) -> dict:
+        snapshot = dict()
+        folders = [root]
+
+        while folders:
+            folder = folders.pop()
+
+            try:
+                entries = list(os.scandir(folder))
+
+            except OSError:
+                continue
+
+            for entry in entries:
+                path = folder + "/" + entry.name
+
+                try:
+                    is_dir = entry.is_dir(follow_symlinks=False)
+                    stat = entry.stat(follow_symlinks=False)
+
+                except OSError:
+                    continue
+
+                snapshot[path] = (is_dir, (stat.st_mtime_ns, stat.st_size))
+
+                if is_dir:
+                    folders.append(path)
+
+        return snapshot
+
+
+class _InotifyBackend:
+    """
+    Uses the linux inotify api (through ctypes so there are no additional
+    dependencies) to be told about changes rather than having to look for them.
+    """
+
+    _IN_MODIFY = 0x00000002
+    _IN_ATTRIB = 0x00000004
+    _IN_CLOSE_WRITE = 0x00000008
+    _IN_MOVED_FROM = 0x00000040
+    _IN_MOVED_TO = 0x00000080
+    _IN_CREATE = 0x00000100
+    _IN_DELETE = 0x00000200
+    _IN_DELETE_SELF = 0x00000400
+    _IN_Q_OVERFLOW = 0x00004000
+    _IN_IGNORED = 0x00008000
+    _IN_ISDIR = 0x40000000
+
+    _IN_NONBLOCK = 0o4000
+    _IN_CLOEXEC = 0o2000000
+
+    _MASK = (
+        _IN_MODIFY
+        | _IN_ATTRIB
+        | _IN_CLOSE_WRITE
+        | _IN_MOVED_FROM
+        | _IN_MOVED_TO
+        | _IN_CREATE
+        | _IN_DELETE
+        | _IN_DELETE_SELF
+    )
+
+    _EVENT_HEADER = struct.Struct("iIII")
+
+    def __init__(self, latency: float = 0.05, lock: "threading.RLock | None" = None):
+        self._libc = self.libc()
+
+        if not self._libc:
+            raise OSError("inotify is not available on this platform")
+
+        self._fd: int = self._libc.inotify_init1(self._IN_NONBLOCK | self._IN_CLOEXEC)
+
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+
+        # -- Changes often arrive as a burst of events, so once we have been
+        # -- woken we wait a short time to collect the rest of the burst
+        self._latency: float = latency
+
+        self._watches: dict = dict()
+        self._roots: list = list()
+
+        # -- Guards the watches and roots, which are added to from the thread
+        # -- calling watch whilst the watcher thread is reading events
+        self._lock: threading.RLock = lock or threading.RLock()
+
+    @classmethod
+    def libc(cls) -> "ctypes.CDLL | None":
+        """
+        Returns the c library if it exposes inotify, otherwise None
+        """
+        if not sys.platform.startswith("linux"):
+            return None
+
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+
+        except OSError:
+            return None
+
+        if not hasattr(libc, "inotify_init1"):
+            return None
+
+        return libc
+
+    def add(self, path: str) -> None:
+        with self._lock:
+            self._roots.append(path)
+            self._add_tree(path)
+
+    def remove(self, path: str) -> None:
+        with self._lock:
+            if path in self._roots:
+                self._roots.remove(path)
+
+            prefix = path.rstrip("/") + "/"
+
+            for descriptor, watched in list(self._watches.items()):
+                if watched == path or watched.startswith(prefix):
+                    self._libc.inotify_rm_watch(self._fd, descriptor)
+                    self._watches.pop(descriptor, None)
+
+    def read(self, timeout: float | None = None) -> list:
+        """
+        Waits for changes and returns a list of (kind, path) tuples
+        """
+        if self._fd < 0:
+            return []
+
+        # -- We never block indefinitely, so that a watcher thread always
+        # -- gets the chance to notice it has been stopped
+        if timeout is None:
+            timeout = 0.5
+
+        readable, _, _ = select.select([self._fd], [], [], timeout)
+
+        if not readable:
+            return []
+
+        if self._latency:
+            select.select([], [], [], self._latency)
+
+        with self._lock:
+            return self._read_events()
+
+    def _read_events(self) -> list:
+        """
+        Reads the waiting events. This must be called with the lock held.
+        """
+        if self._fd < 0:
+            return []
+
+        try:
+            data = os.read(self._fd, 1024 * 64)
+
+        except (BlockingIOError, OSError):
+            return []
+
+        events = list()
+        offset = 0
+
+        while offset + self._EVENT_HEADER.size <= len(data):
+            descriptor, mask, _, length = self._EVENT_HEADER.unpack_from(data, offset)
+            offset += self._EVENT_HEADER.size
+
+            name = data[offset:offset + length].rstrip(b"\0").decode(
+                sys.getfilesystemencoding(),
+                "surrogateescape",
+            )
+            offset += length
+
+            # -- If the kernel queue overflowed then we have lost events, so
+            # -- the only safe thing to do is to treat everything as modified
+            if mask & self._IN_Q_OVERFLOW:
+                events.extend((MODIFIED, root) for root in self._roots)
+                continue
+
+            if mask & self._IN_IGNORED:
+                self._watches.pop(descriptor, None)
+                continue
+
+            folder = self._watches.get(descriptor)
+
+            if folder is None:
+                continue
+
+            path = folder + "/" + name if name else folder
+
+            if mask & (self._IN_CREATE | self._IN_MOVED_TO):
+                events.append((CREATED, path))
+
+                # -- inotify is not recursive, so any new folders need
+                # -- to be watched too
+                if mask & self._IN_ISDIR:
+                    self._add_tree(path)
+
+            elif mask & (self._IN_DELETE | self._IN_MOVED_FROM | self._IN_DELETE_SELF):
+                events.append((DELETED, path))
+
+            elif not mask & self._IN_ISDIR:
+                events.append((MODIFIED, path))
+
+        return events
+
+    def close(self) -> None:
+        with self._lock:
+            if self._fd >= 0:
+                os.close(self._fd)
+                self._fd = -1
+
+    def _add_tree(self, root: str) -> None:
+        folders = [root]
+
+        while folders:
+            folder = folders.pop()
+
+            descriptor = self._libc.inotify_add_watch(
+                self._fd,
+                os.fsencode(folder),
+                self._MASK,
+            )
+
+            if descriptor < 0:
+                continue
+
+            self._watches[descriptor] = folder
+
+            try:
+                folders.extend(
+                    folder + "/" + entry.name
+                    for entry in os.scandir(folder)
+                    if entry.is_dir(follow_symlinks=False)
+                )
+
+            except OSError:
+                continue
+
+
+class FileSystemWatcher:
+    """
+    Watches local folders and invalidates the assets within the compositor
+    whenever something changes within them.
+
+    When a file changes, its asset has the changed signal emitted. When a file
+    or folder is created or deleted its asset is re-bound and has both its
+    status_changed and changed signals emitted, and the asset of the folder it
+    sits within has its changed signal emitted as its children have changed.
+
+    Args:
+        compositor: The compositor to invalidate
+        paths: List of folders to watch
+        backend: Either "auto", "inotify" or "polling". When "auto" the inotify
+            backend is used if it is available.
+        interval: How often (in seconds) the polling backend checks for changes
+        dispatcher: Optional callable which is given a function to call. This
+            allows the invalidation to be moved onto a different thread.
+    """
+
+    def __init__(
+        self,
+        compositor: "asset_composition.Compositor",
+        paths: list | None = None,
+        backend: str = "auto",
+        interval: float = 1.0,
+        dispatcher: typing.Callable | None = None,
+    ):
+        self._compositor: "asset_composition.Compositor" = compositor
+        self._dispatcher: typing.Callable | None = dispatcher
+
+        if backend == "auto":
+            backend = "inotify" if _InotifyBackend.libc() else "polling"
+
+        if backend not in ("inotify", "polling"):
+            raise ValueError(f"Unknown watcher backend : {backend}")
+
+        self._backend_name: str = backend
+        self._interval: float = interval
+
+        # -- Guards the watched paths and the state of the backend, which are
+        # -- changed by watch and unwatch whilst the watcher thread reads them
+        self._lock: threading.RLock = threading.RLock()
+
+        # -- The backend is closed when the watcher is stopped, and a new one
+        # -- is opened if it is started again
+        self._backend = self._open_backend()
+
+        self._paths: list = list()
+        self._thread: threading.Thread | None = None
+        self._running: threading.Event = threading.Event()
+
+        for path in paths or list():
+            self.watch(path)
+
+    def backend(self) -> str:
+        """
+        Returns the name of the backend being used to detect changes
+        """
+        return self._backend_name
+
+    def paths(self) -> list:
+        """
+        Returns the list of folders being watched
+        """
+        return list(self._paths)
+
+    def watch(self, path: str) -> None:
+        """
+        Starts watching the given folder and everything within it
+        """
+        path = path.replace("\\", "/").rstrip("/")
+
+        with self._lock:
+            if path in self._paths:
+                return
+
+            self._paths.append(path)
+
+            if self._backend:
+                self._backend.add(path)
+
+    def unwatch(self, path: str) -> None:
+        """
+        Stops watching the given folder
+        """
+        path = path.replace("\\", "/").rstrip("/")
+
+        with self._lock:
+            if path not in self._paths:
+                return
+
+            self._paths.remove(path)
+
+            if self._backend:
+                self._backend.remove(path)
+
+    def start(self) -> None:
+        """
+        Starts watching for changes on a background thread
+        """
+        if self._thread and self._thread.is_alive():
+            return
+
+        self._running.set()
+        self._thread = threading.Thread(
+            target=self._run,
+            args=(self._reopen(),),
+            name="FileSystemWatcher",
+            daemon=True,
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """
+        Stops the background thread and releases any resources held
+        by the backend.
+        """
+        self._running.clear()
+
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+
+        with self._lock:
+            backend = self._backend
+            self._backend = None
+
+        if backend:
+            backend.close()
+
+    def poll(self, timeout: float | None = 0) -> list:
+        """
+        Checks for changes on the calling thread and invalidates any which are
+        found. This is useful when you want to drive the watcher from your own
+        event loop rather than using start.
+
+        Args:
+            timeout: How long to wait for changes
+
+        Returns:
+            List of (kind, path) tuples which were found
+        """
+        events = self._reopen().read(timeout)
+
+        if events:
+            self._dispatch(events)
+
+        return events
+
+    def _open_backend(self):
+        """
+        Returns a new backend of the kind this watcher uses
+        """
+        if self._backend_name == "inotify":
+            return _InotifyBackend(lock=self._lock)
+
+        return _PollingBackend(interval=self._interval, lock=self._lock)
+
+    def _reopen(self):
+        """
+        Returns the backend, opening a new one watching every path if the
+        watcher has been stopped
+        """
+        with self._lock:
+            if self._backend is None:
+                self._backend = self._open_backend()
+
+                for path in self._paths:
+                    self._backend.add(path)
+
+            return self._backend
+
+    def _run(self, backend) -> None:
+        while self._running.is_set():
+            events = backend.read()
+
+            if events and self._running.is_set():
+                self._dispatch(events)
+
+    def _dispatch(self, events: list) -> None:
+        if self._dispatcher:
+            self._dispatcher(lambda: self._invalidate(events))
+
+        else:
+            self._invalidate(events)
+
+    def _invalidate(self, events: list) -> None:
+        """
+        Converts the events into invalidation calls on the compositor
+        """
+        modified = set()
+        existence_changed = set()
+
+        for kind, path in events:
+            if kind == MODIFIED:
+                modified.add(path)
+
+            else:
+                existence_changed.add(path)
+
+                # -- The children of the folder have changed
+                modified.add(os.path.dirname(path))
+
+        if existence_changed:
+            self._compositor.invalidate(
+                sorted(existence_changed),
+                recursive=True,
+                rebind=True,
+            )
+
+        modified -= existence_changed
+
+        if modified:
+            self._compositor.invalidate(sorted(modified))
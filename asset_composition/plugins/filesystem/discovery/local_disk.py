@@ -7,7 +7,7 @@
 # Created		-> March 2025
 # Author		-> Michael Malinowski (Studio Gobo)
 # ----------------------------------------------------------------------------
-import glob
+import os
 
 import asset_composition
 
@@ -18,24 +18,84 @@ class LocalDiskDiscovery(asset_composition.DiscoveryPlugin):
     expose a mechanism to search for local files/folders within a users machine.
     """
 
+    # -- Wildcard patterns for the names of files and folders which should
+    # -- never be searched. This can be changed on a subclass.
+    ignore: tuple = asset_composition.LocalSearch.DEFAULT_IGNORE
+
+    # -- The number of threads to walk the folders with. Reading folders from
+    # -- a local drive is fast enough that threads only add overhead, but on
+    # -- network drives raising this keeps the server busy. If None this is
+    # -- read from the ASSET_COMPOSITION_SEARCH_WORKERS environment variable
+    # -- each time we search.
+    workers: int | None = None
+
+    # -- Queries are wrapped in wildcards, so anything matching a query will
+    # -- also match any shorter query it starts with
+    monotone_matching = True
+
+    # -- Results are yielded in the order the folders are walked
+    sorted_results = False
+
     # TODO: Need some guidance on what types are the arguments
     @classmethod
     def search(cls, query, search_from) -> list:
+        return list(cls.iter_search(query, search_from))
 
-        if not query.startswith("*"):
-            query = "*" + query
+    @classmethod
+    def iter_search(cls, query, search_from, max_results=None, deadline=None):
+        engine = cls._engine()
 
-        if not query.endswith("*"):
-            query += "*"
+        # -- If we hold an index covering every folder being searched then we
+        # -- can answer from that rather than walking the folders. Only the
+        # -- folders modified since they were indexed are read again, which
+        # -- relies on creating, deleting or renaming a file changing the
+        # -- modification time of its folder. Where that does not hold (as
+        # -- on some network shares) the index should instead be kept up to
+        # -- date by a FileSystemWatcher.
+        if cls.index is not None and cls.index.covers(search_from):
+            results = engine.search_index(cls.index, query, search_from)
 
-        if not isinstance(search_from, list):
-            search_from: list = [search_from]
+        else:
+            results = engine.iter_search(query, search_from, deadline=deadline)
+
+        for index, result in enumerate(results):
+            if max_results is not None and index >= max_results:
+                return
+
+            yield result
+
+    @classmethod
+    def matches(cls, query, search_from, identifier) -> bool:
+        return cls._engine().matches(query, identifier)
 
-        results: list = []
+    @classmethod
+    def invalidate(cls, identifiers) -> None:
+        if cls.index is None:
+            return
+
+        # -- Keep the index in step with files being created and deleted
+        for identifier in identifiers:
+            if not cls.index.covers(identifier):
+                continue
+
+            if os.path.lexists(identifier):
+                cls.index.add(identifier)
+
+            else:
+                cls.index.discard(identifier)
+
+    @classmethod
+    def _engine(cls) -> "asset_composition.LocalSearch":
+        return asset_composition.LocalSearch(ignore=cls.ignore, workers=cls._workers())
+
+    @classmethod
+    def _workers(cls) -> int:
+        if cls.workers is not None:
+            return cls.workers
 
-        for search_root in search_from:
-            results.extend(
-                glob.glob("" + search_root + "/**/" + query, recursive=True),
-            )
+        # -- A value we cannot read should never stop us from searching
+        try:
+            return int(os.environ.get("ASSET_COMPOSITION_SEARCH_WORKERS", "1"))
 
-        return [result.replace("\\", "/") for result in results]
+        except ValueError:
+            return 1
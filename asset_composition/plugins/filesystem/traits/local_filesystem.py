@@ -19,11 +19,25 @@ class LocalFileSystemTrait(asset_composition.Trait):
     where we expose functionality that is common to all local files.
     """
 
+    # -- Whether we can bind depends on the file existing, which can change
+    # -- at any time, so a failure must never be remembered
+    negative_bind_cache = False
+
     @classmethod
     def can_bind(cls, identifier: str) -> bool:
         if os.path.exists(identifier):
             return True
 
+    @classmethod
+    def stamp(cls, identifier: str):
+        try:
+            stat = os.stat(identifier)
+
+        except OSError:
+            return None
+
+        return stat.st_mtime_ns, stat.st_size
+
     def label(self) -> str:
         return os.path.basename(self.asset().identifier())
 
@@ -67,6 +81,8 @@ class LocalFileTrait(asset_composition.Trait):
     """
 
     importance = 1
+    exclusive_group = "local_filesystem_type"
+    negative_bind_cache = False
 
     @classmethod
     def can_bind(cls, identifier: str) -> bool:
@@ -80,6 +96,9 @@ class LocalFolderTrait(asset_composition.Trait):
     allows us to define how we get children from this asset.
     """
 
+    exclusive_group = "local_filesystem_type"
+    negative_bind_cache = False
+
     @classmethod
     def can_bind(cls, identifier: str) -> bool:
         if os.path.exists(identifier) and os.path.isdir(identifier):
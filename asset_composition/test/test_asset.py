@@ -13,6 +13,98 @@ import functools
 import asset_composition
 
 
+# --------------------------------------------------------------------------------------
+class CountingTrait(asset_composition.Trait):
+    """
+    Binds to any identifier holding the name of the class between "+"
+    separators. Every evaluation of a predicate takes the next number of a
+    count shared by all these traits, so the order they were evaluated in
+    can be checked.
+    """
+
+    # -- The count shared by every counting trait
+    count = 0
+
+    # -- The count at which the predicate of this trait was last evaluated,
+    # -- or zero if it has not been since the count was reset
+    evaluated = 0
+
+    @classmethod
+    def can_bind(cls, identifier):
+        CountingTrait.count += 1
+        cls.evaluated = CountingTrait.count
+
+        return cls.__name__ in identifier.split("+")
+
+    def label(self):
+        return type(self).__name__
+
+    @staticmethod
+    def reset(traits):
+        CountingTrait.count = 0
+
+        for trait in traits:
+            trait.evaluated = 0
+
+    @staticmethod
+    def evaluation_order(traits):
+        return [
+            trait.__name__
+            for trait in sorted(traits, key=lambda trait: trait.evaluated)
+            if trait.evaluated
+        ]
+
+
+# --------------------------------------------------------------------------------------
+class Expensive(CountingTrait):
+
+    importance = 10
+    bind_cost = 1000
+
+
+# --------------------------------------------------------------------------------------
+class Cheap(CountingTrait):
+
+    importance = 5
+    bind_cost = 1
+
+
+# --------------------------------------------------------------------------------------
+class Exclusive(CountingTrait):
+
+    importance = 3
+    bind_cost = 5
+    exclusive = True
+
+
+# --------------------------------------------------------------------------------------
+class Excluded(CountingTrait):
+
+    importance = 1
+    bind_cost = 1
+
+
+# --------------------------------------------------------------------------------------
+class Texture(CountingTrait):
+
+    bind_cost = 1
+    exclusive_group = "type"
+
+
+# --------------------------------------------------------------------------------------
+class Mesh(CountingTrait):
+
+    bind_cost = 2
+    exclusive_group = "type"
+
+
+# --------------------------------------------------------------------------------------
+class Rig(CountingTrait):
+
+    bind_cost = 3
+    exclusive_group = "type"
+
+
 # --------------------------------------------------------------------------------------
 class AssetUnitTest(unittest.TestCase):
 
@@ -220,4 +312,127 @@ class AssetUnitTest(unittest.TestCase):
         )
 
     def _set_result_true(self, data):
-        data["result"] = True
\ No newline at end of file
+        data["result"] = True
+
+    def test_map_in_process(self):
+
+        compositor = self._get_test_compositor()
+
+        results = list(
+            compositor.map(
+                [__file__, "invalid test"],
+                "is_valid",
+                workers=1,
+            ),
+        )
+
+        self.assertEqual(
+            results,
+            [True, False],
+        )
+
+    def test_map_across_processes(self):
+
+        compositor = self._get_test_compositor()
+        identifiers = [__file__, "invalid test"] * 4
+
+        results = list(
+            compositor.map(
+                identifiers + [compositor.get(__file__)],
+                "custom_data",
+                workers=2,
+                chunksize=1,
+            ),
+        )
+
+        self.assertEqual(
+            len(results),
+            len(identifiers) + 1,
+        )
+
+        for result in results:
+            self.assertEqual(
+                result["Basic Data"],
+                True,
+            )
+
+    def test_cost_aware_binding(self):
+
+        traits = [Expensive, Cheap, Exclusive, Excluded]
+        compositor = asset_composition.Compositor()
+
+        for trait in traits:
+            compositor.configuration.traits.register(trait)
+
+        # -- The cheap predicates are evaluated first, but the traits are
+        # -- still bound in order of importance
+        CountingTrait.reset(traits)
+        asset = compositor.get("Cheap")
+
+        self.assertEqual(
+            CountingTrait.evaluation_order(traits),
+            ["Cheap", "Exclusive", "Expensive", "Excluded"],
+        )
+
+        # -- Once the exclusive trait binds the traits of lower importance
+        # -- are not considered, even those which could bind
+        CountingTrait.reset(traits)
+        asset = compositor.get("Exclusive+Excluded")
+
+        self.assertEqual(
+            asset.trait_names(),
+            ["Exclusive"],
+        )
+
+        self.assertEqual(
+            Excluded.evaluated,
+            0,
+        )
+
+        # -- Measured costs replace the declared ones, changing the order
+        costs = compositor.configuration.costs
+        expensive, cheap = compositor.configuration.ordered_traits()[:2]
+
+        for _ in range(8):
+            costs.record(expensive, "can_bind", 0.0)
+            costs.record(cheap, "can_bind", 0.01)
+
+        CountingTrait.reset(traits)
+        compositor.get("Other")
+
+        self.assertEqual(
+            CountingTrait.evaluation_order(traits)[:2],
+            ["Expensive", "Exclusive"],
+        )
+
+        self.assertEqual(
+            costs.bind_cost(cheap),
+            10000.0,
+        )
+
+        # -- The default method costs are shared by every trait, so they
+        # -- cannot be changed in place
+        with self.assertRaises(TypeError):
+            expensive.method_costs["label"] = 1.0
+
+    def test_exclusive_groups(self):
+
+        traits = [Texture, Mesh, Rig]
+        compositor = asset_composition.Compositor()
+
+        for trait in traits:
+            compositor.configuration.traits.register(trait)
+
+        CountingTrait.reset(traits)
+        asset = compositor.get("character+Mesh")
+
+        self.assertEqual(
+            asset.trait_names(),
+            ["Mesh"],
+        )
+
+        # -- Once the mesh trait has bound the rig trait is not considered
+        self.assertEqual(
+            CountingTrait.evaluation_order(traits),
+            ["Texture", "Mesh"],
+        )
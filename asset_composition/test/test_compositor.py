@@ -0,0 +1,939 @@
+# ----------------------------------------------------------------------------
+# Copyright (c) Studio Gobo Ltd 2025
+# Licensed under the MIT license.  
+# See LICENSE.TXT in the project root for license information.
+# ----------------------------------------------------------------------------
+# File			-> test_compositor.py
+# Created		-> March 2025
+# Author		-> Michael Malinowski (Studio Gobo)
+# ----------------------------------------------------------------------------
+import gc
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+import weakref
+from unittest import mock
+import asset_composition
+
+
+# --------------------------------------------------------------------------------------
+class AssetUnitTest(unittest.TestCase):
+
+    def setUp(self):
+
+        # -- Build a small folder structure which we can traverse
+        self._root = tempfile.mkdtemp().replace("\\", "/")
+
+        for folder in ["a", "a/aa", "b"]:
+            os.makedirs(os.path.join(self._root, folder))
+
+        for filepath in ["a/one.txt", "a/aa/two.txt", "b/three.txt"]:
+            with open(os.path.join(self._root, filepath), "w") as f:
+                f.write(filepath)
+
+    def tearDown(self):
+        shutil.rmtree(self._root)
+
+    def _get_test_compositor(self):
+
+        configuration = asset_composition.Configuration()
+        configuration.traits.add_path(
+            os.path.join(
+                os.path.dirname(os.path.dirname(__file__)),
+                "plugins",
+                "filesystem",
+                "traits",
+            ),
+        )
+        configuration.discovery.add_path(
+            os.path.join(
+                os.path.dirname(os.path.dirname(__file__)),
+                "plugins",
+                "filesystem",
+                "discovery",
+            ),
+        )
+        compositor = asset_composition.Compositor(configuration=configuration)
+        return compositor
+
+    def test_get_is_cached(self):
+
+        compositor = self._get_test_compositor()
+
+        self.assertFalse(
+            compositor.is_cached(self._root),
+        )
+
+        asset = compositor.get(self._root)
+
+        self.assertTrue(
+            compositor.is_cached(self._root),
+        )
+
+        self.assertIs(
+            asset,
+            compositor.get(self._root),
+        )
+
+    def test_get_is_single_flight(self):
+
+        compositor = self._get_test_compositor()
+        create_asset = compositor._create_asset
+
+        created = list()
+
+        def slow_create_asset(*args, **kwargs):
+            created.append(args[0])
+            time.sleep(0.05)
+            return create_asset(*args, **kwargs)
+
+        compositor._create_asset = slow_create_asset
+
+        barrier = threading.Barrier(8)
+        results = list()
+
+        def get():
+            barrier.wait()
+            results.append(compositor.get(self._root + "/a"))
+
+        threads = [threading.Thread(target=get) for _ in range(8)]
+
+        for thread in threads:
+            thread.start()
+
+        for thread in threads:
+            thread.join()
+
+        # -- The asset is only bound once, and every thread is given it
+        self.assertEqual(
+            created,
+            [self._root + "/a"],
+        )
+
+        self.assertEqual(
+            len({id(asset) for asset in results}),
+            1,
+        )
+
+    def test_get_does_not_cache_binds_invalidated_midway(self):
+
+        compositor = self._get_test_compositor()
+        create_asset = compositor._create_asset
+
+        binding = threading.Event()
+        release = threading.Event()
+
+        def slow_create_asset(*args, **kwargs):
+            asset = create_asset(*args, **kwargs)
+            binding.set()
+            release.wait(timeout=10)
+            return asset
+
+        compositor._create_asset = slow_create_asset
+
+        results = list()
+        thread = threading.Thread(
+            target=lambda: results.append(compositor.get(self._root + "/a")),
+        )
+        thread.start()
+
+        # -- Invalidate whilst the asset is part way through being bound
+        self.assertTrue(binding.wait(timeout=10))
+        compositor.invalidate([self._root + "/a"])
+
+        release.set()
+        thread.join()
+
+        # -- The caller is still given the asset, but as it may have been
+        # -- bound from stale data it is not cached
+        self.assertEqual(
+            results[0].identifier(),
+            self._root + "/a",
+        )
+
+        self.assertFalse(
+            compositor.is_cached(self._root + "/a"),
+        )
+
+        compositor._create_asset = create_asset
+
+        self.assertIsNot(
+            compositor.get(self._root + "/a"),
+            results[0],
+        )
+
+        self.assertTrue(
+            compositor.is_cached(self._root + "/a"),
+        )
+
+    def test_get_many(self):
+
+        compositor = self._get_test_compositor()
+
+        identifiers = [
+            self._root + "/" + relative
+            for relative in ["a", "b", "a/aa", "a/one.txt", "b/three.txt", "a"]
+        ]
+
+        assets = compositor.get_many(identifiers, workers=4)
+
+        self.assertEqual(
+            [asset.identifier() for asset in assets],
+            identifiers,
+        )
+
+        for asset in assets:
+            self.assertIs(
+                asset,
+                compositor.get(asset.identifier()),
+            )
+
+    def test_table(self):
+
+        class SizeTrait(asset_composition.Trait):
+
+            @classmethod
+            def can_bind(cls, identifier):
+                return os.path.isfile(identifier)
+
+            def custom_data(self):
+                return dict(size=os.path.getsize(self.asset().identifier()))
+
+        compositor = self._get_test_compositor()
+        compositor.configuration.traits.register(SizeTrait)
+
+        identifiers = [
+            self._root + "/" + relative
+            for relative in ["a", "a/aa", "a/one.txt", "b/three.txt"]
+        ]
+
+        table = compositor.table(
+            identifiers,
+            ["parent", "label", "is_valid", "custom_data.size"],
+            workers=2,
+        )
+
+        self.assertEqual(table.identifiers, identifiers)
+
+        # -- Strings are dictionary encoded, so the parent shared by two of
+        # -- the assets is only held once
+        parents = table["parent"]
+        self.assertIsInstance(parents, asset_composition.DictionaryColumn)
+        self.assertEqual(len(parents.categories), 3)
+        self.assertEqual(parents[0], self._root)
+        self.assertEqual(parents.codes[1], parents.codes[2])
+
+        self.assertEqual(list(table["label"]), ["a", "aa", "one.txt", "three.txt"])
+        self.assertEqual(list(table["is_valid"]), [1, 1, 1, 1])
+
+        # -- The folders have no size, so the column falls back to doubles
+        # -- with missing values
+        self.assertEqual(table.row(0)["custom_data.size"], None)
+        self.assertEqual(table.row(2)["custom_data.size"], len("a/one.txt"))
+
+        within_a = table.filter(
+            code == parents.code(self._root + "/a")
+            for code in parents.codes
+        )
+
+        self.assertEqual(
+            within_a.identifiers,
+            [self._root + "/a/aa", self._root + "/a/one.txt"],
+        )
+
+        self.assertEqual(
+            table.group_by("parent")[self._root + "/a"],
+            [1, 2],
+        )
+
+        # -- The assets were not added to the compositor cache
+        self.assertFalse(compositor.is_cached(identifiers[0]))
+
+        searched = compositor.table("*.txt", ["label"], search_from=self._root)
+
+        self.assertEqual(
+            sorted(searched["label"]),
+            ["one.txt", "three.txt", "two.txt"],
+        )
+
+    def test_negative_bind_cache(self):
+
+        evaluated = list()
+
+        class TextureTrait(asset_composition.Trait):
+
+            bind_keys = (lambda identifier: os.path.splitext(identifier)[1],)
+
+            @classmethod
+            def can_bind(cls, identifier):
+                evaluated.append(identifier)
+                return identifier.endswith(".png")
+
+        compositor = asset_composition.Compositor(negative_bind_ttl=30.0)
+        compositor.configuration.traits.register(TextureTrait)
+
+        compositor._create_asset("a.txt")
+        compositor._create_asset("a.txt")
+
+        # -- The predicate said no once, and is not asked again until the
+        # -- identifier is invalidated
+        self.assertEqual(
+            evaluated,
+            ["a.txt"],
+        )
+
+        # -- The trait declares that the extension decides its answer, so
+        # -- another identifier with the same extension is skipped too
+        compositor._create_asset("c.txt")
+
+        self.assertEqual(
+            evaluated,
+            ["a.txt"],
+        )
+
+        # -- Invalidating another identifier with the same extension forgets
+        # -- the answer held for the extension, but not that for "a.txt"
+        compositor.invalidate(["b.txt"])
+        compositor._create_asset("a.txt")
+        compositor._create_asset("c.txt")
+
+        self.assertEqual(
+            evaluated,
+            ["a.txt", "c.txt"],
+        )
+
+        compositor.invalidate(["a.txt"])
+        compositor._create_asset("a.txt")
+
+        self.assertEqual(
+            evaluated,
+            ["a.txt", "c.txt", "a.txt"],
+        )
+
+        # -- Identifiers the trait can bind to are never skipped
+        compositor._create_asset("d.png")
+        compositor._create_asset("d.png")
+
+        self.assertEqual(
+            evaluated.count("d.png"),
+            2,
+        )
+
+        # -- The cache is off by default
+        evaluated.clear()
+
+        compositor = asset_composition.Compositor(
+            configuration=compositor.configuration,
+        )
+        compositor._create_asset("a.txt")
+        compositor._create_asset("a.txt")
+
+        self.assertEqual(
+            evaluated,
+            ["a.txt", "a.txt"],
+        )
+
+    def test_negative_bind_cache_skips_filesystem_traits(self):
+
+        compositor = asset_composition.Compositor(
+            configuration=self._get_test_compositor().configuration,
+            negative_bind_ttl=30.0,
+        )
+
+        filepath = self._root + "/later.txt"
+        self.assertEqual(compositor._create_asset(filepath).trait_names(), [])
+
+        with open(filepath, "w") as f:
+            f.write("later")
+
+        # -- The filesystem traits depend on the file existing, so their
+        # -- failure to bind is not remembered
+        self.assertIn(
+            "LocalFileTrait",
+            compositor._create_asset(filepath).trait_names(),
+        )
+
+    def test_hierarchy_is_not_recorded_by_default(self):
+
+        compositor = self._get_test_compositor()
+        folder = compositor.get(self._root + "/a")
+
+        self.assertEqual(
+            len(folder.children()),
+            2,
+        )
+
+        with open(os.path.join(self._root, "a", "new.txt"), "w") as f:
+            f.write("new")
+
+        # -- Nothing is recorded, so the change on disk is seen straight away
+        self.assertEqual(
+            len(folder.children()),
+            3,
+        )
+
+        self.assertEqual(
+            compositor.get(self._root + "/a/one.txt").siblings(),
+            [self._root + "/a/aa", self._root + "/a/new.txt"],
+        )
+
+        # -- The ancestors are found by walking up through the parents
+        self.assertEqual(
+            compositor.get(self._root + "/a/aa/two.txt").ancestors()[:3],
+            [self._root + "/a/aa", self._root + "/a", self._root],
+        )
+
+    def test_hierarchy_cache(self):
+
+        compositor = asset_composition.Compositor(
+            configuration=self._get_test_compositor().configuration,
+            hierarchy_ttl=0.2,
+        )
+        hierarchy = compositor._hierarchies[False]
+
+        # -- Assets which are not cached, such as those bound by walk, are
+        # -- never recorded
+        for _ in compositor.walk(self._root):
+            pass
+
+        self.assertEqual(
+            len(hierarchy),
+            0,
+        )
+
+        folder = compositor.get(self._root + "/a")
+
+        self.assertEqual(
+            folder.children(),
+            [self._root + "/a/aa", self._root + "/a/one.txt"],
+        )
+
+        # -- Resolving the children records the parent of each of them
+        self.assertEqual(
+            hierarchy.parent(self._root + "/a/one.txt"),
+            self._root + "/a",
+        )
+
+        self.assertEqual(
+            compositor.get(self._root + "/a/one.txt").siblings(),
+            [self._root + "/a/aa"],
+        )
+
+        deep = compositor.get(self._root + "/a/aa/two.txt")
+
+        self.assertEqual(
+            deep.ancestors()[:3],
+            [self._root + "/a/aa", self._root + "/a", self._root],
+        )
+
+        # -- The ancestors of every asset along the way are now held
+        self.assertEqual(
+            compositor.get(self._root + "/a/aa").ancestors(),
+            deep.ancestors()[1:],
+        )
+
+        # -- A change on disk is seen once the folder is invalidated
+        with open(os.path.join(self._root, "a", "new.txt"), "w") as f:
+            f.write("new")
+
+        compositor.invalidate([self._root + "/a"])
+
+        self.assertEqual(
+            len(folder.children()),
+            3,
+        )
+
+        # -- ...or once the record has expired
+        os.remove(os.path.join(self._root, "a", "new.txt"))
+        time.sleep(0.3)
+
+        self.assertEqual(
+            len(folder.children()),
+            2,
+        )
+
+        compositor.invalidate([self._root + "/a"], recursive=True)
+
+        self.assertIs(
+            hierarchy.parent(self._root + "/a/one.txt"),
+            asset_composition._hierarchy.UNKNOWN,
+        )
+
+    def test_prefetch_children(self):
+
+        compositor = self._get_test_compositor()
+        asset = compositor.get(self._root)
+
+        request = asset.prefetch_children(depth=2, lightweight=False)
+
+        self.assertTrue(
+            request.wait(timeout=10),
+        )
+
+        for identifier in ["a", "b", "a/aa", "a/one.txt", "b/three.txt"]:
+            self.assertTrue(
+                compositor.is_cached(self._root + "/" + identifier),
+            )
+
+        # -- We only asked for two levels, so the great grandchildren
+        # -- should not have been resolved
+        self.assertFalse(
+            compositor.is_cached(self._root + "/a/aa/two.txt"),
+        )
+
+    def test_prefetch_cancel(self):
+
+        compositor = self._get_test_compositor()
+
+        request = asset_composition.PrefetchRequest()
+        request.cancel()
+
+        compositor.prefetcher.schedule(
+            [self._root + "/a"],
+            lightweight=False,
+            request=request,
+        )
+
+        self.assertTrue(
+            request.wait(timeout=10),
+        )
+
+        self.assertFalse(
+            compositor.is_cached(self._root + "/a"),
+        )
+
+    def test_prefetch_priority(self):
+
+        resolved = list()
+        release = threading.Event()
+
+        class RecordingCompositor:
+
+            def get(self, identifier, lightweight=False):
+
+                # -- Hold the single worker on the first asset until all the
+                # -- other work has been queued
+                if identifier == "first":
+                    release.wait(timeout=10)
+
+                resolved.append(identifier)
+
+        compositor = RecordingCompositor()
+        prefetcher = asset_composition.Prefetcher(compositor, workers=1)
+
+        first = prefetcher.schedule(["first"])
+
+        requests = [
+            prefetcher.schedule([identifier], priority=priority)
+            for identifier, priority in [("low", 5), ("high", 0), ("middle", 2)]
+        ]
+
+        release.set()
+
+        for request in [first] + requests:
+            self.assertTrue(request.wait(timeout=10))
+
+        self.assertEqual(
+            resolved,
+            ["first", "high", "middle", "low"],
+        )
+
+        prefetcher.shutdown()
+
+    def test_prefetch_shutdown(self):
+
+        compositor = self._get_test_compositor()
+        asset = compositor.get(self._root)
+
+        self.assertTrue(
+            asset.prefetch_children(depth=1).wait(timeout=10),
+        )
+
+        threads = list(compositor.prefetcher._threads)
+        self.assertTrue(threads)
+
+        # -- Closing the compositor stops every worker
+        compositor.close()
+
+        self.assertFalse(
+            any(thread.is_alive() for thread in threads),
+        )
+
+        # -- Work scheduled once shut down is skipped rather than left
+        # -- outstanding forever
+        prefetcher = compositor.prefetcher
+        prefetcher.shutdown()
+
+        self.assertTrue(
+            prefetcher.schedule([self._root + "/b"]).wait(timeout=10),
+        )
+
+        # -- The workers do not keep a compositor alive, and are stopped when
+        # -- it is collected
+        compositor = self._get_test_compositor()
+
+        self.assertTrue(
+            compositor.get(self._root).prefetch_children(depth=1).wait(timeout=10),
+        )
+
+        threads = list(compositor.prefetcher._threads)
+        reference = weakref.ref(compositor)
+
+        del compositor, asset
+        gc.collect()
+
+        self.assertIsNone(reference())
+
+        for thread in threads:
+            thread.join(timeout=10)
+            self.assertFalse(thread.is_alive())
+
+    def test_walk_breadth_first(self):
+
+        compositor = self._get_test_compositor()
+
+        results = [
+            (depth, asset.identifier()[len(self._root):])
+            for depth, asset in compositor.walk(self._root)
+        ]
+
+        self.assertEqual(
+            results,
+            [
+                (0, ""),
+                (1, "/a"),
+                (1, "/b"),
+                (2, "/a/aa"),
+                (2, "/a/one.txt"),
+                (2, "/b/three.txt"),
+                (3, "/a/aa/two.txt"),
+            ],
+        )
+
+    def test_walk_depth_first(self):
+
+        compositor = self._get_test_compositor()
+
+        results = [
+            asset.identifier()[len(self._root):]
+            for _, asset in compositor.walk(self._root, order="dfs", max_depth=2)
+        ]
+
+        self.assertEqual(
+            results,
+            ["", "/a", "/a/aa", "/a/one.txt", "/b", "/b/three.txt"],
+        )
+
+    def test_walk_predicate_prunes(self):
+
+        compositor = self._get_test_compositor()
+
+        results = [
+            asset.identifier()
+            for _, asset in compositor.walk(
+                self._root,
+                predicate=lambda asset: not asset.identifier().endswith("/a"),
+            )
+        ]
+
+        self.assertNotIn(
+            self._root + "/a/one.txt",
+            results,
+        )
+
+        self.assertIn(
+            self._root + "/b/three.txt",
+            results,
+        )
+
+    def test_walk_detects_cycles(self):
+
+        class CyclicTrait(asset_composition.Trait):
+
+            @classmethod
+            def can_bind(cls, identifier):
+                return identifier in ("x", "y")
+
+            def children(self):
+                return ["y"] if self.asset().identifier() == "x" else ["x"]
+
+        compositor = asset_composition.Compositor()
+        compositor.configuration.traits.register(CyclicTrait)
+
+        results = [
+            (depth, asset.identifier())
+            for depth, asset in compositor.walk("x")
+        ]
+
+        self.assertEqual(
+            results,
+            [(0, "x"), (1, "y")],
+        )
+
+    def test_loader_is_shared(self):
+
+        compositor = self._get_test_compositor()
+
+        first = compositor.loader("test", load=lambda key: key)
+
+        self.assertIs(
+            first,
+            compositor.loader("test"),
+        )
+
+    def test_loader_batches_and_caches(self):
+
+        compositor = self._get_test_compositor()
+        batches = list()
+
+        def batch_load(keys):
+            batches.append(list(keys))
+            return {key: key.upper() for key in keys if key != "missing"}
+
+        loader = compositor.loader("test", batch_load=batch_load)
+
+        self.assertEqual(
+            loader.load_many(["a", "b", "a", "missing"]),
+            ["A", "B", "A", None],
+        )
+
+        self.assertEqual(
+            loader.load("b"),
+            "B",
+        )
+
+        self.assertEqual(
+            batches,
+            [["a", "b", "missing"]],
+        )
+
+    def test_loader_collapses_concurrent_requests(self):
+
+        compositor = self._get_test_compositor()
+        calls = list()
+
+        def load(key):
+            calls.append(key)
+            time.sleep(0.1)
+            return key
+
+        loader = compositor.loader("test", load=load, batch_window=0.05)
+        threads = [
+            threading.Thread(target=loader.load, args=("a",))
+            for _ in range(8)
+        ]
+
+        for thread in threads:
+            thread.start()
+
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(
+            calls,
+            ["a"],
+        )
+
+    def test_search_is_cached(self):
+
+        compositor = asset_composition.Compositor(
+            configuration=self._get_test_compositor().configuration,
+            search_cache_ttl=30.0,
+        )
+
+        def search(query):
+            return sorted(
+                os.path.basename(asset.identifier())
+                for asset in compositor.search(query, search_from=self._root)
+            )
+
+        self.assertEqual(
+            search("t"),
+            ["one.txt", "three.txt", "two.txt"],
+        )
+
+        # -- A file created after the search is not seen until the location
+        # -- is invalidated
+        with open(os.path.join(self._root, "b", "twelve.txt"), "w") as f:
+            f.write("twelve")
+
+        self.assertEqual(
+            search("t"),
+            ["one.txt", "three.txt", "two.txt"],
+        )
+
+        # -- Because the local disk matching is monotone, a longer query is
+        # -- refined from the cached results rather than searching again
+        self.assertEqual(
+            search("tw"),
+            ["two.txt"],
+        )
+
+        compositor.invalidate([self._root + "/b/twelve.txt"])
+
+        self.assertEqual(
+            search("tw"),
+            ["twelve.txt", "two.txt"],
+        )
+
+        # -- Completing a bracket widens the query rather than narrowing it,
+        # -- so it must be searched again rather than refined
+        self.assertEqual(
+            search("[t"),
+            [],
+        )
+
+        self.assertEqual(
+            search("[t]"),
+            ["one.txt", "three.txt", "twelve.txt", "two.txt"],
+        )
+
+    def test_search_cache_skips_partial_results(self):
+
+        compositor = asset_composition.Compositor(
+            configuration=self._get_test_compositor().configuration,
+            search_cache_ttl=30.0,
+        )
+
+        self.assertEqual(
+            len(compositor.search("t", search_from=self._root, limit=1)),
+            1,
+        )
+
+        # -- The limited search did not see every result, so it must not
+        # -- be used to answer an unlimited one
+        self.assertEqual(
+            len(compositor.search("t", search_from=self._root)),
+            3,
+        )
+
+        # -- By default searches are not cached, so new files are seen
+        compositor = asset_composition.Compositor(
+            configuration=compositor.configuration,
+        )
+
+        with open(os.path.join(self._root, "b", "twelve.txt"), "w") as f:
+            f.write("twelve")
+
+        self.assertEqual(
+            len(compositor.search("t", search_from=self._root)),
+            4,
+        )
+
+    def test_snapshot_restores_assets(self):
+
+        # -- By default assets do not hold their results, so a snapshot only
+        # -- holds their binding
+        self.assertNotIsInstance(
+            self._get_test_compositor().get(self._root),
+            asset_composition.RestoredAsset,
+        )
+
+        compositor = asset_composition.Compositor(
+            configuration=self._get_test_compositor().configuration,
+            snapshot_results=True,
+        )
+
+        compositor.get(self._root)
+
+        for _, asset in compositor.walk(self._root):
+            compositor.get(asset.identifier())
+
+        # -- Saving only holds the results which have already been resolved,
+        # -- rather than resolving every cacheable method of every asset
+        compositor.get(self._root + "/a").children()
+
+        filepath = os.path.join(self._root, "browser.snapshot")
+
+        with mock.patch.object(
+            asset_composition.RestoredAsset,
+            "icon",
+            side_effect=AssertionError("icon resolved whilst saving"),
+        ):
+            self.assertEqual(
+                compositor.save_snapshot(filepath),
+                7,
+            )
+
+        entries = asset_composition._snapshot.read(
+            filepath,
+            compositor.configuration.fingerprint(),
+        )
+
+        self.assertEqual(
+            [entry[4] for entry in entries if entry[0] == self._root + "/a"],
+            [dict(children=[self._root + "/a/aa", self._root + "/a/one.txt"])],
+        )
+
+        restored = self._get_test_compositor()
+
+        self.assertEqual(
+            restored.load_snapshot(filepath),
+            7,
+        )
+
+        folder = restored.get(self._root + "/a")
+
+        self.assertIsInstance(folder, asset_composition.RestoredAsset)
+
+        self.assertEqual(
+            folder.trait_names(),
+            compositor.get(self._root + "/a").trait_names(),
+        )
+
+        self.assertEqual(
+            folder.children(),
+            [self._root + "/a/aa", self._root + "/a/one.txt"],
+        )
+
+        # -- A file which has changed since the snapshot was written is
+        # -- bound again rather than restored
+        with open(os.path.join(self._root, "b", "three.txt"), "a") as f:
+            f.write("changed")
+
+        self.assertNotIsInstance(
+            restored.get(self._root + "/b/three.txt"),
+            asset_composition.RestoredAsset,
+        )
+
+        # -- A compositor with a different configuration cannot use it
+        self.assertEqual(
+            asset_composition.Compositor().load_snapshot(filepath),
+            0,
+        )
+
+    def test_restored_asset_forgets_on_invalidate(self):
+
+        compositor = asset_composition.Compositor(
+            configuration=self._get_test_compositor().configuration,
+            snapshot_results=True,
+        )
+        compositor.get(self._root + "/a").children()
+
+        filepath = os.path.join(self._root, "browser.snapshot")
+        compositor.save_snapshot(filepath)
+
+        restored = self._get_test_compositor()
+        restored.load_snapshot(filepath)
+
+        folder = restored.get(self._root + "/a")
+
+        with open(os.path.join(self._root, "a", "new.txt"), "w") as f:
+            f.write("new")
+
+        # -- The held asset keeps answering from the snapshot until it
+        # -- is invalidated
+        self.assertEqual(
+            len(folder.children()),
+            2,
+        )
+
+        restored.invalidate([self._root + "/a"])
+
+        self.assertEqual(
+            len(folder.children()),
+            3,
+        )
@@ -7,7 +7,10 @@
 # Created		-> March 2025
 # Author		-> Michael Malinowski (Studio Gobo)
 # ----------------------------------------------------------------------------
+import json
 import os
+import shutil
+import sys
 import unittest
 import tempfile
 from os import close
@@ -100,4 +103,180 @@ class AssetUnitTest(unittest.TestCase):
         self.assertEqual(
             len(new_config.discovery.paths()),
             1,
-        )
\ No newline at end of file
+        )
+
+    def test_reload_configuration(self):
+
+        root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, root)
+
+        plugins = os.path.join(root, "plugins")
+        os.makedirs(plugins)
+
+        def write_trait(label):
+            with open(os.path.join(plugins, "reload_trait.py"), "w") as f:
+                f.write(
+                    "import asset_composition\n"
+                    "class ReloadTrait(asset_composition.Trait):\n"
+                    "    @classmethod\n"
+                    "    def can_bind(cls, identifier):\n"
+                    "        return identifier.endswith('.x')\n"
+                    "    def label(self):\n"
+                    "        return %r\n" % label
+                )
+
+        write_trait("one")
+
+        filepath = os.path.join(root, "config.json")
+
+        configuration = asset_composition.Configuration()
+        configuration.traits.add_path(plugins)
+        configuration.serialise(filepath=filepath)
+
+        compositor = asset_composition.Compositor(configuration=configuration)
+
+        asset = compositor.get("thing.x")
+        compositor.get("thing.y")
+
+        self.assertEqual(
+            asset.label(),
+            "one",
+        )
+
+        fingerprint = configuration.fingerprint()
+
+        # -- Nothing has changed, so nothing is reloaded
+        self.assertEqual(
+            configuration.reload(),
+            dict(traits=[], discoveries=[]),
+        )
+
+        self.assertEqual(
+            configuration.fingerprint(),
+            fingerprint,
+        )
+
+        # -- Changing the plugin module changes the fingerprint, and only the
+        # -- assets the trait is bound to are bound again
+        write_trait("three")
+
+        self.assertEqual(
+            configuration.reload(),
+            dict(traits=["ReloadTrait"], discoveries=[]),
+        )
+
+        self.assertNotEqual(
+            configuration.fingerprint(),
+            fingerprint,
+        )
+
+        self.assertEqual(
+            asset.label(),
+            "three",
+        )
+
+        self.assertTrue(compositor.is_cached("thing.y"))
+        self.assertFalse(compositor.is_cached("thing.x"))
+
+        # -- Disabling the trait within the file unbinds it
+        with open(filepath, "r") as f:
+            data = json.load(f)
+
+        data["disabled_traits"] = ["ReloadTrait"]
+
+        with open(filepath, "w") as f:
+            json.dump(data, f)
+
+        self.assertEqual(
+            configuration.reload(),
+            dict(traits=["ReloadTrait"], discoveries=[]),
+        )
+
+        self.assertEqual(
+            asset.trait_names(),
+            [],
+        )
+
+    def test_unknown_change_invalidates_everything(self):
+
+        root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, root)
+
+        with open(os.path.join(root, "late_trait.py"), "w") as f:
+            f.write(
+                "import asset_composition\n"
+                "class LateTrait(asset_composition.Trait):\n"
+                "    @classmethod\n"
+                "    def can_bind(cls, identifier):\n"
+                "        return identifier.endswith('.y')\n"
+            )
+
+        configuration = asset_composition.Configuration()
+        compositor = asset_composition.Compositor(configuration=configuration)
+
+        asset = compositor.get("thing.y")
+        compositor.get("thing.x")
+
+        self.assertEqual(
+            asset.trait_names(),
+            [],
+        )
+
+        # -- Changing the factory directly does not tell us what changed, so
+        # -- every asset has to be bound again
+        configuration.traits.add_path(root)
+
+        self.assertFalse(compositor.is_cached("thing.x"))
+        self.assertFalse(compositor.is_cached("thing.y"))
+
+        self.assertEqual(
+            asset.trait_names(),
+            ["LateTrait"],
+        )
+
+    def test_reload_reports_failures(self):
+
+        root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, root)
+
+        # -- Place the plugin within an importable package, so the factory
+        # -- imports it rather than loading it directly
+        package = os.path.join(root, "reload_failure_package")
+        os.makedirs(package)
+
+        with open(os.path.join(package, "__init__.py"), "w") as f:
+            f.write("")
+
+        filepath = os.path.join(package, "failing_trait.py")
+
+        with open(filepath, "w") as f:
+            f.write(
+                "import asset_composition\n"
+                "class FailingTrait(asset_composition.Trait):\n"
+                "    pass\n"
+            )
+
+        sys.path.insert(0, root)
+        self.addCleanup(sys.path.remove, root)
+
+        for name in ["reload_failure_package", "reload_failure_package.failing_trait"]:
+            self.addCleanup(sys.modules.pop, name, None)
+
+        configuration = asset_composition.Configuration()
+        configuration.traits.add_path(package)
+        configuration.serialise(filepath=os.path.join(root, "config.json"))
+
+        self.assertIn(
+            "reload_failure_package.failing_trait",
+            sys.modules,
+        )
+
+        # -- A module saved part way through an edit cannot be reloaded, which
+        # -- should be reported rather than silently ignored
+        with open(filepath, "w") as f:
+            f.write("class FailingTrait(\n")
+
+        with self.assertLogs("asset_composition._config", level="ERROR") as logs:
+            configuration.reload()
+
+        self.assertIn(filepath, logs.output[0])
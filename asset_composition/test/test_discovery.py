@@ -7,6 +7,7 @@
 # Created		-> March 2025
 # Author		-> Michael Malinowski (Studio Gobo)
 # ----------------------------------------------------------------------------
+import json
 import os
 import unittest
 import asset_composition
@@ -69,3 +70,154 @@ class AssetUnitTest(unittest.TestCase):
         )
 
         self.assertGreater(len(results), 1)
+
+    def test_paginated_discovery_streams_pages(self):
+
+        requested = list()
+
+        class NumberSearch(asset_composition.PaginatedDiscoveryPlugin):
+
+            page_size = 10
+
+            @classmethod
+            def fetch_page(cls, query, search_from, offset, limit):
+                requested.append(offset)
+                return [str(index) for index in range(offset, min(offset + limit, 25))]
+
+        self.assertEqual(
+            len(NumberSearch.search("", None)),
+            25,
+        )
+
+        self.assertEqual(
+            requested,
+            [0, 10, 20],
+        )
+
+        # -- With a cut off, we should stop requesting pages as soon as we
+        # -- have enough results
+        requested.clear()
+        results = list(NumberSearch.iter_search("", None, max_results=12))
+
+        self.assertEqual(
+            results,
+            [str(index) for index in range(12)],
+        )
+
+        self.assertEqual(
+            requested,
+            [0, 10],
+        )
+
+    def test_paginated_discovery_max_results(self):
+
+        requested = list()
+
+        class NumberSearch(asset_composition.PaginatedDiscoveryPlugin):
+
+            page_size = 10
+            max_results = 15
+
+            @classmethod
+            def fetch_page(cls, query, search_from, offset, limit):
+                requested.append(offset)
+                return [str(index) for index in range(offset, min(offset + limit, 100))]
+
+        configuration = asset_composition.Configuration()
+        configuration.discovery.register(NumberSearch)
+
+        compositor = asset_composition.Compositor(configuration=configuration)
+
+        # -- The limit of the plugin should be respected when searching
+        # -- through the compositor, not just when calling search directly
+        self.assertEqual(
+            len(compositor.search("number", sort=False)),
+            15,
+        )
+
+        self.assertEqual(
+            requested,
+            [0, 10],
+        )
+
+        # -- A smaller limit given to the search still wins
+        self.assertEqual(
+            len(list(NumberSearch.iter_search("", None, max_results=5))),
+            5,
+        )
+
+        self.assertEqual(
+            len(NumberSearch.search("", None)),
+            15,
+        )
+
+    def test_json_array_streaming(self):
+
+        document = json.dumps(
+            dict(
+                elapsed_time=0.01,
+                records_found=3,
+                records=[dict(nam="Dinosauria"), dict(nam="Ornithischia", n=1.5), 3],
+            ),
+        ).encode("utf-8")
+
+        # -- Split the document into tiny chunks to ensure values spanning
+        # -- multiple chunks are handled
+        chunks = [document[index:index + 3] for index in range(0, len(document), 3)]
+
+        self.assertEqual(
+            list(asset_composition._json_stream.iter_json_array(chunks, key="records")),
+            json.loads(document)["records"],
+        )
+
+    def test_search_limit_merges_sorted_plugins(self):
+
+        pulled = list()
+
+        class EvenSearch(asset_composition.DiscoveryPlugin):
+
+            @classmethod
+            def iter_search(cls, query, search_from, max_results=None, deadline=None):
+                for index in range(0, 1000, 2):
+                    pulled.append(index)
+                    yield "item_%04d" % index
+
+        class OddSearch(asset_composition.DiscoveryPlugin):
+
+            sorted_results = False
+
+            @classmethod
+            def search(cls, query, search_from):
+                return ["item_%04d" % index for index in range(999, 0, -2)]
+
+        configuration = asset_composition.Configuration()
+        configuration.discovery.register(EvenSearch)
+        configuration.discovery.register(OddSearch)
+
+        compositor = asset_composition.Compositor(configuration=configuration)
+
+        results = compositor.search("item", limit=5)
+
+        self.assertEqual(
+            [result.identifier() for result in results],
+            ["item_0000", "item_0001", "item_0002", "item_0003", "item_0004"],
+        )
+
+        # -- The sorted plugin should only have been asked for as many
+        # -- results as the merge needed
+        self.assertLess(len(pulled), 10)
+
+        # -- Without sorting, the results are taken in the order the plugins
+        # -- give them
+        results = compositor.search("item", limit=3, sort=False)
+
+        self.assertEqual(
+            len(results),
+            3,
+        )
+
+        # -- An expired deadline returns what has been found so far
+        self.assertLessEqual(
+            len(compositor.search("item", deadline=0)),
+            1,
+        )
@@ -0,0 +1,208 @@
+# ----------------------------------------------------------------------------
+# Copyright (c) Studio Gobo Ltd 2025
+# Licensed under the MIT license.  
+# See LICENSE.TXT in the project root for license information.
+# ----------------------------------------------------------------------------
+# File			-> test_fixtures.py
+# Created		-> March 2025
+# Author		-> Michael Malinowski (Studio Gobo)
+# ----------------------------------------------------------------------------
+import http.server
+import json
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+import urllib.error
+import urllib.parse
+import asset_composition
+
+
+# --------------------------------------------------------------------------------------
+class _Handler(http.server.BaseHTTPRequestHandler):
+    """
+    Stands in for a live service, returning pages of taxa names
+    """
+
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        query = urllib.parse.parse_qs(urllib.parse.urlsplit(self.path).query)
+
+        offset = int(query.get("offset", ["0"])[0])
+        limit = int(query.get("limit", ["10"])[0])
+
+        records = [
+            dict(nam="taxon_%02d" % index)
+            for index in range(offset, min(offset + limit, 25))
+        ]
+
+        body = json.dumps(dict(records=records)).encode("utf-8")
+
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", '"%s"' % offset)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+# --------------------------------------------------------------------------------------
+class AssetUnitTest(unittest.TestCase):
+
+    def setUp(self):
+        self._directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self._directory)
+
+    def _record(self, targets):
+        """
+        Records the given request targets from a live server into the
+        fixture directory.
+        """
+        server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        url = "http://127.0.0.1:%s" % server.server_address[1]
+
+        thread = threading.Thread(
+            target=server.serve_forever,
+            kwargs=dict(poll_interval=0.05),
+            daemon=True,
+        )
+        thread.start()
+
+        try:
+            transport = asset_composition.RecordingTransport(self._directory)
+
+            for target in targets:
+                transport.request("GET", url + target)
+
+            transport.close()
+
+        finally:
+            server.shutdown()
+            server.server_close()
+
+    def test_replay_transport(self):
+
+        self._record(["/taxa?offset=0&limit=10"])
+
+        client = asset_composition.HttpClient(
+            transport=asset_composition.ReplayTransport(self._directory),
+        )
+
+        # -- The host is not part of the recording, so it can be replayed
+        # -- for any address
+        data = client.get_json("https://example.invalid/taxa?offset=0&limit=10")
+
+        self.assertEqual(
+            len(data["records"]),
+            10,
+        )
+
+        self.assertRaises(
+            urllib.error.URLError,
+            client.get,
+            "https://example.invalid/taxa?offset=10&limit=10",
+        )
+
+    def test_fixture_server_paginated_discovery(self):
+
+        self._record(
+            [
+                "/taxa?offset=0&limit=10",
+                "/taxa?offset=10&limit=10",
+                "/taxa?offset=20&limit=10",
+            ],
+        )
+
+        with asset_composition.FixtureServer(self._directory) as server:
+            client = asset_composition.HttpClient(ttl=0)
+
+            class TaxaSearch(asset_composition.RestDiscoveryPlugin):
+
+                page_size = 10
+
+                @classmethod
+                def page_url(cls, query, search_from, offset, limit):
+                    return server.url() + "/taxa?offset=%s&limit=%s" % (offset, limit)
+
+                @classmethod
+                def identifier(cls, record):
+                    return record["nam"]
+
+            asset_composition.HttpClient.set_instance(client)
+
+            try:
+                results = TaxaSearch.search("", None)
+
+            finally:
+                asset_composition.HttpClient.set_instance(None)
+
+            self.assertEqual(
+                results,
+                ["taxon_%02d" % index for index in range(25)],
+            )
+
+            self.assertEqual(
+                len(server.requests()),
+                3,
+            )
+
+            # -- Recorded validators are honoured by the server
+            client.get(server.url() + "/taxa?offset=0&limit=10")
+            response = client.get(server.url() + "/taxa?offset=0&limit=10")
+
+            self.assertEqual(
+                len(response.json()["records"]),
+                10,
+            )
+
+    def test_fixture_server_latency(self):
+
+        self._record(["/taxa?offset=0&limit=10"])
+
+        with asset_composition.FixtureServer(self._directory, latency=0.2) as server:
+            url = server.url() + "/taxa?offset=0&limit=10"
+
+            # -- Requests are answered concurrently, so four requests should
+            # -- take roughly the latency of one rather than four
+            threads = [
+                threading.Thread(
+                    target=asset_composition.PooledTransport().request,
+                    args=("GET", url),
+                )
+                for _ in range(4)
+            ]
+
+            start = time.monotonic()
+
+            for thread in threads:
+                thread.start()
+
+            for thread in threads:
+                thread.join()
+
+            elapsed = time.monotonic() - start
+
+            self.assertGreaterEqual(elapsed, 0.2)
+            self.assertLess(elapsed, 0.6)
+
+            self.assertEqual(
+                len(server.requests()),
+                4,
+            )
+
+            missing = asset_composition.PooledTransport().request(
+                "GET",
+                server.url() + "/missing",
+            )
+
+            self.assertEqual(
+                missing.status(),
+                404,
+            )
+
@@ -0,0 +1,248 @@
+# ----------------------------------------------------------------------------
+# Copyright (c) Studio Gobo Ltd 2025
+# Licensed under the MIT license.  
+# See LICENSE.TXT in the project root for license information.
+# ----------------------------------------------------------------------------
+# File			-> test_http.py
+# Created		-> March 2025
+# Author		-> Michael Malinowski (Studio Gobo)
+# ----------------------------------------------------------------------------
+import http.server
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+import urllib.error
+from unittest import mock
+import asset_composition
+
+
+# --------------------------------------------------------------------------------------
+class _Handler(http.server.BaseHTTPRequestHandler):
+
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        self.server.requests.append(self.path)
+
+        if self.path.startswith("/missing"):
+            self._respond(404, b"missing")
+            return
+
+        if self.path.startswith("/slow"):
+            time.sleep(0.2)
+
+        if self.headers.get("If-None-Match") == '"v1"':
+            self._respond(304, b"")
+            return
+
+        body = dict(path=self.path, authorization=self.headers.get("Authorization"))
+        self._respond(200, json.dumps(body).encode("utf-8"))
+
+    def _respond(self, status, body):
+        self.send_response(status)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", '"v1"')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+# --------------------------------------------------------------------------------------
+class AssetUnitTest(unittest.TestCase):
+
+    def setUp(self):
+        self._server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        self._server.requests = list()
+        self._url = "http://127.0.0.1:%s" % self._server.server_address[1]
+
+        self._thread = threading.Thread(
+            target=self._server.serve_forever,
+            kwargs=dict(poll_interval=0.05),
+            daemon=True,
+        )
+        self._thread.start()
+
+        self._cache_directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        self._server.shutdown()
+        self._server.server_close()
+        shutil.rmtree(self._cache_directory)
+
+    def test_responses_are_cached(self):
+
+        client = asset_composition.HttpClient()
+
+        first = client.get_json(self._url + "/record")
+        second = client.get_json(self._url + "/record")
+
+        self.assertEqual(first, second)
+        self.assertEqual(
+            len(self._server.requests),
+            1,
+        )
+
+    def test_stale_responses_are_revalidated(self):
+
+        client = asset_composition.HttpClient(ttl=0)
+
+        first = client.get(self._url + "/record")
+        second = client.get(self._url + "/record")
+
+        # -- The second request is sent, but the server tells us our copy
+        # -- is still valid so we get the cached response back
+        self.assertEqual(
+            len(self._server.requests),
+            2,
+        )
+
+        self.assertIs(first, second)
+
+    def test_disk_cache_persists(self):
+
+        client = asset_composition.HttpClient(cache_directory=self._cache_directory)
+        client.get(self._url + "/record")
+
+        client = asset_composition.HttpClient(cache_directory=self._cache_directory)
+        response = client.get(self._url + "/record")
+
+        self.assertEqual(
+            response.json()["path"],
+            "/record",
+        )
+
+        self.assertEqual(
+            len(self._server.requests),
+            1,
+        )
+
+    def test_in_flight_requests_are_shared(self):
+
+        client = asset_composition.HttpClient()
+        results = list()
+
+        def request():
+            results.append(client.get(self._url + "/slow"))
+
+        threads = [threading.Thread(target=request) for _ in range(8)]
+
+        for thread in threads:
+            thread.start()
+
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(
+            len(results),
+            8,
+        )
+
+        self.assertEqual(
+            len(self._server.requests),
+            1,
+        )
+
+    def test_requests_with_different_headers_are_not_shared(self):
+
+        client = asset_composition.HttpClient(cache_directory=self._cache_directory)
+
+        first = client.get_json(self._url + "/record", headers=dict(Authorization="one"))
+        second = client.get_json(self._url + "/record", headers=dict(Authorization="two"))
+
+        # -- Each set of headers should be given its own response
+        self.assertEqual(
+            [first["authorization"], second["authorization"]],
+            ["one", "two"],
+        )
+
+        self.assertEqual(
+            client.get_json(self._url + "/record")["authorization"],
+            None,
+        )
+
+        # -- Whilst the same headers are still served from the cache
+        client.get_json(self._url + "/record", headers=dict(authorization="one"))
+
+        self.assertEqual(
+            len(self._server.requests),
+            3,
+        )
+
+    def test_errors_are_raised(self):
+
+        client = asset_composition.HttpClient()
+
+        with self.assertRaises(urllib.error.HTTPError):
+            client.get(self._url + "/missing")
+
+    def test_connections_are_reused(self):
+
+        transport = asset_composition.PooledTransport()
+
+        for index in range(3):
+            transport.request("GET", self._url + "/record?%s" % index)
+
+        self.assertEqual(
+            sum(len(connections) for connections in transport._idle.values()),
+            1,
+        )
+
+    def test_default_transport(self):
+
+        transport = asset_composition.HttpTransport()
+
+        response = transport.request("GET", self._url + "/record")
+
+        self.assertEqual(
+            response.status(),
+            200,
+        )
+
+        self.assertEqual(
+            response.json()["path"],
+            "/record",
+        )
+
+        # -- Error responses are returned rather than raised, as they are for
+        # -- every other transport
+        self.assertEqual(
+            transport.request("GET", self._url + "/missing").status(),
+            404,
+        )
+
+    def test_failed_disk_writes_are_removed(self):
+
+        client = asset_composition.HttpClient(cache_directory=self._cache_directory)
+
+        with mock.patch.object(
+            asset_composition._http.os,
+            "replace",
+            side_effect=OSError("disk full"),
+        ):
+            client.get(self._url + "/record")
+
+        self.assertEqual(
+            os.listdir(self._cache_directory),
+            [],
+        )
+
+    def test_instance_without_cache_directory(self):
+
+        asset_composition.HttpClient.set_instance(None)
+        self.addCleanup(asset_composition.HttpClient.set_instance, None)
+
+        # -- A cache directory we cannot trust leaves us caching in memory
+        with mock.patch.object(
+            asset_composition._cache,
+            "cache_directory",
+            side_effect=PermissionError("owned by another user"),
+        ):
+            client = asset_composition.HttpClient.instance()
+
+        self.assertIsNone(client._cache_directory)
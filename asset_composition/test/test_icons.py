@@ -0,0 +1,130 @@
+# ----------------------------------------------------------------------------
+# Copyright (c) Studio Gobo Ltd 2025
+# Licensed under the MIT license.  
+# See LICENSE.TXT in the project root for license information.
+# ----------------------------------------------------------------------------
+# File			-> test_icons.py
+# Created		-> March 2025
+# Author		-> Michael Malinowski (Studio Gobo)
+# ----------------------------------------------------------------------------
+import os
+import shutil
+import tempfile
+import unittest
+import asset_composition
+
+
+# --------------------------------------------------------------------------------------
+class AssetUnitTest(unittest.TestCase):
+
+    def setUp(self):
+        self._directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self._directory)
+
+    def test_resolve_only_fetches_once(self):
+
+        cache = asset_composition.IconCache(directory=self._directory)
+        fetches = list()
+
+        def fetch():
+            fetches.append(True)
+            return b"image"
+
+        first = cache.resolve("a", fetch)
+        second = cache.resolve("a", fetch)
+
+        self.assertEqual(first, second)
+        self.assertTrue(os.path.exists(first))
+        self.assertEqual(len(fetches), 1)
+
+    def test_content_is_shared(self):
+
+        cache = asset_composition.IconCache(directory=self._directory)
+
+        self.assertEqual(
+            cache.store(b"image", key="a"),
+            cache.store(b"image", key="b"),
+        )
+
+        self.assertEqual(
+            cache.size(),
+            len(b"image"),
+        )
+
+    def test_keys_persist_between_sessions(self):
+
+        path = asset_composition.IconCache(directory=self._directory).store(
+            b"image",
+            key="a",
+        )
+
+        cache = asset_composition.IconCache(directory=self._directory)
+
+        self.assertEqual(
+            cache.get("a"),
+            path,
+        )
+
+    def test_least_recently_used_are_evicted(self):
+
+        cache = asset_composition.IconCache(directory=self._directory, max_bytes=10)
+
+        first = cache.store(b"12345", key="a")
+        cache.store(b"67890", key="b")
+
+        # -- Touch the first so that the second becomes the least recently used
+        cache.get("a")
+        cache.store(b"abcde", key="c")
+
+        self.assertTrue(os.path.exists(first))
+        self.assertIsNone(cache.get("b"))
+        self.assertLessEqual(cache.size(), 10)
+
+        # -- The reference of the evicted image is removed along with it
+        self.assertEqual(
+            len(os.listdir(os.path.join(self._directory, "keys"))),
+            2,
+        )
+
+    def test_removed_images_are_fetched_again(self):
+
+        cache = asset_composition.IconCache(directory=self._directory)
+        path = cache.resolve("a", lambda: b"image")
+
+        # -- Another process sharing the folder may remove the image
+        os.remove(path)
+
+        self.assertIsNone(cache.get("a"))
+
+        self.assertEqual(
+            cache.resolve("a", lambda: b"image"),
+            path,
+        )
+
+        self.assertTrue(os.path.exists(path))
+
+    def test_keys_held_in_memory_are_bounded(self):
+
+        cache = asset_composition.IconCache(directory=self._directory, max_keys=2)
+
+        for key in "abcd":
+            cache.store(b"image", key=key)
+
+        self.assertEqual(
+            len(cache._paths),
+            2,
+        )
+
+        # -- Keys which are no longer held are still found on disk
+        self.assertIsNotNone(cache.get("a"))
+
+    def test_missing_image_returns_empty_path(self):
+
+        cache = asset_composition.IconCache(directory=self._directory)
+
+        self.assertEqual(
+            cache.resolve("a", lambda: None),
+            "",
+        )
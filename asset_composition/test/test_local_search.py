@@ -0,0 +1,228 @@
+# ----------------------------------------------------------------------------
+# Copyright (c) Studio Gobo Ltd 2025
+# Licensed under the MIT license.  
+# See LICENSE.TXT in the project root for license information.
+# ----------------------------------------------------------------------------
+# File			-> test_local_search.py
+# Created		-> March 2025
+# Author		-> Michael Malinowski (Studio Gobo)
+# ----------------------------------------------------------------------------
+import glob
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from unittest import mock
+import asset_composition
+
+
+# --------------------------------------------------------------------------------------
+class AssetUnitTest(unittest.TestCase):
+
+    def setUp(self):
+
+        self._root = tempfile.mkdtemp().replace("\\", "/")
+
+        for folder in ["a", "a/aa", "a/.git", "b", "b/__pycache__", "b/sub"]:
+            os.makedirs(os.path.join(self._root, folder))
+
+        for filepath in [
+            "a/one.py",
+            "a/aa/two.py",
+            "a/aa/two.txt",
+            "a/.git/config.py",
+            "a/.hidden.py",
+            "b/three.py",
+            "b/__pycache__/three.pyc",
+            "b/sub/four.py",
+        ]:
+            with open(os.path.join(self._root, filepath), "w") as f:
+                f.write(filepath)
+
+    def tearDown(self):
+        shutil.rmtree(self._root)
+
+    def _glob(self, query, roots):
+        results = list()
+
+        for root in roots:
+            results.extend(glob.glob(root + "/**/*" + query + "*", recursive=True))
+
+        return sorted(set(result.replace("\\", "/") for result in results))
+
+    def test_matches_glob(self):
+
+        # -- With only hidden files ignored we should see exactly what
+        # -- glob would give us
+        for workers in [1, 4]:
+            engine = asset_composition.LocalSearch(ignore=[".*"], workers=workers)
+
+            for query in ["py", "*.py", "t*o", "su*/f*", "a*/*.py", "missing"]:
+                self.assertEqual(
+                    sorted(engine.search(query, self._root)),
+                    self._glob(query, [self._root]),
+                )
+
+    def test_ignore_patterns(self):
+
+        engine = asset_composition.LocalSearch()
+        results = engine.search("*.py", self._root)
+
+        self.assertNotIn(
+            self._root + "/b/__pycache__/three.pyc",
+            results,
+        )
+
+        self.assertEqual(
+            len(results),
+            4,
+        )
+
+    def test_overlapping_roots(self):
+
+        engine = asset_composition.LocalSearch()
+
+        roots = [self._root + "/a/aa", self._root + "/a", self._root + "/a/"]
+
+        self.assertEqual(
+            asset_composition._local_search.unique_roots(roots),
+            [self._root + "/a"],
+        )
+
+        self.assertEqual(
+            sorted(engine.search("two", roots)),
+            [self._root + "/a/aa/two.py", self._root + "/a/aa/two.txt"],
+        )
+
+    def test_matches(self):
+
+        engine = asset_composition.LocalSearch()
+
+        self.assertTrue(engine.matches("two", self._root + "/a/aa/two.py"))
+        self.assertFalse(engine.matches("one", self._root + "/a/aa/two.py"))
+        self.assertTrue(engine.matches("aa/*.py", self._root + "/a/aa/two.py"))
+        self.assertFalse(engine.matches("b/*.py", self._root + "/a/aa/two.py"))
+
+    def test_parallel_walk_scales_with_latency(self):
+
+        scandir = os.scandir
+
+        # -- Simulate a network drive, where every folder read has to wait
+        # -- on the server
+        def slow_scandir(path):
+            time.sleep(0.02)
+            return scandir(path)
+
+        roots = [self._root + "/a", self._root + "/b"]
+
+        module = asset_composition._local_search
+
+        with mock.patch.object(module.os, "scandir", slow_scandir):
+            start = time.monotonic()
+            serial = asset_composition.LocalSearch(workers=1).search("py", roots)
+            serial_time = time.monotonic() - start
+
+            start = time.monotonic()
+            parallel = asset_composition.LocalSearch(workers=8).search("py", roots)
+            parallel_time = time.monotonic() - start
+
+        self.assertEqual(
+            sorted(serial),
+            sorted(parallel),
+        )
+
+        self.assertLess(parallel_time, serial_time)
+
+    def test_parallel_walk_stops_early(self):
+
+        for index in range(50):
+            os.makedirs(os.path.join(self._root, "wide", str(index), "deep"))
+
+        engine = asset_composition.LocalSearch(workers=4, max_buffered=1)
+        results = engine.iter_search("*", self._root)
+
+        # -- Taking a single result and closing the stream should release
+        # -- every thread, even those blocked waiting to hand over results
+        next(results)
+        results.close()
+
+        self.assertEqual(
+            len(list(engine.iter_search("deep", self._root))),
+            50,
+        )
+
+    def test_folder_failing_part_way_through(self):
+
+        scandir = os.scandir
+
+        # -- Simulate a folder which is removed whilst it is being read, so
+        # -- reading its entries fails after the first one
+        class FailingEntries:
+
+            def __init__(self, path):
+                self._entries = scandir(path)
+                self._path = path
+                self._read = 0
+
+            def __enter__(self):
+                return self
+
+            def __exit__(self, *args):
+                self._entries.close()
+
+            def __iter__(self):
+                return self
+
+            def __next__(self):
+                if self._path.endswith("/b") and self._read:
+                    raise OSError("folder removed")
+
+                self._read += 1
+                return next(self._entries)
+
+        module = asset_composition._local_search
+
+        with mock.patch.object(module.os, "scandir", FailingEntries):
+            for workers in [1, 4]:
+                results = asset_composition.LocalSearch(workers=workers).search(
+                    "*.py",
+                    self._root,
+                )
+
+                # -- The rest of the walk should still complete rather than
+                # -- waiting forever on the failed folder
+                self.assertIn(self._root + "/a/aa/two.py", results)
+
+    def test_discovery_workers_from_environment(self):
+
+        configuration = asset_composition.Configuration()
+        configuration.discovery.add_path(
+            os.path.join(
+                os.path.dirname(os.path.dirname(__file__)),
+                "plugins",
+                "filesystem",
+                "discovery",
+            ),
+        )
+
+        plugin = configuration.discovery.request("LocalDiskDiscovery")
+
+        # -- The environment is read when searching rather than on import
+        with mock.patch.dict(os.environ, ASSET_COMPOSITION_SEARCH_WORKERS="4"):
+            self.assertEqual(
+                plugin._engine()._workers,
+                4,
+            )
+
+        # -- A value which is not a number falls back to a single thread
+        with mock.patch.dict(os.environ, ASSET_COMPOSITION_SEARCH_WORKERS="many"):
+            self.assertEqual(
+                plugin._engine()._workers,
+                1,
+            )
+
+            self.assertEqual(
+                len(plugin.search("py", self._root)),
+                4,
+            )
@@ -0,0 +1,136 @@
+# ----------------------------------------------------------------------------
+# Copyright (c) Studio Gobo Ltd 2025
+# Licensed under the MIT license.  
+# See LICENSE.TXT in the project root for license information.
+# ----------------------------------------------------------------------------
+# File			-> test_server.py
+# Created		-> March 2025
+# Author		-> Michael Malinowski (Studio Gobo)
+# ----------------------------------------------------------------------------
+import os
+import shutil
+import socket
+import stat
+import tempfile
+import unittest
+import asset_composition
+
+
+# --------------------------------------------------------------------------------------
+@unittest.skipUnless(hasattr(socket, "AF_UNIX"), "Requires unix domain sockets")
+class AssetUnitTest(unittest.TestCase):
+
+    def setUp(self):
+
+        self._root = tempfile.mkdtemp().replace("\\", "/")
+
+        for folder in ["a", "a/aa"]:
+            os.makedirs(os.path.join(self._root, folder))
+
+        for filepath in ["a/one.txt", "a/aa/two.txt"]:
+            with open(os.path.join(self._root, filepath), "w") as f:
+                f.write(filepath)
+
+        configuration = asset_composition.Configuration()
+        plugins = os.path.join(
+            os.path.dirname(os.path.dirname(__file__)),
+            "plugins",
+            "filesystem",
+        )
+        configuration.traits.add_path(os.path.join(plugins, "traits"))
+        configuration.discovery.add_path(os.path.join(plugins, "discovery"))
+
+        self._compositor = asset_composition.Compositor(configuration)
+
+        # -- Socket paths are limited in length, so we keep this one short
+        self._address = os.path.join(tempfile.mkdtemp(), "s.sock")
+
+    def tearDown(self):
+        shutil.rmtree(self._root)
+        shutil.rmtree(os.path.dirname(self._address))
+
+    def test_remote_asset(self):
+
+        with asset_composition.AssetServer(self._compositor, self._address):
+            with asset_composition.AssetClient(self._address) as client:
+
+                remote = client.get(self._root + "/a")
+                local = self._compositor.get(self._root + "/a")
+
+                self.assertEqual(
+                    remote.trait_names(),
+                    local.trait_names(),
+                )
+
+                for method_name in ["label", "parent", "children", "custom_data"]:
+                    self.assertEqual(
+                        getattr(remote, method_name)(),
+                        getattr(local, method_name)(),
+                    )
+
+                self.assertEqual(
+                    [action.name() for action in remote.actions()],
+                    [action.name() for action in local.actions()],
+                )
+
+                # -- Actions only run within the server if it allows them
+                self.assertRaises(
+                    PermissionError,
+                    remote.action("Copy Path").call,
+                )
+
+    def test_remote_search(self):
+
+        with asset_composition.AssetServer(self._compositor, self._address):
+            client = asset_composition.AssetClient(self._address)
+
+            self.assertEqual(
+                [asset.identifier() for asset in client.search("two", self._root)],
+                [self._root + "/a/aa/two.txt"],
+            )
+
+            # -- Errors raised by the server are raised by the client
+            self.assertRaises(
+                ValueError,
+                client.request,
+                "call",
+                identifier=self._root,
+                method="pull",
+            )
+
+            client.close()
+
+        # -- The socket is removed once the server stops
+        self.assertFalse(os.path.exists(self._address))
+
+        self.assertFalse(
+            asset_composition.AssetClient(self._address).ping(),
+        )
+
+    def test_server_address(self):
+
+        # -- Something other than a socket at the address is never removed
+        with open(self._address, "w") as f:
+            f.write("data")
+
+        with self.assertRaises(FileExistsError):
+            asset_composition.AssetServer(self._compositor, self._address)
+
+        self.assertTrue(os.path.exists(self._address))
+        os.remove(self._address)
+
+        # -- A socket left behind by a server which is no longer running is
+        # -- replaced, and the new one is only accessible to the user
+        stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        stale.bind(self._address)
+        stale.close()
+
+        with asset_composition.AssetServer(self._compositor, self._address):
+            self.assertEqual(
+                stat.S_IMODE(os.stat(self._address).st_mode),
+                0o600,
+            )
+
+            # -- A server which is still listening is never replaced
+            with self.assertRaises(OSError):
+                asset_composition.AssetServer(self._compositor, self._address)
@@ -0,0 +1,186 @@
+# ----------------------------------------------------------------------------
+# Copyright (c) Studio Gobo Ltd 2025
+# Licensed under the MIT license.  
+# See LICENSE.TXT in the project root for license information.
+# ----------------------------------------------------------------------------
+# File			-> test_shared_cache.py
+# Created		-> March 2025
+# Author		-> Michael Malinowski (Studio Gobo)
+# ----------------------------------------------------------------------------
+import concurrent.futures
+import multiprocessing
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+import asset_composition
+
+
+# --------------------------------------------------------------------------------------
+def _write_entries(filepath, offset):
+    """
+    Writes a batch of records from a separate process
+    """
+    shared_cache = asset_composition.SharedCache(filepath)
+
+    for index in range(offset, offset + 50):
+        shared_cache.put(
+            "fingerprint",
+            ("/asset/%s" % index, False, ("Trait",), (index,), dict(label=str(index))),
+        )
+
+    return len(shared_cache)
+
+
+# --------------------------------------------------------------------------------------
+class AssetUnitTest(unittest.TestCase):
+
+    def setUp(self):
+
+        self._root = tempfile.mkdtemp().replace("\\", "/")
+        self._filepath = os.path.join(self._root, "cache", "assets.sqlite")
+
+        for folder in ["a", "a/aa"]:
+            os.makedirs(os.path.join(self._root, folder))
+
+        for filepath in ["a/one.txt", "a/aa/two.txt"]:
+            with open(os.path.join(self._root, filepath), "w") as f:
+                f.write(filepath)
+
+    def tearDown(self):
+        shutil.rmtree(self._root)
+
+    def _get_test_compositor(self):
+
+        configuration = asset_composition.Configuration()
+        configuration.traits.add_path(
+            os.path.join(
+                os.path.dirname(os.path.dirname(__file__)),
+                "plugins",
+                "filesystem",
+                "traits",
+            ),
+        )
+        return asset_composition.Compositor(
+            configuration=configuration,
+            shared_cache=asset_composition.SharedCache(self._filepath),
+        )
+
+    def test_assets_are_shared(self):
+
+        compositor = self._get_test_compositor()
+        folder = compositor.get(self._root + "/a")
+
+        self.assertEqual(
+            folder.children(),
+            [self._root + "/a/aa", self._root + "/a/one.txt"],
+        )
+
+        # -- A separate compositor restores the binding and the results
+        # -- resolved by the first
+        other = self._get_test_compositor()
+        shared = other.get(self._root + "/a")
+
+        self.assertIsInstance(shared, asset_composition.RestoredAsset)
+
+        self.assertEqual(
+            shared.trait_names(),
+            folder.trait_names(),
+        )
+
+        self.assertEqual(
+            shared._results["children"],
+            [self._root + "/a/aa", self._root + "/a/one.txt"],
+        )
+
+        # -- A compositor with a different configuration cannot see them
+        self.assertIsNone(
+            asset_composition.Compositor(
+                shared_cache=asset_composition.SharedCache(self._filepath),
+            )._restore_asset(self._root + "/a", False),
+        )
+
+    def test_changed_assets_are_not_shared(self):
+
+        compositor = self._get_test_compositor()
+        compositor.get(self._root + "/a").children()
+
+        with open(os.path.join(self._root, "a", "new.txt"), "w") as f:
+            f.write("new")
+
+        other = self._get_test_compositor()
+
+        self.assertEqual(
+            len(other.get(self._root + "/a").children()),
+            3,
+        )
+
+        # -- Invalidating removes the record for every process
+        other.invalidate([self._root + "/a"], recursive=True)
+
+        self.assertIsNone(
+            self._get_test_compositor()._restore_asset(self._root + "/a", False),
+        )
+
+    def test_concurrent_writers_and_eviction(self):
+
+        context = multiprocessing.get_context("spawn")
+
+        with concurrent.futures.ProcessPoolExecutor(4, mp_context=context) as pool:
+            list(pool.map(_write_entries, [self._filepath] * 4, range(0, 200, 50)))
+
+        shared_cache = asset_composition.SharedCache(self._filepath, max_entries=150)
+
+        self.assertEqual(
+            len(shared_cache),
+            200,
+        )
+
+        entry, _ = shared_cache.get("fingerprint", "/asset/120", False)
+
+        self.assertEqual(
+            entry,
+            ("/asset/120", False, ("Trait",), (120,), dict(label="120")),
+        )
+
+        self.assertEqual(
+            shared_cache.evict(),
+            50,
+        )
+
+        self.assertEqual(
+            len(shared_cache),
+            150,
+        )
+
+    def test_default_cache_directory_is_private(self):
+
+        environment = dict(os.environ)
+        environment.pop("ASSET_COMPOSITION_CACHE", None)
+        environment["XDG_CACHE_HOME"] = self._root + "/user_cache"
+
+        with mock.patch.dict(os.environ, environment, clear=True):
+            directory = asset_composition._cache.cache_directory("shared")
+
+            self.assertEqual(
+                directory,
+                os.path.join(self._root + "/user_cache", "asset_composition", "shared"),
+            )
+
+            if not hasattr(os, "getuid"):
+                return
+
+            root = os.path.dirname(directory)
+
+            # -- Only the current user should be able to access the folder
+            self.assertEqual(
+                os.stat(root).st_mode & 0o777,
+                0o700,
+            )
+
+            # -- A folder others can write to should not be trusted
+            os.chmod(root, 0o777)
+
+            with self.assertRaises(PermissionError):
+                asset_composition._cache.cache_directory("shared")
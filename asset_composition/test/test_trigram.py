@@ -0,0 +1,183 @@
+# ----------------------------------------------------------------------------
+# Copyright (c) Studio Gobo Ltd 2025
+# Licensed under the MIT license.  
+# See LICENSE.TXT in the project root for license information.
+# ----------------------------------------------------------------------------
+# File			-> test_trigram.py
+# Created		-> March 2025
+# Author		-> Michael Malinowski (Studio Gobo)
+# ----------------------------------------------------------------------------
+import os
+import shutil
+import tempfile
+import unittest
+import asset_composition
+
+
+# --------------------------------------------------------------------------------------
+class AssetUnitTest(unittest.TestCase):
+
+    def setUp(self):
+
+        self._root = tempfile.mkdtemp().replace("\\", "/")
+
+        for folder in ["chars/hero", "chars/villain", "props"]:
+            os.makedirs(os.path.join(self._root, folder))
+
+        for filepath in [
+            "chars/hero/hero_rig.ma",
+            "chars/hero/hero_model.ma",
+            "chars/villain/villain_rig.ma",
+            "props/crate.ma",
+        ]:
+            with open(os.path.join(self._root, filepath), "w") as f:
+                f.write(filepath)
+
+    def tearDown(self):
+        shutil.rmtree(self._root)
+
+    def test_substring_search(self):
+
+        index = asset_composition.TrigramIndex()
+        index.update(
+            [
+                "/assets/hero_rig.ma",
+                "/assets/hero_model.ma",
+                "/assets/villain_rig.ma",
+            ],
+        )
+
+        self.assertEqual(
+            index.search("*_rig*"),
+            ["/assets/hero_rig.ma", "/assets/villain_rig.ma"],
+        )
+
+        self.assertEqual(
+            index.search("hero_rig"),
+            ["/assets/hero_rig.ma"],
+        )
+
+        # -- Short queries have no trigrams, so every identifier is checked
+        self.assertEqual(
+            index.candidates("ma"),
+            None,
+        )
+
+        self.assertEqual(
+            len(index.search("ma")),
+            3,
+        )
+
+        index.discard("/assets/hero_rig.ma")
+
+        self.assertEqual(
+            index.search("rig"),
+            ["/assets/villain_rig.ma"],
+        )
+
+    def test_save_and_load(self):
+
+        index = asset_composition.LocalSearch().build_index(self._root)
+        filepath = os.path.join(self._root, "index.bin")
+        index.save(filepath)
+
+        loaded = asset_composition.TrigramIndex.load(filepath)
+
+        self.assertEqual(
+            len(loaded),
+            len(index),
+        )
+
+        self.assertEqual(
+            loaded.scopes(),
+            [self._root],
+        )
+
+        self.assertEqual(
+            loaded.search("villain_rig"),
+            [self._root + "/chars/villain/villain_rig.ma"],
+        )
+
+    def test_discovery_uses_index(self):
+
+        configuration = asset_composition.Configuration()
+        configuration.discovery.add_path(
+            os.path.join(
+                os.path.dirname(os.path.dirname(__file__)),
+                "plugins",
+                "filesystem",
+                "discovery",
+            ),
+        )
+
+        plugin = configuration.discovery.request("LocalDiskDiscovery")
+        compositor = asset_composition.Compositor(configuration, search_cache_ttl=0)
+
+        # -- Folders modified moments before they are read are always read
+        # -- again, so we age them to have their times trusted
+        folders = [self._root] + [
+            os.path.join(path, name)
+            for path, names, _ in os.walk(self._root)
+            for name in names
+        ]
+
+        for folder in folders:
+            os.utime(folder, (1e9, 1e9))
+
+        index = asset_composition.LocalSearch().build_index(self._root)
+        plugin.index = index
+
+        try:
+            # -- A file created after the index was built is found, as the
+            # -- folder it was created in has been modified since
+            with open(os.path.join(self._root, "props", "rig_box.ma"), "w") as f:
+                f.write("rig_box")
+
+            results = compositor.search("rig", search_from=self._root)
+
+            self.assertEqual(
+                sorted(os.path.basename(result.identifier()) for result in results),
+                ["hero_rig.ma", "rig_box.ma", "villain_rig.ma"],
+            )
+
+            # -- As is everything within a new folder
+            os.makedirs(os.path.join(self._root, "props", "crates"))
+
+            with open(os.path.join(self._root, "props", "crates", "crate_rig.ma"), "w") as f:
+                f.write("crate_rig")
+
+            self.assertEqual(
+                len(compositor.search("rig", search_from=self._root)),
+                4,
+            )
+
+            # -- Whereas unchanged folders are not read again, so a file whose
+            # -- folder keeps its old time is not seen
+            with open(os.path.join(self._root, "chars", "hero", "hero_rig_v2.ma"), "w") as f:
+                f.write("hero_rig_v2")
+
+            os.utime(os.path.join(self._root, "chars", "hero"), (1e9, 1e9))
+
+            self.assertEqual(
+                len(compositor.search("rig", search_from=self._root)),
+                4,
+            )
+
+            # -- Until it is invalidated, at which point it is added to the index
+            compositor.invalidate([self._root + "/chars/hero/hero_rig_v2.ma"])
+
+            self.assertEqual(
+                len(compositor.search("rig", search_from=self._root)),
+                5,
+            )
+
+            # -- Removed files are no longer found
+            os.remove(os.path.join(self._root, "props", "rig_box.ma"))
+
+            self.assertEqual(
+                len(compositor.search("rig", search_from=self._root)),
+                4,
+            )
+
+        finally:
+            plugin.index = None
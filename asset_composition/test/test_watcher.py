@@ -0,0 +1,168 @@
+# ----------------------------------------------------------------------------
+# Copyright (c) Studio Gobo Ltd 2025
+# Licensed under the MIT license.  
+# See LICENSE.TXT in the project root for license information.
+# ----------------------------------------------------------------------------
+# File			-> test_watcher.py
+# Created		-> March 2025
+# Author		-> Michael Malinowski (Studio Gobo)
+# ----------------------------------------------------------------------------
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+import asset_composition
+
+
+# --------------------------------------------------------------------------------------
+class AssetUnitTest(unittest.TestCase):
+
+    def setUp(self):
+        self._root = tempfile.mkdtemp().replace("\\", "/")
+
+        with open(self._root + "/one.txt", "w") as f:
+            f.write("one")
+
+    def tearDown(self):
+        shutil.rmtree(self._root)
+
+    def _get_test_compositor(self):
+
+        configuration = asset_composition.Configuration()
+        configuration.traits.add_path(
+            os.path.join(
+                os.path.dirname(os.path.dirname(__file__)),
+                "plugins",
+                "filesystem",
+                "traits",
+            ),
+        )
+        compositor = asset_composition.Compositor(configuration=configuration)
+        return compositor
+
+    def _test_backend(self, backend):
+
+        compositor = self._get_test_compositor()
+        watcher = asset_composition.FileSystemWatcher(
+            compositor,
+            [self._root],
+            backend=backend,
+        )
+
+        folder = compositor.get(self._root)
+        new_file = compositor.get(self._root + "/two.txt")
+
+        self.assertNotIn(
+            "LocalFileTrait",
+            new_file.trait_names(),
+        )
+
+        signals = dict(folder=0, new_file=0)
+        folder.changed.connect(lambda: signals.update(folder=signals["folder"] + 1))
+        new_file.status_changed.connect(
+            lambda: signals.update(new_file=signals["new_file"] + 1),
+        )
+
+        with open(self._root + "/two.txt", "w") as f:
+            f.write("two")
+
+        watcher.poll(timeout=1 if backend == "inotify" else 0)
+        watcher.stop()
+
+        self.assertGreaterEqual(
+            signals["folder"],
+            1,
+        )
+
+        self.assertGreaterEqual(
+            signals["new_file"],
+            1,
+        )
+
+        # -- The live asset should have been re-bound now the file exists
+        self.assertIn(
+            "LocalFileTrait",
+            new_file.trait_names(),
+        )
+
+        # -- The cache should have been cleared, so we get a new asset
+        self.assertFalse(
+            compositor.is_cached(self._root),
+        )
+
+    def test_polling_backend(self):
+        self._test_backend("polling")
+
+    @unittest.skipUnless(
+        asset_composition._watcher._InotifyBackend.libc(),
+        "inotify is not available",
+    )
+    def test_inotify_backend(self):
+        self._test_backend("inotify")
+
+    def _test_restart(self, backend):
+
+        compositor = self._get_test_compositor()
+        watcher = asset_composition.FileSystemWatcher(
+            compositor,
+            [self._root],
+            backend=backend,
+            interval=0.05,
+        )
+
+        watcher.start()
+        watcher.stop()
+
+        # -- Starting again should watch with a new backend rather than read
+        # -- from the one which was closed
+        watcher.start()
+        self.addCleanup(watcher.stop)
+
+        changed = threading.Event()
+        folder = compositor.get(self._root)
+        folder.changed.connect(changed.set)
+
+        with open(self._root + "/two.txt", "w") as f:
+            f.write("two")
+
+        self.assertTrue(
+            changed.wait(timeout=10),
+        )
+
+        # -- Paths can be watched whilst the watcher thread is running
+        os.makedirs(self._root + "/sub")
+        watcher.watch(self._root + "/sub")
+
+        self.assertEqual(
+            watcher.paths(),
+            [self._root, self._root + "/sub"],
+        )
+
+    def test_polling_backend_restarts(self):
+        self._test_restart("polling")
+
+    @unittest.skipUnless(
+        asset_composition._watcher._InotifyBackend.libc(),
+        "inotify is not available",
+    )
+    def test_inotify_backend_restarts(self):
+        self._test_restart("inotify")
+
+    def test_invalidate_emits_changed(self):
+
+        compositor = self._get_test_compositor()
+        asset = compositor.get(self._root + "/one.txt")
+        invalidated = list()
+
+        compositor.invalidated.connect(invalidated.extend)
+        compositor.invalidate([self._root], recursive=True)
+
+        self.assertFalse(
+            compositor.is_cached(self._root + "/one.txt"),
+        )
+
+        self.assertEqual(
+            invalidated,
+            [self._root],
+        )
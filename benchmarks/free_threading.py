@@ -0,0 +1,187 @@
+# ----------------------------------------------------------------------------
+# Copyright (c) Studio Gobo Ltd 2025
+# Licensed under the MIT license.
+# See LICENSE.TXT in the project root for license information.
+# ----------------------------------------------------------------------------
+# File			-> free_threading.py
+# Created		-> March 2025
+# Author		-> Michael Malinowski (Studio Gobo)
+# ----------------------------------------------------------------------------
+"""
+Reports how the throughput of get_many and walk scales with the number of
+threads. Binding and composite dispatch are pure python, so on a regular
+build the GIL limits them to a single core, whereas on a free-threaded
+build (python 3.13t onwards) they can scale across cores. Run this under
+both builds to compare:
+
+    python -m benchmarks.free_threading
+    python3.13t -m benchmarks.free_threading
+
+A cpu bound trait is bound alongside the filesystem traits, so the results
+show the cost of binding rather than of reading the disk.
+"""
+import argparse
+import hashlib
+import os
+import shutil
+import sys
+import sysconfig
+import tempfile
+import threading
+import time
+
+import asset_composition
+
+
+class HashedTrait(asset_composition.Trait):
+    """
+    Stands in for a trait which does real work to decide whether it can bind,
+    such as parsing a file name against a naming convention
+    """
+
+    rounds: int = 200
+
+    @classmethod
+    def can_bind(cls, identifier: str) -> bool:
+        digest = identifier.encode("utf-8")
+
+        for _ in range(cls.rounds):
+            digest = hashlib.md5(digest).digest()
+
+        return digest[0] % 2 == 0
+
+    def label(self) -> str:
+        return self.asset().identifier().rsplit("/", 1)[-1]
+
+
+def build_tree(root: str, folders: int, files: int) -> tuple:
+    """
+    Creates one folder per thread to walk, returning the folders along with
+    every identifier beneath them
+    """
+    identifiers = list()
+    tops = list()
+
+    for folder_index in range(folders):
+        folder = os.path.join(root, "folder_%03d" % folder_index).replace("\\", "/")
+        os.makedirs(folder)
+        tops.append(folder)
+        identifiers.append(folder)
+
+        for file_index in range(files):
+            filepath = folder + "/file_%03d.txt" % file_index
+
+            with open(filepath, "w") as f:
+                f.write(filepath)
+
+            identifiers.append(filepath)
+
+    return tops, identifiers
+
+
+def measure_get_many(configuration, identifiers: list, threads: int) -> float:
+    """
+    Returns the assets resolved per second by get_many
+    """
+    compositor = asset_composition.Compositor(configuration)
+
+    start = time.perf_counter()
+    compositor.get_many(identifiers, workers=threads)
+
+    return len(identifiers) / (time.perf_counter() - start)
+
+
+def measure_walk(configuration, folders: list, threads: int) -> float:
+    """
+    Returns the assets visited per second when the given number of threads
+    each walk their share of the folders through one compositor
+    """
+    compositor = asset_composition.Compositor(configuration)
+    counts = [0] * threads
+
+    def walk(index: int) -> None:
+        for folder in folders[index::threads]:
+            for _, asset in compositor.walk(folder, predicate=lambda asset: True):
+                asset.label()
+                counts[index] += 1
+
+    workers = [threading.Thread(target=walk, args=(index,)) for index in range(threads)]
+
+    start = time.perf_counter()
+
+    for worker in workers:
+        worker.start()
+
+    for worker in workers:
+        worker.join()
+
+    return sum(counts) / (time.perf_counter() - start)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--folders", type=int, default=16)
+    parser.add_argument("--files", type=int, default=200)
+    parser.add_argument("--rounds", type=int, default=HashedTrait.rounds)
+    arguments = parser.parse_args()
+
+    HashedTrait.rounds = arguments.rounds
+
+    # -- sys._is_gil_enabled only exists from python 3.13
+    is_gil_enabled = getattr(sys, "_is_gil_enabled", lambda: True)()
+    free_threaded_build = bool(sysconfig.get_config_var("Py_GIL_DISABLED"))
+
+    print(
+        "python %s, %s build, GIL %s"
+        % (
+            sys.version.split()[0],
+            "free-threaded" if free_threaded_build else "regular",
+            "enabled" if is_gil_enabled else "disabled",
+        ),
+    )
+
+    root = tempfile.mkdtemp()
+
+    try:
+        folders, identifiers = build_tree(root, arguments.folders, arguments.files)
+
+        configuration = asset_composition.Configuration()
+        configuration.traits.add_path(
+            os.path.join(
+                os.path.dirname(asset_composition.__file__),
+                "plugins",
+                "filesystem",
+                "traits",
+            ),
+        )
+        configuration.traits.register(HashedTrait)
+
+        print("threads  get_many/sec  speedup  walk/sec  speedup")
+
+        baseline = None
+
+        for threads in arguments.threads:
+            get_many = measure_get_many(configuration, identifiers, threads)
+            walk = measure_walk(configuration, folders, threads)
+
+            if baseline is None:
+                baseline = (get_many, walk)
+
+            print(
+                "%7d  %12.0f  %6.2fx  %8.0f  %6.2fx"
+                % (
+                    threads,
+                    get_many,
+                    get_many / baseline[0],
+                    walk,
+                    walk / baseline[1],
+                ),
+            )
+
+    finally:
+        shutil.rmtree(root)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+# ----------------------------------------------------------------------------
+# Copyright (c) Studio Gobo Ltd 2025
+# Licensed under the MIT license.
+# See LICENSE.TXT in the project root for license information.
+# ----------------------------------------------------------------------------
+# File			-> threaded_get.py
+# Created		-> March 2025
+# Author		-> Michael Malinowski (Studio Gobo)
+# ----------------------------------------------------------------------------
+"""
+Stress test for a compositor shared between threads. A number of threads
+hammer get and the composite methods for a shared set of assets, whilst one
+thread invalidates (and re-binds) some of them. At the end we check that
+every asset was only bound once per invalidation and that no call failed.
+
+    python -m benchmarks.threaded_get --threads 1 2 4 8 16 --seconds 2
+"""
+import argparse
+import os
+import random
+import shutil
+import tempfile
+import threading
+import time
+
+import asset_composition
+
+
+def build_tree(root: str, folders: int, files: int) -> list:
+    """
+    Creates a folder tree to resolve assets from, returning the identifiers
+    of everything within it
+    """
+    identifiers = list()
+
+    for folder_index in range(folders):
+        folder = os.path.join(root, "folder_%03d" % folder_index).replace("\\", "/")
+        os.makedirs(folder)
+        identifiers.append(folder)
+
+        for file_index in range(files):
+            filepath = folder + "/file_%03d.txt" % file_index
+
+            with open(filepath, "w") as f:
+                f.write(filepath)
+
+            identifiers.append(filepath)
+
+    return identifiers
+
+
+def run(compositor, identifiers: list, threads: int, seconds: float) -> dict:
+    """
+    Runs the given number of threads against the compositor for the given
+    number of seconds, returning the number of calls made and any errors.
+    """
+    stop = threading.Event()
+    counts = [0] * threads
+    errors = list()
+
+    # -- Count the bindings, so we can check concurrent gets single-flight
+    bindings = dict()
+    bindings_lock = threading.Lock()
+    create_asset = compositor._create_asset
+
+    def counting_create_asset(identifier, lightweight=False, share=False):
+        with bindings_lock:
+            bindings[identifier] = bindings.get(identifier, 0) + 1
+
+        return create_asset(identifier, lightweight, share)
+
+    compositor._create_asset = counting_create_asset
+
+    def work(index: int) -> None:
+        generator = random.Random(index)
+
+        while not stop.is_set():
+            try:
+                asset = compositor.get(generator.choice(identifiers))
+                asset.label()
+                asset.parent()
+                asset.children()
+                asset.trait_names()
+
+            except Exception as exception:
+                errors.append(exception)
+
+            counts[index] += 1
+
+    invalidations = 0
+
+    workers = [threading.Thread(target=work, args=(index,)) for index in range(threads)]
+
+    for worker in workers:
+        worker.start()
+
+    start = time.monotonic()
+
+    # -- Whilst the workers run, keep invalidating some of the assets
+    while time.monotonic() - start < seconds:
+        compositor.invalidate(random.sample(identifiers, 4), rebind=True)
+        invalidations += 4
+        time.sleep(0.01)
+
+    stop.set()
+
+    for worker in workers:
+        worker.join()
+
+    elapsed = time.monotonic() - start
+    compositor._create_asset = create_asset
+
+    return dict(
+        calls=sum(counts),
+        per_second=sum(counts) / elapsed,
+        errors=errors,
+        bindings=sum(bindings.values()),
+        max_bindings=max(bindings.values(), default=0),
+        invalidations=invalidations,
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 2, 4, 8, 16])
+    parser.add_argument("--seconds", type=float, default=2.0)
+    parser.add_argument("--folders", type=int, default=20)
+    parser.add_argument("--files", type=int, default=50)
+    arguments = parser.parse_args()
+
+    root = tempfile.mkdtemp()
+
+    try:
+        identifiers = build_tree(root, arguments.folders, arguments.files)
+
+        configuration = asset_composition.Configuration()
+        configuration.traits.add_path(
+            os.path.join(
+                os.path.dirname(asset_composition.__file__),
+                "plugins",
+                "filesystem",
+                "traits",
+            ),
+        )
+
+        print("threads  calls/sec   bindings  invalidated  errors")
+
+        for threads in arguments.threads:
+            compositor = asset_composition.Compositor(configuration)
+            result = run(compositor, identifiers, threads, arguments.seconds)
+
+            print(
+                "%7d  %9.0f  %9d  %11d  %6d"
+                % (
+                    threads,
+                    result["per_second"],
+                    result["bindings"],
+                    result["invalidations"],
+                    len(result["errors"]),
+                ),
+            )
+
+            # -- Each asset is bound once when first requested, and once more
+            # -- for each time it was invalidated
+            if result["bindings"] > len(identifiers) + result["invalidations"]:
+                print("  ! more bindings than gets which could need them")
+
+            for error in result["errors"][:5]:
+                print("  ! %r" % error)
+
+    finally:
+        shutil.rmtree(root)
+
+
+if __name__ == "__main__":
+    main()
@@ -11,29 +11,55 @@
 This discovery mechanism will search the paleobio rest api for a dinosaur
 and return the results
 """
-import json
-import urllib.request
+import fnmatch
+import os
+import urllib.parse
 
 import asset_composition
 
+# -- The api can be pointed elsewhere, such as at a local FixtureServer, by
+# -- setting this environment variable
+_API = os.environ.get("PALEOBIO_API", r"https://paleobiodb.org/data1.2")
 
-class PaleoBioSearch(asset_composition.DiscoveryPlugin):
+
+class PaleoBioSearch(asset_composition.RestDiscoveryPlugin):
     """
     Discovery traits allow us to expose a mechanism of searching. In this case we
-    expose a mechanism to search for local files/folders within a users machine.
+    expose a mechanism to search the paleobio database for taxa whose name
+    matches the query. Results are requested a page at a time, so broad
+    queries start yielding results as soon as the first page arrives.
     """
 
+    page_size = 200
+
+    # -- The api orders the taxa by name case insensitively, which is not
+    # -- the order the compositor merges in, so we cannot declare the
+    # -- results as sorted
+    sorted_results = False
+
+    # -- The api matches names containing the query, so the results of a
+    # -- longer query can be filtered from those of a shorter one
+    monotone_matching = True
+
     @classmethod
-    def search(cls, query, search_from) -> list:
-        url: str = (
-            r"https://paleobiodb.org/data1.2/taxa/list.json?rowcount&show=class&match_name=%"
-            + query
-            + "%"
+    def page_url(cls, query, search_from, offset, limit) -> str:
+        return "".join(
+            [
+                _API,
+                "/taxa/list.json",
+                "?show=class&order=name&match_name=%",
+                urllib.parse.quote(query),
+                "%",
+                "&limit=%s&offset=%s" % (limit, offset),
+            ],
         )
 
-        with urllib.request.urlopen(url) as response:
-            data = json.load(response)["records"]
-
-        results = [record["nam"] for record in data if "nam" in record]
+    @classmethod
+    def identifier(cls, record) -> str | None:
+        return record.get("nam")
 
-        return sorted(results)
+    @classmethod
+    def matches(cls, query, search_from, identifier) -> bool:
+        # -- The api matches names case insensitively using sql wildcards
+        pattern = "*" + query.replace("%", "*").replace("_", "?") + "*"
+        return fnmatch.fnmatchcase(identifier.lower(), pattern.lower())
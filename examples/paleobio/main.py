@@ -13,6 +13,18 @@ import asset_composition
 
 if __name__ == '__main__':
 
+    # -- Responses can be recorded to, or replayed from, a fixture directory
+    # -- allowing this example to be run without access to the network
+    if os.environ.get("PALEOBIO_RECORD"):
+        asset_composition.HttpClient.instance().set_transport(
+            asset_composition.RecordingTransport(os.environ["PALEOBIO_RECORD"]),
+        )
+
+    elif os.environ.get("PALEOBIO_REPLAY"):
+        asset_composition.HttpClient.instance().set_transport(
+            asset_composition.ReplayTransport(os.environ["PALEOBIO_REPLAY"]),
+        )
+
     configuration = asset_composition.Configuration()
 
     # -- Add our local drive traits
@@ -7,15 +7,17 @@
 # Created		-> March 2025
 # Author		-> Michael Malinowski (Studio Gobo)
 # ----------------------------------------------------------------------------
-import json
-import tempfile
-import urllib.request
+import os
 import asset_composition
 
+# -- The api can be pointed elsewhere, such as at a local FixtureServer, by
+# -- setting this environment variable
+_API = os.environ.get("PALEOBIO_API", r"https://paleobiodb.org/data1.2")
+
 
 class PaleoBioRestApiResourceTrait(asset_composition.Trait):
 
-    _TAXA_API = r"https://paleobiodb.org/data1.2/taxa"
+    _TAXA_API = _API + "/taxa"
     @classmethod
     def can_bind(cls, identifier: str) -> bool:
         return True
@@ -25,40 +27,74 @@ class PaleoBioRestApiResourceTrait(asset_composition.Trait):
 
     def children(self):
         url_name = self.label().replace(" ", "+")
+
+        # -- We ask for the full records of the children, allowing us to prime
+        # -- the record loader with them. That way when the children are shown
+        # -- their icons and custom data do not need any further requests
         url = "".join(
             [
                 self._TAXA_API,
-                "/list.json?rowcount&show=class&rel=children&name=",
+                "/list.json?rowcount&show=class&show=img&show=full&rel=children&name=",
                 url_name,
             ],
         )
 
-        with urllib.request.urlopen(url) as response:
-            data = json.load(response)["records"]
+        data = asset_composition.HttpClient.instance().get_json(url)["records"]
+        loader = self._records()
+
+        children = []
+
+        for item in data:
+            if "oid" in item and item["nam"] != self.label():
+                loader.prime(item["nam"], item)
+                children.append(item["nam"])
 
-        children = [
-            item["nam"]
-            for item in data
-            if "oid" in item and item["nam"] != self.label()
-        ]
         return sorted(children)
 
-    def icon(self):
+    def record(self) -> dict:
+        """
+        Returns the full taxonomy record for this asset. Both the icon and the
+        custom data are resolved from this record, and because it is requested
+        through the compositors record loader it is only fetched once.
+        """
+        return self._records().load(self.label())
+
+    def _records(self) -> "asset_composition.RecordLoader":
+        return self.asset().compositor.loader(
+            "paleobio.record",
+            batch_load=self._load_records,
+        )
 
-        url_name = self.label().replace(" ", "+")
+    @classmethod
+    def _load_records(cls, names: list) -> dict:
+        """
+        Fetches the full records for all the given taxon names in a single
+        request, returning a dictionary of name to record.
+        """
         url = "".join(
             [
-                self._TAXA_API,
+                cls._TAXA_API,
                 "/list.json?rowcount&show=class&show=img&show=full&name=",
-                url_name,
+                ",".join(name.replace(" ", "+") for name in names),
             ],
         )
-        with urllib.request.urlopen(url) as response:
-            data = json.load(response)["records"][0]
+        data = asset_composition.HttpClient.instance().get_json(url)["records"]
 
-        if "img" not in data:
-            print(data)
-            return ""
+        return {record["nam"]: record for record in data if "nam" in record}
+
+    def icon(self):
+        # -- Icons are resolved through the shared icon cache, so the thumbnail
+        # -- is only downloaded the first time it is asked for
+        return asset_composition.IconCache.instance().resolve(
+            key=self._TAXA_API + "/thumb/" + self.label(),
+            fetch=self._download_icon,
+        )
+
+    def _download_icon(self) -> bytes | None:
+        data = self.record()
+
+        if not data or "img" not in data:
+            return None
 
         url = "".join(
             [
@@ -68,28 +104,13 @@ class PaleoBioRestApiResourceTrait(asset_composition.Trait):
             ]
         )
 
-        response = urllib.request.urlopen(url)
-        image = response.read()
-
-        tmp_image = tempfile.NamedTemporaryFile(suffix="_paleo_icon.png")
-        tmp_image.write(image)
-        tmp_image.close()
-
-        return tmp_image.name
+        return asset_composition.HttpClient.instance().get(url).body()
 
     def custom_data(self):
-        # -- Resolve the rest api url
-        url_name = self.label().replace(" ", "+")
-        url = "".join(
-            [
-                self._TAXA_API,
-                "/list.json?rowcount&show=class&show=img&show=full&name=",
-                url_name,
-            ],
-        )
+        all_data = self.record()
 
-        with urllib.request.urlopen(url) as response:
-            all_data = json.load(response)["records"][0]
+        if not all_data:
+            return dict()
 
         era = "unknown"
 